@@ -0,0 +1,364 @@
+import re
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools import hooks
+from py_openapi_tools.fastapi import SERIALIZER_FILE_NAME
+from py_openapi_tools.naming import (
+    NameRegistry,
+    function_like_name_to_class_name,
+    to_argument_name,
+    to_class_name,
+    to_function_name,
+)
+from py_openapi_tools.schema import ApiPath, AuthType, Method, OpenAPIDefinition, QueryParam, SchemaType
+from py_openapi_tools.utils import INDENT, HTTPResponse, add_unique, write_data_to_file
+
+VIEW_FILE_NAME = "views"
+MIDDLEWARES_FILE_NAME = "middlewares"
+
+BASE_IMPORTS = [
+    "import datetime as dt",
+    "import typing",
+    "from aiohttp import web",
+    f"from .{MIDDLEWARES_FILE_NAME} import json_response, validation_middleware",
+]
+MIDDLEWARES_MODULE_IMPORTS = [
+    "from typing import Any, Callable, Iterable",
+    "from aiohttp import BasicAuth, web",
+    "from pydantic import ValidationError",
+    "from pydantic_core import to_json",
+]
+
+# helpers of the generated handlers, the security middlewares of the used schemes are appended
+MIDDLEWARES_MODULE = '''
+# the attributes `requires` sets on a handler
+SECURITY_ATTRIBUTE = "security_schemes"
+SCOPES_ATTRIBUTE = "security_scopes"
+
+
+def requires(*schemes: str, scopes: Iterable[str] = ()) -> Callable:
+    """
+    Marks the security schemes of a handler, the middleware of every scheme checks the request
+    :param schemes: the `AuthType` values, e.g. `bearer`
+    """
+
+    def decorator(handler: Callable) -> Callable:
+        setattr(handler, SECURITY_ATTRIBUTE, schemes)
+        setattr(handler, SCOPES_ATTRIBUTE, tuple(scopes))
+        return handler
+
+    return decorator
+
+
+def required_schemes(request: web.Request) -> tuple[str, ...]:
+    # the route handler, `handler` of a middleware may be wrapped by the other middlewares
+    return getattr(request.match_info.handler, SECURITY_ATTRIBUTE, ())
+
+
+def json_response(content: Any, *, status: int) -> web.Response:
+    """
+    Serializes models, lists of models and plain values with pydantic
+    """
+    if content is None and status == 204:
+        return web.Response(status=status)
+    return web.Response(body=to_json(content), status=status, content_type="application/json")
+
+
+def query_params(request: web.Request, *, many: Iterable[str] = ()) -> dict[str, Any]:
+    """
+    :param many: the parameters which are validated as list, all their values are passed
+    """
+    many = set(many)
+    return {key: request.query.getall(key) if key in many else request.query[key] for key in request.query.keys()}
+
+
+@web.middleware
+async def validation_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    try:
+        return await handler(request)
+    except ValidationError as exc:
+        return web.Response(text=exc.json(include_url=False), status=422, content_type="application/json")
+'''
+
+SECURITY_MIDDLEWARES = {
+    AuthType.API_KEY: """
+@web.middleware
+async def api_key_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    if "apiKey" in required_schemes(request):
+        api_key = request.headers.get("X-API-KEY")
+        # TODO: Check api_key against your database or other secure storage
+        if api_key != "expected_key":
+            raise web.HTTPForbidden(text="Could not validate credentials")
+        request["api_key"] = api_key
+    return await handler(request)
+""",
+    AuthType.BASIC: """
+@web.middleware
+async def basic_auth_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    if "basic" in required_schemes(request):
+        try:
+            credentials = BasicAuth.decode(request.headers.get("Authorization", ""))
+        except ValueError:
+            raise web.HTTPUnauthorized(headers={"WWW-Authenticate": "Basic"})
+        # credentials.login and credentials.password are available here
+        # TODO: Check credentials against your database or other secure storage
+        if credentials.login != "" or credentials.password != "":
+            raise web.HTTPUnauthorized(text="Incorrect email or password", headers={"WWW-Authenticate": "Basic"})
+        request["username"] = credentials.login
+    return await handler(request)
+""",
+    AuthType.BEARER: """
+@web.middleware
+async def bearer_auth_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    if "bearer" in required_schemes(request):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        # TODO: Check token against your database or other secure storage
+        if scheme.lower() != "bearer" or token != "valid-token":
+            raise web.HTTPUnauthorized(
+                text="Invalid authentication credentials", headers={"WWW-Authenticate": "Bearer"}
+            )
+        request["token"] = token
+    return await handler(request)
+""",
+    AuthType.OAUTH2: """
+@web.middleware
+async def oauth2_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    if "oauth2" in required_schemes(request):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        # Decode token here (e.g., using python-jose or pyjwt)
+        # TODO: Check token against your database or other secure storage
+        if scheme.lower() != "bearer" or token != "valid-token":
+            raise web.HTTPUnauthorized(
+                text="Invalid authentication credentials", headers={"WWW-Authenticate": "Bearer"}
+            )
+        # TODO replace with the scopes of the token
+        token_scopes = ["items:read"]
+        for scope in getattr(request.match_info.handler, SCOPES_ATTRIBUTE, ()):
+            if scope not in token_scopes:
+                raise web.HTTPUnauthorized(
+                    text="Not enough permissions", headers={"WWW-Authenticate": f'Bearer scope="{scope}"'}
+                )
+        request["token"] = token
+    return await handler(request)
+""",
+    AuthType.COOKIE: """
+@web.middleware
+async def cookie_auth_middleware(request: web.Request, handler: Callable) -> web.StreamResponse:
+    if "cookie" in required_schemes(request):
+        session_id = request.cookies.get("session_id")
+        if not session_id:
+            raise web.HTTPForbidden(text="No session found")
+        request["session_id"] = session_id
+    return await handler(request)
+""",
+}
+
+MIDDLEWARE_NAMES = {
+    AuthType.API_KEY: "api_key_middleware",
+    AuthType.BASIC: "basic_auth_middleware",
+    AuthType.BEARER: "bearer_auth_middleware",
+    AuthType.OAUTH2: "oauth2_middleware",
+    AuthType.COOKIE: "cookie_auth_middleware",
+}
+
+request_template = Template("""
+@routes.$http_kind($route)
+$decorators
+async def $function_name(request: web.Request) -> web.Response:$parse
+    if True:
+        return json_response($response_success, status=$response_success_status_code)
+    else:
+        raise web.$error_class()
+""")
+
+APP_TEMPLATE = Template("""
+def create_app(argv: typing.Optional[list[str]] = None) -> web.Application:
+    \"\"\"
+    `python -m aiohttp.web views:create_app` or `web.run_app(create_app())`
+    \"\"\"
+    app = web.Application(middlewares=[$middlewares])
+    app.add_routes(routes)
+    return app
+""")
+
+# the route patterns only match values of the parameter type, the handlers convert them
+PATH_PATTERNS = {
+    "int": ("-?\\d+", "int({})"),
+    "float": ("-?\\d+(?:\\.\\d+)?", "float({})"),
+    "bool": ("true|false", '{} == "true"'),
+}
+
+
+def error_class(status_code: int) -> str:
+    """
+    :return: the aiohttp exception of a status code, 404 -> `HTTPNotFound`
+    """
+    try:
+        name = HTTPResponse(int(status_code)).name
+    except ValueError:
+        return "HTTPBadRequest"
+    return f"HTTP{function_like_name_to_class_name(name.lower())}"
+
+
+def path_param_pattern(param: Optional[QueryParam]) -> tuple[str, str]:
+    """
+    :param param: None for a path parameter which isn't declared in the spec
+    :return: the regex of the route placeholder ("" matches any segment) and the conversion of the value, `{}` is
+        replaced by the value
+    """
+    if param is None:
+        return "", "{}"
+    type_hint = param.schema.get_type_hint_str()
+    if param.schema.typ == SchemaType.STRING and param.schema.properties and param.schema.properties[0].enum_values:
+        return "|".join(re.escape(str(obj)) for obj in param.schema.properties[0].enum_values), "{}"
+    return PATH_PATTERNS.get(type_hint, ("", "{}"))
+
+
+def create_route(path: ApiPath, method: Method) -> tuple[str, list[str]]:
+    """
+    Placeholders are renamed to valid identifiers and constrained to the values of their type
+    :return: the aiohttp route of the path and the statements which read the path parameters
+    """
+    declared = {obj.name: obj for obj in method.parameters if obj.position == "path"}
+    statements = []
+
+    def placeholder(match: re.Match) -> str:
+        name = match.group(1)
+        argument = to_argument_name(name)
+        pattern, convert = path_param_pattern(declared.get(name))
+        statements.append(f"{argument} = {convert.format(f'request.match_info["{argument}"]')}")
+        return f"{{{argument}:{pattern}}}" if pattern else f"{{{argument}}}"
+
+    return re.sub(r"\{([^}]+)\}", placeholder, path.path), statements
+
+
+def create_request_and_response_objects(
+    path: ApiPath,
+    method: Method,
+    names: Optional[NameRegistry] = None,
+    *,
+    imports: Optional[list[str]] = None,
+    used_auth_types: Optional[list[AuthType]] = None,
+) -> Optional[str]:
+    """
+    :param used_auth_types: receives the auth types of the operation, their middlewares are written
+    """
+    if imports is None:
+        imports = list(BASE_IMPORTS)
+    if used_auth_types is None:
+        used_auth_types = []
+    if method.request_type not in ("get", "post", "put", "patch", "delete"):
+        return None
+    if names is None:
+        function_name = to_function_name(method.operation_id)
+    else:
+        function_name = names.function_name(
+            method.operation_id, owner=f"{method.request_type.upper()} {path.path}", namespace="aiohttp.views"
+        )
+
+    route, statements = create_route(path, method)
+    if method.query_schema is not None:
+        query_model = method.query_schema.class_name
+        add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {query_model}")
+        add_unique(imports, f"from .{MIDDLEWARES_FILE_NAME} import query_params")
+        many = [
+            f'"{obj.name}"'
+            for obj in method.parameters
+            if obj.position == "query" and obj.schema.typ == SchemaType.ARRAY
+        ]
+        arguments = f", many=({', '.join(many)},)" if many else ""
+        statements.append(f"query = {query_model}.model_validate(query_params(request{arguments}))")
+    if method.request_type in ("post", "put", "patch") and method.request_schema.properties:
+        if request_model := method.request_schema.class_name:
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {request_model}")
+            statements.append(f"body = {request_model}.model_validate_json(await request.read())")
+        else:
+            statements.append("body = await request.json()")
+
+    decorators = ""
+    if method.security_schemes:
+        schemes = []
+        scopes = []
+        for scheme in method.security_schemes:
+            add_unique(used_auth_types, scheme.type)
+            add_unique(schemes, f'"{scheme.type.value}"')
+            if scheme.type == AuthType.OAUTH2:
+                scopes.extend(f'"{obj}"' for obj in getattr(scheme.auth, "scopes", []))
+        add_unique(imports, f"from .{MIDDLEWARES_FILE_NAME} import requires")
+        arguments = [*schemes, f"scopes=[{', '.join(scopes)}]"] if scopes else schemes
+        decorators = f"@requires({', '.join(arguments)})"
+
+    response_success = "None"
+    if response_schema := method.get_success_response_schema():
+        model_name = response_schema.schema.class_name
+        if model_name:
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {model_name}")
+            response_success = f"[{model_name}()]" if response_schema.type == SchemaType.ARRAY else f"{model_name}()"
+    return request_template.substitute(
+        http_kind=method.request_type,
+        # raw strings for the patterns of the placeholders
+        route=f'r"{route}"' if "\\" in route else f'"{route}"',
+        decorators=decorators,
+        function_name=function_name,
+        parse="".join(f"\n{INDENT}{obj}" for obj in statements),
+        response_success=response_success,
+        response_success_status_code=method.get_success_error_code(),
+        error_class=error_class(method.get_fail_error_code()),
+    )
+
+
+def create_view_func(path: ApiPath, names: Optional[NameRegistry] = None, **kwargs) -> str:
+    functions = []
+    for method in path.methods:
+        func_txt = create_request_and_response_objects(path, method, names, **kwargs)
+        if func_txt is None:
+            continue
+        functions.append(
+            hooks.get_registry().call("per_operation_emit", func_txt, path=path, methods=[method], framework="aiohttp")
+        )
+    return "\n".join(functions)
+
+
+def create_app(used_auth_types: list[AuthType], imports: list[str]) -> str:
+    middlewares = ["validation_middleware"]
+    for auth_type in used_auth_types:
+        add_unique(imports, f"from .{MIDDLEWARES_FILE_NAME} import {MIDDLEWARE_NAMES[auth_type]}")
+        middlewares.append(MIDDLEWARE_NAMES[auth_type])
+    return APP_TEMPLATE.substitute(middlewares=", ".join(middlewares))
+
+
+def write_middlewares_module(
+    used_auth_types: list[AuthType], *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    write_data_to_file(
+        [MIDDLEWARES_MODULE, *(SECURITY_MIDDLEWARES[obj] for obj in used_auth_types)],
+        import_statements=MIDDLEWARES_MODULE_IMPORTS,
+        file_name=MIDDLEWARES_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
+
+
+def create_view_file(
+    definition: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    """
+    Writes the `RouteTableDef` handlers and the app factory into the views file, the models are the pydantic models
+    of `fastapi.create_serializer_file`
+    """
+    imports = list(BASE_IMPORTS)
+    used_auth_types = []
+    views = ["routes = web.RouteTableDef()", "\n"]
+    for path in definition.paths:
+        views.append(create_view_func(path, definition.names, imports=imports, used_auth_types=used_auth_types))
+    views.append(create_app(used_auth_types, imports))
+    write_data_to_file(
+        views,
+        import_statements=imports,
+        file_name=VIEW_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
+    write_middlewares_module(used_auth_types, export_folder=export_folder, use_tempdir=use_tempdir)
@@ -0,0 +1,303 @@
+import datetime as dt
+import json
+import math
+import statistics
+from dataclasses import asdict, dataclass
+
+from py_openapi_tools.schema import Method, OpenAPIDefinition, Property, Schema, SchemaType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# used for the payload estimation if a value has no example
+DEFAULT_VALUE_SIZES = {
+    str: 18,
+    int: 8,
+    float: 10,
+    bool: 5,
+    dt.date: 12,
+    dt.datetime: 27,
+}
+DEFAULT_VALUE_SIZE = 8
+# arrays without `maxItems` are estimated with this many elements
+DEFAULT_ARRAY_LENGTH = 10
+
+SCHEMA_METRICS = ("property_count", "fan_in", "fan_out", "depth", "combined_width", "estimated_size")
+OPERATION_METRICS = ("parameter_count", "fan_out", "depth", "request_size", "response_size")
+
+
+@dataclass(slots=True)
+class SchemaMetrics:
+    name: str
+    property_count: int
+    fan_in: int
+    fan_out: int
+    depth: int
+    combined_width: int
+    estimated_size: int
+
+
+@dataclass(slots=True)
+class OperationMetrics:
+    operation: str
+    operation_id: str
+    parameter_count: int
+    fan_out: int
+    depth: int
+    request_size: int
+    response_size: int
+
+
+@dataclass(slots=True)
+class ComplexityReport:
+    schemas: list[SchemaMetrics]
+    operations: list[OperationMetrics]
+    # metric -> count, sum, mean, p50, p95, max
+    schema_aggregates: dict[str, dict[str, float]]
+    operation_aggregates: dict[str, dict[str, float]]
+    # metric -> names of the worst schemas/operations
+    top_schemas: dict[str, list[str]]
+    top_operations: dict[str, list[str]]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def _key(schema: Schema) -> str | int:
+    # `extract_reference` creates new objects for the same component, named schemas are identified by their name
+    return schema.name or id(schema)
+
+
+class SchemaGraph:
+    """
+    The references between the schemas of a definition, depth and payload size are computed once per schema
+    """
+
+    definition: OpenAPIDefinition
+    _depths: dict
+    _sizes: dict
+
+    __slots__ = ("definition", "_depths", "_sizes")
+
+    def __init__(self, definition: OpenAPIDefinition):
+        self.definition = definition
+        self._depths = {}
+        self._sizes = {}
+
+    def resolve(self, schema: Schema) -> Schema:
+        return self.definition.created_schemas.get(schema.name, schema) if schema.name else schema
+
+    def children(self, schema: Schema) -> list[Schema]:
+        """
+        :return: the schemas used by the properties and the combined schemas (oneOf, anyOf, allOf)
+        """
+        res = [self.resolve(prop.ref) for prop in schema.properties if isinstance(prop.ref, Schema)]
+        for kind in ("oneOf", "anyOf", "allOf"):
+            res.extend(
+                self.resolve(obj) for obj in (schema.combined_schemas or {}).get(kind, ()) if isinstance(obj, Schema)
+            )
+        return res
+
+    def depth(self, schema: Schema) -> int:
+        """
+        :return: 1 for a schema without nested schemas, recursive references aren't followed
+        """
+        key = _key(schema)
+        if key in self._depths:
+            # `None` marks a schema which is currently computed, i.e. a cycle
+            return self._depths[key] or 0
+        self._depths[key] = None
+        depth = 1 + max((self.depth(obj) for obj in self.children(schema)), default=0)
+        self._depths[key] = depth
+        return depth
+
+    def estimated_size(self, schema: Schema) -> int:
+        """
+        :return: the estimated size of a JSON document of the schema in bytes
+        """
+        key = _key(schema)
+        if key in self._sizes:
+            return self._sizes[key] or 0
+        self._sizes[key] = None
+        size = 2 + sum(len(prop.name) + 4 + self.property_size(prop) for prop in schema.properties)
+        for kind in ("oneOf", "anyOf"):
+            # only one of the alternatives is sent
+            alternatives = [obj for obj in (schema.combined_schemas or {}).get(kind, ()) if isinstance(obj, Schema)]
+            size += max((self.estimated_size(self.resolve(obj)) for obj in alternatives), default=0)
+        for obj in (schema.combined_schemas or {}).get("allOf", ()):
+            if isinstance(obj, Schema):
+                size += self.estimated_size(self.resolve(obj))
+        self._sizes[key] = size
+        return size
+
+    def property_size(self, prop: Property) -> int:
+        if prop.type is list:
+            length = prop.additional_requirements.get("maxItems", DEFAULT_ARRAY_LENGTH)
+            return 2 + length * (self.value_size(prop.ref) + 1) if prop.ref is not None else 2
+        return self.value_size(prop)
+
+    def value_size(self, value: Schema | Property) -> int:
+        if isinstance(value, Schema):
+            return self.estimated_size(self.resolve(value))
+        if isinstance(value.ref, Schema):
+            return self.estimated_size(self.resolve(value.ref))
+        if value.example not in (None, ""):
+            return len(json.dumps(value.example, default=str))
+        if "maxLength" in value.additional_requirements:
+            return 2 + min(value.additional_requirements["maxLength"], DEFAULT_VALUE_SIZES[str] * 4)
+        return DEFAULT_VALUE_SIZES.get(value.type, DEFAULT_VALUE_SIZE)
+
+
+def _response_size(graph: SchemaGraph, method: Method) -> int:
+    response_schema = method.get_success_response_schema()
+    if response_schema is None:
+        return 0
+    size = graph.estimated_size(graph.resolve(response_schema.schema))
+    if response_schema.type == SchemaType.ARRAY:
+        length = response_schema.additional_requirements.get("maxItems", DEFAULT_ARRAY_LENGTH)
+        return 2 + length * (size + 1)
+    return size
+
+
+def _request_size(graph: SchemaGraph, method: Method) -> int:
+    if not method.request_schema.name:
+        return 0
+    return graph.estimated_size(graph.resolve(method.request_schema))
+
+
+def _aggregate(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"count": 0, "sum": 0, "mean": 0, "p50": 0, "p95": 0, "max": 0}
+    if np is not None:
+        array = np.asarray(values, dtype=np.float64)
+        p50, p95 = np.percentile(array, [50, 95])
+        return {
+            "count": len(values),
+            "sum": float(array.sum()),
+            "mean": float(array.mean()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "max": float(array.max()),
+        }
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "sum": float(math.fsum(ordered)),
+        "mean": float(statistics.fmean(ordered)),
+        "p50": float(_percentile(ordered, 50)),
+        "p95": float(_percentile(ordered, 95)),
+        "max": float(ordered[-1]),
+    }
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """
+    Linear interpolation between the closest ranks, the same as the default of `numpy.percentile`
+    """
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _top(names: list[str], values: list[float], top: int) -> list[str]:
+    """
+    :return: the names with the highest values, ties keep the spec order
+    """
+    if np is not None and values:
+        order = np.argsort(-np.asarray(values, dtype=np.float64), kind="stable")[:top]
+        return [names[idx] for idx in order if values[idx] > 0]
+    order = sorted(range(len(values)), key=lambda idx: -values[idx])[:top]
+    return [names[idx] for idx in order if values[idx] > 0]
+
+
+def _columns(rows: list, metrics: tuple[str, ...]) -> dict[str, list[float]]:
+    return {metric: [getattr(row, metric) for row in rows] for metric in metrics}
+
+
+def analyze(definition: OpenAPIDefinition, *, top: int = 10) -> ComplexityReport:
+    """
+    :param definition: the parsed openapi definition
+    :param top: how many offenders are listed per metric
+    :return: the metrics of every schema and operation together with their aggregates
+    """
+    graph = SchemaGraph(definition)
+
+    fan_in: dict[str, set[str]] = {}
+    schemas = []
+    for name, schema in definition.created_schemas.items():
+        children = {obj.name for obj in graph.children(schema) if obj.name}
+        for child in children:
+            fan_in.setdefault(child, set()).add(name)
+        schemas.append(
+            SchemaMetrics(
+                name=name,
+                property_count=len(schema.properties),
+                fan_in=0,
+                fan_out=len(children),
+                depth=graph.depth(schema),
+                combined_width=sum(
+                    len((schema.combined_schemas or {}).get(kind, ())) for kind in ("oneOf", "anyOf", "allOf")
+                ),
+                estimated_size=graph.estimated_size(schema),
+            )
+        )
+
+    operations = []
+    for path in definition.paths:
+        for method in path.methods:
+            operation = f"{method.request_type.upper()} {path.path}"
+            used = [graph.resolve(schema) for schema in method.get_schemas()]
+            for schema in used:
+                fan_in.setdefault(schema.name, set()).add(operation)
+            operations.append(
+                OperationMetrics(
+                    operation=operation,
+                    operation_id=method.operation_id,
+                    parameter_count=len(method.parameters),
+                    fan_out=len(used),
+                    depth=max((graph.depth(schema) for schema in used), default=0),
+                    request_size=_request_size(graph, method),
+                    response_size=_response_size(graph, method),
+                )
+            )
+
+    for metrics in schemas:
+        metrics.fan_in = len(fan_in.get(metrics.name, ()))
+
+    schema_columns = _columns(schemas, SCHEMA_METRICS)
+    operation_columns = _columns(operations, OPERATION_METRICS)
+    schema_names = [obj.name for obj in schemas]
+    operation_names = [obj.operation for obj in operations]
+    return ComplexityReport(
+        schemas=schemas,
+        operations=operations,
+        schema_aggregates={metric: _aggregate(values) for metric, values in schema_columns.items()},
+        operation_aggregates={metric: _aggregate(values) for metric, values in operation_columns.items()},
+        top_schemas={metric: _top(schema_names, values, top) for metric, values in schema_columns.items()},
+        top_operations={metric: _top(operation_names, values, top) for metric, values in operation_columns.items()},
+    )
+
+
+def report_to_text(report: ComplexityReport) -> str:
+    lines = ["Schemas"]
+    for metric, aggregate in report.schema_aggregates.items():
+        lines.append(
+            f"  {metric}: mean {aggregate['mean']:.1f}, p95 {aggregate['p95']:.1f}, max {aggregate['max']:.0f}"
+        )
+    lines.append("Operations")
+    for metric, aggregate in report.operation_aggregates.items():
+        lines.append(
+            f"  {metric}: mean {aggregate['mean']:.1f}, p95 {aggregate['p95']:.1f}, max {aggregate['max']:.0f}"
+        )
+    lines.append("Top offenders")
+    for metric, names in report.top_schemas.items():
+        lines.append(f"  schema {metric}: {', '.join(names)}")
+    for metric, names in report.top_operations.items():
+        lines.append(f"  operation {metric}: {', '.join(names)}")
+    return "\n".join(lines)
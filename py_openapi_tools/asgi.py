@@ -0,0 +1,544 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools import hooks
+from py_openapi_tools.naming import NameRegistry, to_argument_name, to_function_name
+from py_openapi_tools.schema import ApiPath, Method, OpenAPIDefinition, QueryParam, SchemaType
+from py_openapi_tools.utils import (
+    Concurrency,
+    FragmentFileWriter,
+    add_unique,
+    get_concurrency,
+    write_data_to_file,
+)
+
+ROUTING_FILE_NAME = "routing"
+VIEW_FILE_NAME = "views"
+ROUTES_NAME = "ROUTES"
+
+BASE_IMPORTS = ["import typing"]
+ROUTING_MODULE_IMPORTS = [
+    "import asyncio",
+    "import inspect",
+    "import json",
+    "from typing import Any, Callable, Optional",
+    "from urllib.parse import parse_qsl",
+]
+
+# the runtime of the generated app, only the standard library is used
+ROUTING_MODULE = '''
+class HTTPError(Exception):
+    def __init__(self, status_code: int, detail: Any = None, headers: Optional[dict[str, str]] = None):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers or {}
+
+
+class Request:
+    """
+    The ASGI scope of the request, the headers are only decoded on the first access
+    """
+
+    __slots__ = ("scope", "_headers")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self._headers: Optional[dict[str, str]] = None
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def path(self) -> str:
+        return self.scope["path"]
+
+    @property
+    def headers(self) -> dict[str, str]:
+        if self._headers is None:
+            self._headers = {key.decode("latin-1"): val.decode("latin-1") for key, val in self.scope["headers"]}
+        return self._headers
+
+
+class Response:
+    """
+    Return it from a handler to send another status code or additional headers
+    """
+
+    __slots__ = ("content", "status_code", "headers")
+
+    def __init__(self, content: Any = None, *, status_code: Optional[int] = None, headers: Optional[dict] = None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class Param:
+    __slots__ = ("name", "argument", "convert", "location", "required", "many")
+
+    def __init__(
+        self,
+        name: str,
+        argument: str,
+        convert: Callable[[str], Any],
+        *,
+        location: str = "path",
+        required: bool = True,
+        many: bool = False,
+    ):
+        """
+        :param name: the name in the spec, `argument` the keyword argument of the handler
+        :param many: the query parameter may be repeated, the handler gets the list of values
+        """
+        self.name = name
+        self.argument = argument
+        self.convert = convert
+        self.location = location
+        self.required = required
+        self.many = many
+
+    def parse(self, value: str) -> Any:
+        try:
+            return self.convert(value)
+        except ValueError:
+            raise HTTPError(400, f"Invalid {self.location} parameter {self.name}: {value!r}")
+
+
+class Endpoint:
+    __slots__ = ("handler", "status_code", "path_params", "query_params", "has_body", "is_async")
+
+    def __init__(
+        self,
+        handler: Callable,
+        status_code: int,
+        *,
+        path_params: tuple[Param, ...] = (),
+        query_params: tuple[Param, ...] = (),
+        has_body: bool = False,
+    ):
+        self.handler = handler
+        self.status_code = status_code
+        self.path_params = path_params
+        self.query_params = query_params
+        self.has_body = has_body
+        # sync handlers run in a thread, blocking calls don't stall the event loop
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+
+class Node:
+    """
+    A node of the radix tree of the routes, a chain of static segments without routes is a single edge
+    """
+
+    __slots__ = ("edges", "param", "endpoints")
+
+    def __init__(
+        self,
+        *,
+        edges: Optional[dict[str, tuple[tuple[str, ...], "Node"]]] = None,
+        param: Optional["Node"] = None,
+        endpoints: Optional[dict[str, Endpoint]] = None,
+    ):
+        """
+        :param edges: first segment -> (segments of the edge, child)
+        :param param: the child matching any single segment
+        :param endpoints: HTTP method -> endpoint of the path ending at this node
+        """
+        self.edges = edges or {}
+        self.param = param
+        self.endpoints = endpoints or {}
+
+
+def parse_bool(value: str) -> bool:
+    match value.lower():
+        case "true" | "1" | "yes":
+            return True
+        case "false" | "0" | "no":
+            return False
+    raise ValueError(value)
+
+
+def one_of(*values: str) -> Callable[[str], str]:
+    def convert(value: str) -> str:
+        if value not in values:
+            raise ValueError(value)
+        return value
+
+    return convert
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode()
+
+
+_json = {"dumps": _dumps, "loads": json.loads}
+
+
+def configure_json(
+    *, dumps: Optional[Callable[[Any], bytes]] = None, loads: Optional[Callable[[bytes], Any]] = None
+) -> None:
+    """
+    Replaces the JSON encoder/decoder, e.g. `configure_json(dumps=orjson.dumps, loads=orjson.loads)`
+    :param dumps: returns the encoded bytes
+    """
+    if dumps is not None:
+        _json["dumps"] = dumps
+    if loads is not None:
+        _json["loads"] = loads
+
+
+def match(node: Node, segments: list[str], idx: int, values: list[str]) -> Optional[Node]:
+    """
+    Static edges are tried before the parameter of a node, e.g. `/pets/mine` before `/pets/{petId}`
+    :param values: receives the values of the parameter segments
+    :return: the node of the route, None if no route matches
+    """
+    if idx == len(segments):
+        return node if node.endpoints else None
+    edge = node.edges.get(segments[idx])
+    if edge is not None:
+        labels, child = edge
+        end = idx + len(labels)
+        if tuple(segments[idx:end]) == labels and (found := match(child, segments, end, values)) is not None:
+            return found
+    if node.param is not None:
+        values.append(segments[idx])
+        if (found := match(node.param, segments, idx + 1, values)) is not None:
+            return found
+        values.pop()
+    return None
+
+
+async def read_body(receive: Callable) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def dispatch(root: Node, scope: dict, receive: Callable) -> tuple[int, Any, dict[str, str]]:
+    path = scope["path"].strip("/")
+    values = []
+    node = match(root, path.split("/") if path else [], 0, values)
+    if node is None:
+        raise HTTPError(404, "Not Found")
+    endpoint = node.endpoints.get(scope["method"])
+    if endpoint is None:
+        raise HTTPError(405, "Method Not Allowed", {"allow": ", ".join(node.endpoints)})
+
+    kwargs = {param.argument: param.parse(value) for param, value in zip(endpoint.path_params, values)}
+    if endpoint.query_params:
+        query = {}
+        for key, value in parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+            query.setdefault(key, []).append(value)
+        for param in endpoint.query_params:
+            if param.name not in query:
+                if param.required:
+                    raise HTTPError(400, f"Missing query parameter {param.name}")
+                continue
+            query_values = query[param.name]
+            kwargs[param.argument] = (
+                [param.parse(obj) for obj in query_values] if param.many else param.parse(query_values[-1])
+            )
+    if endpoint.has_body:
+        body = await read_body(receive)
+        try:
+            kwargs["body"] = _json["loads"](body) if body else None
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body")
+
+    request = Request(scope)
+    if endpoint.is_async:
+        result = await endpoint.handler(request, **kwargs)
+    else:
+        result = await asyncio.to_thread(endpoint.handler, request, **kwargs)
+    if isinstance(result, Response):
+        return result.status_code or endpoint.status_code, result.content, result.headers
+    return endpoint.status_code, result, {}
+
+
+async def send_response(send: Callable, status_code: int, content: Any, headers: dict[str, str]) -> None:
+    body = b"" if status_code in (204, 304) else _json["dumps"](content)
+    raw_headers = [(key.lower().encode("latin-1"), val.encode("latin-1")) for key, val in headers.items()]
+    if body:
+        raw_headers.append((b"content-type", b"application/json"))
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_app(root: Node) -> Callable:
+    """
+    :param root: the radix tree of the routes
+    :return: the ASGI application
+    """
+
+    async def app(scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        try:
+            status_code, content, headers = await dispatch(root, scope, receive)
+        except HTTPError as exc:
+            status_code, content, headers = exc.status_code, {"detail": exc.detail}, exc.headers
+        await send_response(send, status_code, content, headers)
+
+    return app
+'''
+
+request_template = Template("""
+$def_keyword $function_name($params) -> typing.Any:
+    if True:
+        return $response_success
+    else:
+        raise HTTPError(status_code=$response_error_status_code)
+""")
+
+# converter of the runtime for the type hint of a parameter, unknown types are passed as str
+CONVERTERS = {"int": "int", "float": "float", "bool": "parse_bool", "str": "str"}
+
+
+@dataclass(slots=True)
+class RouteNode:
+    """
+    A node of the route tree while the paths are collected, `edges` has one entry per static segment
+    """
+
+    edges: dict[str, "RouteNode"] = field(default_factory=dict)
+    param: Optional["RouteNode"] = None
+    # HTTP method -> code of the `Endpoint`
+    endpoints: dict[str, str] = field(default_factory=dict)
+
+    def add(self, path: str, method: str, endpoint: str) -> None:
+        node = self
+        for segment in path_segments(path):
+            if segment.startswith("{") and segment.endswith("}"):
+                if node.param is None:
+                    node.param = RouteNode()
+                node = node.param
+            else:
+                node = node.edges.setdefault(segment, RouteNode())
+        node.endpoints[method.upper()] = endpoint
+
+    def render(self) -> str:
+        """
+        :return: the `Node` expression of the tree, chains of static segments without routes are merged into one edge
+        """
+        arguments = []
+        if self.edges:
+            edges = []
+            for segment, child in self.edges.items():
+                labels = [segment]
+                while not child.endpoints and child.param is None and len(child.edges) == 1:
+                    ((label, child),) = child.edges.items()
+                    labels.append(label)
+                edges.append(f'"{segment}": ({render_tuple(labels)}, {child.render()})')
+            arguments.append(f"edges={{{', '.join(edges)}}}")
+        if self.param is not None:
+            arguments.append(f"param={self.param.render()}")
+        if self.endpoints:
+            arguments.append(f"endpoints={{{', '.join(f'"{key}": {val}' for key, val in self.endpoints.items())}}}")
+        return f"Node({', '.join(arguments)})"
+
+
+def render_tuple(values: list[str]) -> str:
+    return f'("{values[0]}",)' if len(values) == 1 else f"({', '.join(f'"{obj}"' for obj in values)})"
+
+
+def path_segments(path: str) -> list[str]:
+    segments = [obj for obj in path.strip("/").split("/") if obj]
+    for segment in segments:
+        if "{" in segment and not (segment.startswith("{") and segment.endswith("}")):
+            print(f"Path {path}: segment {segment} mixes text and parameters, it is matched literally")
+    return segments
+
+
+def create_param(name: str, param: Optional[QueryParam], imports: list[str]) -> tuple[str, str]:
+    """
+    :param param: None for a path parameter which isn't declared in the spec, it is passed as str
+    :return: the handler parameter with its type hint and the `Param` of the runtime
+    """
+    type_hint = param.schema.get_type_hint_str() if param is not None else "str"
+    type_hint = type_hint or "str"
+    many = param is not None and param.schema.typ == SchemaType.ARRAY
+    enum_values = param.schema.properties[0].enum_values if param is not None and param.schema.properties else []
+    if enum_values and not many:
+        convert = f"one_of({', '.join(f'"{obj}"' for obj in enum_values)})"
+        add_unique(imports, "from .routing import one_of")
+    else:
+        convert = CONVERTERS.get(type_hint.removeprefix("list[").removesuffix("]") if many else type_hint, "str")
+        if convert == "parse_bool":
+            add_unique(imports, "from .routing import parse_bool")
+    arguments = [f'"{name}"', f'"{to_argument_name(name)}"', convert]
+    if param is None or param.position == "path":
+        return f"{to_argument_name(name)}: {type_hint}", f"Param({', '.join(arguments)})"
+    arguments.append('location="query"')
+    if not param.required:
+        arguments.append("required=False")
+        type_hint = f"typing.Optional[{type_hint}] = None"
+    if many:
+        arguments.append("many=True")
+    return f"{to_argument_name(name)}: {type_hint}", f"Param({', '.join(arguments)})"
+
+
+def path_param_names(path: str) -> list[str]:
+    """
+    :return: the names of the parameter segments in their order
+    """
+    return [obj[1:-1] for obj in path_segments(path) if obj.startswith("{") and obj.endswith("}")]
+
+
+def create_request_and_response_objects(
+    path: ApiPath,
+    method: Method,
+    names: Optional[NameRegistry] = None,
+    *,
+    imports: Optional[list[str]] = None,
+    concurrency: Optional[Concurrency] = None,
+) -> Optional[tuple[str, str]]:
+    """
+    The handler gets the request, the converted path parameters, the decoded `body` and the query parameters as
+    keyword arguments and returns the JSON of the response
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates async handlers
+    :return: the handler and the code of its `Endpoint`
+    """
+    if imports is None:
+        imports = list(BASE_IMPORTS)
+    if method.request_type not in ("get", "post", "put", "patch", "delete"):
+        return None
+    if names is None:
+        function_name = to_function_name(method.operation_id)
+    else:
+        function_name = names.function_name(
+            method.operation_id, owner=f"{method.request_type.upper()} {path.path}", namespace="asgi.views"
+        )
+    add_unique(imports, "from .routing import Endpoint, HTTPError, Request")
+
+    declared = {obj.name: obj for obj in method.parameters}
+    params = ["request: Request"]
+    path_params = []
+    for name in path_param_names(path.path):
+        param, runtime_param = create_param(name, declared.get(name), imports)
+        params.append(param)
+        path_params.append(runtime_param)
+    has_body = method.request_type in ("post", "put", "patch") and bool(method.request_schema.properties)
+    if has_body:
+        params.append("body: typing.Any")
+    query_params = []
+    # required parameters first, the optional ones have a default
+    for obj in sorted((obj for obj in method.parameters if obj.position == "query"), key=lambda obj: not obj.required):
+        param, runtime_param = create_param(obj.name, obj, imports)
+        params.append(param)
+        query_params.append(runtime_param)
+
+    response_success = "None"
+    if response_schema := method.get_success_response_schema():
+        response_success = "[]" if response_schema.type == SchemaType.ARRAY else "{}"
+    concurrency = get_concurrency(method.extensions, default=Concurrency.ASYNC, configured=concurrency)
+    func_txt = request_template.substitute(
+        def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+        function_name=function_name,
+        params=", ".join(params),
+        response_success=response_success,
+        response_error_status_code=method.get_fail_error_code(),
+    )
+    arguments = [function_name, str(method.get_success_error_code())]
+    if path_params:
+        arguments.append(f"path_params=({', '.join(path_params)},)")
+    if query_params:
+        arguments.append(f"query_params=({', '.join(query_params)},)")
+    if has_body:
+        arguments.append("has_body=True")
+    return func_txt, f"Endpoint({', '.join(arguments)})"
+
+
+def create_view_func(path: ApiPath, routes: RouteNode, names: Optional[NameRegistry] = None, **kwargs) -> str:
+    """
+    :param routes: receives the endpoints of the path
+    """
+    functions = []
+    for method in path.methods:
+        created = create_request_and_response_objects(path, method, names, **kwargs)
+        if created is None:
+            continue
+        func_txt, endpoint = created
+        routes.add(path.path, method.request_type, endpoint)
+        functions.append(
+            hooks.get_registry().call("per_operation_emit", func_txt, path=path, methods=[method], framework="asgi")
+        )
+    return "\n".join(functions)
+
+
+def create_app(routes: RouteNode, imports: list[str]) -> str:
+    add_unique(imports, "from .routing import Node, Param, create_app")
+    return f"{ROUTES_NAME} = {routes.render()}\n\napp = create_app({ROUTES_NAME})"
+
+
+def write_routing_module(*, export_folder: Optional[Path] = None, use_tempdir: bool = False) -> None:
+    write_data_to_file(
+        [ROUTING_MODULE],
+        import_statements=ROUTING_MODULE_IMPORTS,
+        file_name=ROUTING_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
+
+
+def create_view_file(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    concurrency: Optional[Concurrency] = None,
+) -> None:
+    """
+    Writes the handlers, the route tree and the ASGI app into the views file and its runtime into the routing file
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates async handlers
+    """
+    imports = list(BASE_IMPORTS)
+    routes = RouteNode()
+    views = [
+        create_view_func(path, routes, definition.names, imports=imports, concurrency=concurrency)
+        for path in definition.paths
+    ]
+    views.append(create_app(routes, imports))
+    write_data_to_file(
+        views,
+        import_statements=imports,
+        file_name=VIEW_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
+    write_routing_module(export_folder=export_folder, use_tempdir=use_tempdir)
+
+
+def create_files_streaming(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    concurrency: Optional[Concurrency] = None,
+) -> None:
+    """
+    Writes the handlers while the paths are lowered one at a time, only the small route tree is kept until the end
+    """
+    imports = list(BASE_IMPORTS)
+    routes = RouteNode()
+    views = FragmentFileWriter(VIEW_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    for path in definition.iter_paths(consume=True):
+        views.write(create_view_func(path, routes, definition.names, imports=imports, concurrency=concurrency))
+    views.write(create_app(routes, imports))
+    views.close(imports)
+    write_routing_module(export_folder=export_folder, use_tempdir=use_tempdir)
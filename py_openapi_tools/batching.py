@@ -0,0 +1,175 @@
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools.naming import NameRegistry, to_function_name
+from py_openapi_tools.schema import ApiPath, Method, SchemaType
+from py_openapi_tools.utils import extension_flag, write_data_to_file
+
+LOADERS_FILE_NAME = "loaders"
+# per operation override, `x-batch-loader: false` loads every id on its own
+BATCH_LOADER_EXTENSION = "x-batch-loader"
+
+LOADER_IMPORT = f"from .{LOADERS_FILE_NAME} import DataLoader, shared_loader"
+LOADERS_MODULE_IMPORTS = ["import asyncio", "import inspect", "import weakref", "from typing import Any, Callable"]
+
+LOADERS_MODULE = '''
+class DataLoader:
+    """
+    Collects the keys requested within one event loop tick and loads them with a single `load_many(keys)` call
+    """
+
+    def __init__(self, load_many: Callable[[list], Any], *, cache: bool = True):
+        """
+        :param load_many: sync (run in a thread) or async, returns the values in the order of the keys or a dict
+            key -> value, missing keys resolve to None
+        :param cache: every key is loaded once per loader, without the cache a key is only shared within its batch
+        """
+        self._load_many = load_many
+        self._cache_values = cache
+        self._cache: dict[Any, asyncio.Future] = {}
+        # the keys and futures of the next `load_many` call
+        self._batch: list[tuple[Any, asyncio.Future]] = []
+        self._dispatches: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        # stable across requests, e.g. for the key of `single_flight`
+        return f"DataLoader({getattr(self._load_many, '__qualname__', self._load_many)})"
+
+    def load(self, key: Any) -> asyncio.Future:
+        if (future := self._cache.get(key)) is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._cache[key] = loop.create_future()
+        if not self._batch:
+            # runs after the tasks which are already scheduled, their keys join the batch
+            task = loop.create_task(self._dispatch())
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+        self._batch.append((key, future))
+        return future
+
+    async def load_many(self, keys: list) -> list:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, key: Any) -> None:
+        """
+        Drops a cached value, e.g. after the handler changed it
+        """
+        self._cache.pop(key, None)
+
+    async def _dispatch(self) -> None:
+        await asyncio.sleep(0)
+        batch, self._batch = self._batch, []
+        if not self._cache_values:
+            # later loads start the next batch, they never get a value which was loaded before they asked for it
+            for key, future in batch:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+        keys = [key for key, _ in batch]
+        try:
+            if inspect.iscoroutinefunction(self._load_many):
+                values = await self._load_many(keys)
+            else:
+                values = await asyncio.to_thread(self._load_many, keys)
+            if isinstance(values, dict):
+                values = [values.get(key) for key in keys]
+            else:
+                values = list(values)
+            if len(values) != len(keys):
+                raise ValueError(f"{self!r} returned {len(values)} values for {len(keys)} keys")
+        except Exception as exc:
+            for key, future in batch:
+                # failures aren't cached, the next load retries
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                future.set_exception(exc)
+            return
+        for (_, future), value in zip(batch, values):
+            future.set_result(value)
+
+
+# event loop -> load_many -> loader, a loop which is closed drops its loaders
+_shared_loaders: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def shared_loader(load_many: Callable[[list], Any]) -> DataLoader:
+    """
+    The loader of `load_many` for the running event loop, the keys which concurrent requests ask for within one tick
+    are loaded with one call. Nothing is cached beyond the batch, so requests never see the values of earlier ones
+    """
+    loaders = _shared_loaders.setdefault(asyncio.get_running_loop(), {})
+    if (loader := loaders.get(load_many)) is None:
+        loader = loaders[load_many] = DataLoader(load_many, cache=False)
+    return loader
+'''
+
+# the repository hook and the loader dependency of a by-id operation, generated next to its route
+LOADER_FUNCTIONS_TEMPLATE = Template("""
+def $load_many_function(ids: list[$id_type]) -> list[typing.Optional[$model_name]]:
+    # TODO replace me: load all `ids` with one query (e.g. `WHERE id IN ids`) and return them in the order of `ids`,
+    # None for missing ones, or as dict id -> value
+    return [None for _ in ids]
+
+
+async def $loader_function() -> DataLoader:
+    # shared by the concurrent requests, the ids they ask for within one event loop tick are loaded together
+    return shared_loader($load_many_function)
+""")
+
+
+def batch_loader_enabled(path: ApiPath, method: Method, *, default: bool = False) -> bool:
+    """
+    :param default: load the resources of the GET by-id operations without `x-batch-loader` through a batching loader
+    :return: true for a GET operation of a `/pets/{petId}` style path returning a single model if loaders are enabled
+    """
+    if (
+        not extension_flag(method.extensions, BATCH_LOADER_EXTENSION, default=default)
+        or method.request_type != "get"
+        or path.get_id_param() is None
+    ):
+        return False
+    response_schema = method.get_success_response_schema()
+    return (
+        response_schema is not None and response_schema.type != SchemaType.ARRAY and bool(response_schema.schema.name)
+    )
+
+
+def loader_function_names(method: Method, names: Optional[NameRegistry] = None, *, namespace: str) -> tuple[str, str]:
+    """
+    :return: the names of the `load_many` repository hook and of the loader factory of the operation
+    """
+    operation_ids = f"{method.operation_id}_load_many", f"{method.operation_id}_loader"
+    if names is None:
+        return to_function_name(operation_ids[0]), to_function_name(operation_ids[1])
+    return (
+        names.function_name(operation_ids[0], owner=f"load_many {method.operation_id}", namespace=namespace),
+        names.function_name(operation_ids[1], owner=f"loader {method.operation_id}", namespace=namespace),
+    )
+
+
+def create_loader_functions(load_many_function: str, loader_function: str, *, id_type: str, model_name: str) -> str:
+    return LOADER_FUNCTIONS_TEMPLATE.substitute(
+        load_many_function=load_many_function,
+        loader_function=loader_function,
+        id_type=id_type,
+        model_name=model_name,
+    )
+
+
+def write_loaders_module(
+    imports: list[str], *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    """
+    Writes the DataLoader if one of the generated routes uses it
+    :param imports: the import statements of a views module
+    """
+    if LOADER_IMPORT not in imports:
+        return
+    write_data_to_file(
+        [LOADERS_MODULE],
+        import_statements=LOADERS_MODULE_IMPORTS,
+        file_name=LOADERS_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
@@ -0,0 +1,393 @@
+import asyncio
+import functools
+import gc
+import importlib
+import inspect
+import io
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import unquote, urlencode
+
+from py_openapi_tools.loadtest import SampleRequest, sample_request
+from py_openapi_tools.schema import OpenAPIDefinition
+
+DEFAULT_ITERATIONS = 200
+DEFAULT_REPEAT = 5
+# calls before the measurement, fills the caches of the app and of the framework
+WARMUP_ITERATIONS = 10
+# the allocations are traced for this many calls, tracing slows every allocation down
+TRACED_ITERATIONS = 20
+SERVER = ("127.0.0.1", 8000)
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    operation_id: str
+    method: str
+    path: str
+    status_code: int
+    ops_per_sec: float
+    mean_us: float
+    # peak of the traced memory while handling one request, not the sum of its allocations: CPython only counts the
+    # blocks which are alive, the number of allocations of a call isn't available
+    peak_bytes: int
+    # memory blocks which are still allocated after a request, caches and leaks let it grow
+    retained_blocks: float
+    # ops/sec of the same operation in the baseline report
+    baseline_ops_per_sec: Optional[float] = None
+
+
+def load_app(target: str, *, app_dir: Optional[Path] = None) -> Callable:
+    """
+    :param target: `module:attribute` of an ASGI app or WSGI application, e.g. `views:app` or
+    `mysite.wsgi:application`
+    :param app_dir: put in front of `sys.path`, the module is imported from there
+    :raises ValueError: if the target isn't `module:attribute` or the attribute isn't callable
+    """
+    module_name, _, attribute = target.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"{target!r} isn't module:attribute")
+    if app_dir is not None:
+        sys.path.insert(0, str(app_dir.resolve()))
+    app = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        app = getattr(app, name)
+    if not callable(app):
+        raise ValueError(f"{target} isn't callable")
+    return app
+
+
+def is_asgi(app: Callable) -> bool:
+    return inspect.iscoroutinefunction(app) or inspect.iscoroutinefunction(getattr(app, "__call__", None))
+
+
+def query_string(request: SampleRequest) -> str:
+    query = {
+        key: [("true" if obj else "false") if isinstance(obj, bool) else obj for obj in val]
+        for key, val in ((key, val if isinstance(val, list) else [val]) for key, val in request.query.items())
+    }
+    return urlencode(query, doseq=True)
+
+
+def request_body(request: SampleRequest) -> bytes:
+    return b"" if request.body is None else json.dumps(request.body).encode()
+
+
+def request_headers(request: SampleRequest, headers: dict[str, str]) -> dict[str, str]:
+    """
+    :return: lower case name -> value, the host, the content headers and the headers of the operation
+    """
+    res = {"host": f"{SERVER[0]}:{SERVER[1]}", "content-length": str(len(request_body(request)))}
+    if request.body is not None:
+        res["content-type"] = "application/json"
+    res.update({key.lower(): val for key, val in {**request.headers, **headers}.items()})
+    return res
+
+
+def asgi_call(
+    app: Callable, request: SampleRequest, *, headers: dict[str, str], state: dict[str, Any]
+) -> Callable[[], Awaitable[int]]:
+    """
+    :param state: the state of the lifespan, every request gets a copy
+    :return: calls the app with the request like an ASGI server, returns the status code
+    """
+    body = request_body(request)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": request.method,
+        "scheme": "http",
+        "path": unquote(request.path),
+        "raw_path": request.path.encode(),
+        "query_string": query_string(request).encode(),
+        "root_path": "",
+        "headers": [(key.encode(), val.encode("latin-1")) for key, val in request_headers(request, headers).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": SERVER,
+    }
+
+    async def call() -> int:
+        status_code = 0
+        received = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal received
+            if received:
+                # the client stays connected, like a keep-alive connection
+                await asyncio.get_running_loop().create_future()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        await app({**scope, "headers": list(scope["headers"]), "state": dict(state)}, receive, send)
+        return status_code
+
+    return call
+
+
+def wsgi_call(app: Callable, request: SampleRequest, *, headers: dict[str, str]) -> Callable[[], int]:
+    """
+    :return: calls the application with the request like a WSGI server, returns the status code
+    """
+    body = request_body(request)
+    environ = {
+        "REQUEST_METHOD": request.method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": unquote(request.path),
+        "QUERY_STRING": query_string(request),
+        "SERVER_NAME": SERVER[0],
+        "SERVER_PORT": str(SERVER[1]),
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for key, val in request_headers(request, headers).items():
+        name = key.upper().replace("-", "_")
+        environ[name if name in ("CONTENT_LENGTH", "CONTENT_TYPE") else f"HTTP_{name}"] = val
+
+    def call() -> int:
+        status_codes = []
+
+        def start_response(status: str, response_headers: list, exc_info=None) -> Callable[[bytes], None]:
+            status_codes.append(int(status.split(" ", 1)[0]))
+            return lambda data: None
+
+        result = app({**environ, "wsgi.input": io.BytesIO(body)}, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return status_codes[-1]
+
+    return call
+
+
+async def start_lifespan(app: Callable, state: dict[str, Any]) -> Optional[Callable[[], Awaitable[None]]]:
+    """
+    Runs the startup of the app, apps without lifespan support are fine
+    :return: the shutdown, None if the app doesn't support the lifespan
+    :raises RuntimeError: if the startup failed
+    """
+    messages = asyncio.Queue()
+    events = asyncio.Queue()
+
+    async def run() -> None:
+        try:
+            await app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": state}, messages.get, events.put)
+        except Exception:
+            pass
+        finally:
+            await events.put({"type": "lifespan.unsupported"})
+
+    task = asyncio.ensure_future(run())
+    await messages.put({"type": "lifespan.startup"})
+    event = await events.get()
+    if event["type"] == "lifespan.startup.failed":
+        raise RuntimeError(f"The startup of the app failed: {event.get('message', '')}")
+    if event["type"] != "lifespan.startup.complete":
+        return None
+
+    async def shutdown() -> None:
+        await messages.put({"type": "lifespan.shutdown"})
+        await events.get()
+        await task
+
+    return shutdown
+
+
+def repeat_call(call: Callable[[], int], count: int) -> int:
+    status_code = 0
+    for _ in range(count):
+        status_code = call()
+    return status_code
+
+
+def trace_call(call: Callable[[], int], count: int) -> int:
+    """
+    :return: the sum of the allocation peaks of the calls, tracemalloc has to be started
+    """
+    allocated = 0
+    for _ in range(count):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call()
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    return allocated
+
+
+async def repeat_async_call(call: Callable[[], Awaitable[int]], count: int) -> int:
+    status_code = 0
+    for _ in range(count):
+        status_code = await call()
+    return status_code
+
+
+async def trace_async_call(call: Callable[[], Awaitable[int]], count: int) -> int:
+    allocated = 0
+    for _ in range(count):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await call()
+        allocated += tracemalloc.get_traced_memory()[1] - current
+    return allocated
+
+
+def measure(
+    invoke: Callable[[int], int], trace: Callable[[int], int], *, iterations: int, repeat: int
+) -> tuple[int, float, int, float]:
+    """
+    :param invoke: calls the operation n times, returns the last status code
+    :param trace: calls the operation n times, returns the sum of their allocation peaks
+    :return: the status code, the seconds of the fastest repetition, the mean peak of the allocated bytes and the
+    retained memory blocks per call
+    """
+    status_code = invoke(WARMUP_ITERATIONS)
+
+    # like timeit, the garbage collector doesn't run while timing
+    gc.collect()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            invoke(iterations)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    invoke(iterations)
+    gc.collect()
+    retained_blocks = (sys.getallocatedblocks() - blocks) / iterations
+
+    tracemalloc.start()
+    try:
+        allocated = trace(TRACED_ITERATIONS)
+    finally:
+        tracemalloc.stop()
+    return status_code, best, allocated // TRACED_ITERATIONS, retained_blocks
+
+
+def run_async(
+    loop: asyncio.AbstractEventLoop,
+    runner: Callable[[Callable[[], Awaitable[int]], int], Awaitable[int]],
+    call: Callable[[], Awaitable[int]],
+    count: int,
+) -> int:
+    return loop.run_until_complete(runner(call, count))
+
+
+def sample_requests(definition: OpenAPIDefinition, operation_ids: tuple[str, ...] = ()) -> list[SampleRequest]:
+    """
+    :param operation_ids: only these operations, all if empty
+    """
+    return [
+        sample_request(path, method, definition)
+        for path in definition.paths
+        for method in path.methods
+        if not operation_ids or method.operation_id in operation_ids
+    ]
+
+
+def benchmark(
+    app: Callable,
+    requests: list[SampleRequest],
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    repeat: int = DEFAULT_REPEAT,
+    headers: Optional[dict[str, str]] = None,
+) -> list[BenchmarkResult]:
+    """
+    Calls the app in-process with the example request of every operation, no sockets involved. ASGI apps run in one
+    event loop, their lifespan is started before and shut down after the measurement
+    :param app: an ASGI app or a WSGI application
+    :param headers: sent with every request, e.g. `{"Authorization": "Bearer ..."}`
+    """
+    headers = headers or {}
+    results = []
+    loop = asyncio.new_event_loop() if is_asgi(app) else None
+    try:
+        state = {}
+        shutdown = loop.run_until_complete(start_lifespan(app, state)) if loop is not None else None
+        for request in requests:
+            if loop is not None:
+                async_call = asgi_call(app, request, headers=headers, state=state)
+                invoke = functools.partial(run_async, loop, repeat_async_call, async_call)
+                trace = functools.partial(run_async, loop, trace_async_call, async_call)
+            else:
+                call = wsgi_call(app, request, headers=headers)
+                invoke = functools.partial(repeat_call, call)
+                trace = functools.partial(trace_call, call)
+            status_code, seconds, allocated, retained_blocks = measure(
+                invoke, trace, iterations=iterations, repeat=repeat
+            )
+            if not 200 <= status_code < 400:
+                print(f"Operation {request.operation_id}: answered {status_code}, the error path is measured")
+            results.append(
+                BenchmarkResult(
+                    operation_id=request.operation_id,
+                    method=request.method,
+                    path=request.path,
+                    status_code=status_code,
+                    ops_per_sec=round(iterations / seconds, 1),
+                    mean_us=round(seconds / iterations * 1_000_000, 2),
+                    peak_bytes=allocated,
+                    retained_blocks=round(retained_blocks, 2),
+                )
+            )
+        if shutdown is not None:
+            loop.run_until_complete(shutdown())
+    finally:
+        if loop is not None:
+            loop.close()
+    return results
+
+
+def apply_baseline(results: list[BenchmarkResult], baseline: list[dict[str, Any]]) -> None:
+    """
+    :param baseline: the JSON report of an earlier run, e.g. before switching `--models`
+    """
+    ops_per_sec = {obj["operation_id"]: obj["ops_per_sec"] for obj in baseline}
+    for result in results:
+        result.baseline_ops_per_sec = ops_per_sec.get(result.operation_id)
+
+
+def results_to_json(results: list[BenchmarkResult]) -> str:
+    return json.dumps([asdict(obj) for obj in results], indent=2)
+
+
+def results_to_text(results: list[BenchmarkResult]) -> str:
+    width = max([len("operation"), *(len(obj.operation_id) for obj in results)])
+    header = (
+        f"{'operation':<{width}}{'status':>8}{'ops/sec':>12}{'mean us':>12}{'peak bytes':>12}{'retained blocks':>17}"
+    )
+    if any(obj.baseline_ops_per_sec for obj in results):
+        header += f"{'change':>11}"
+    lines = [header]
+    for obj in results:
+        line = (
+            f"{obj.operation_id:<{width}}{obj.status_code:>8}{obj.ops_per_sec:>12}{obj.mean_us:>12}"
+            f"{obj.peak_bytes:>12}{obj.retained_blocks:>17}"
+        )
+        if obj.baseline_ops_per_sec:
+            line += f"{(obj.ops_per_sec / obj.baseline_ops_per_sec - 1) * 100:>+10.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
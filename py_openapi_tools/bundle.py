@@ -0,0 +1,34 @@
+import datetime as dt
+import json
+from pathlib import Path
+
+from py_openapi_tools.schema import OpenAPIDefinition
+
+BUNDLE_FILE_NAME = "openapi.json"
+
+
+def _json_default(value) -> str:
+    # yaml turns unquoted dates into date objects
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def canonicalize(data: dict) -> str:
+    """
+    Minified JSON with sorted keys, the same document always results in the same bytes
+    """
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+
+def bundle(definition: OpenAPIDefinition) -> str:
+    """
+    :param definition: the openapi definition, it doesn't need to be parsed
+    :return: the fully dereferenced and canonicalized spec
+    """
+    return canonicalize(definition.dereferenced_data())
+
+
+def write_bundle(definition: OpenAPIDefinition, output: Path) -> Path:
+    output.write_text(bundle(definition) + "\n", encoding="utf-8")
+    return output
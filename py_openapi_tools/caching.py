@@ -0,0 +1,212 @@
+from pathlib import Path
+from typing import Optional
+
+from py_openapi_tools.schema import ApiPath, Method
+from py_openapi_tools.utils import write_data_to_file
+
+CACHE_FILE_NAME = "response_cache"
+# seconds a GET response is cached, `x-cache-ttl: 30`
+CACHE_TTL_EXTENSION = "x-cache-ttl"
+
+WRITE_METHODS = ("post", "put", "patch", "delete")
+
+CACHE_LOOKUP_IMPORT = f"from .{CACHE_FILE_NAME} import cache_key, get_backend"
+CACHE_INVALIDATION_IMPORT = f"from .{CACHE_FILE_NAME} import invalidates"
+CACHE_MODULE_IMPORTS = [
+    "import functools",
+    "import inspect",
+    "import json",
+    "import threading",
+    "import time",
+    "from collections import OrderedDict",
+    "from typing import Any, Callable, Optional, Protocol",
+]
+
+CACHE_MODULE = '''
+MAX_ENTRIES = 1024
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class CacheBackend(Protocol):
+    def get(self, key: tuple) -> Optional[bytes]: ...
+
+    def set(self, key: tuple, value: bytes, ttl: float) -> None: ...
+
+    def invalidate(self, prefix: tuple) -> None:
+        """
+        Removes every entry whose key starts with `prefix`, i.e. all cached queries of one resource
+        """
+
+
+class LRUCache:
+    """
+    The in-memory default, evicts the least recently used entry once `max_entries` are stored
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        # key -> (expires at, value)
+        self._entries: OrderedDict[tuple, tuple[float, bytes]] = OrderedDict()
+        # resource (path, path params) -> its keys
+        self._resources: dict[tuple, set[tuple]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self.clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: tuple, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            self._resources.setdefault(key[:2], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, prefix: tuple) -> None:
+        with self._lock:
+            for key in self._resources.pop(prefix, ()):
+                self._entries.pop(key, None)
+
+    def _remove(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+        if keys := self._resources.get(key[:2]):
+            keys.discard(key)
+            if not keys:
+                del self._resources[key[:2]]
+
+
+_backend: CacheBackend = LRUCache()
+
+
+def configure_backend(backend: CacheBackend) -> None:
+    """
+    Replaces the in-memory cache, e.g. with a shared one if the app runs in several processes
+    """
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> CacheBackend:
+    return _backend
+
+
+def cache_prefix(path: str, path_params: dict[str, Any]) -> tuple:
+    return path, json.dumps(path_params, sort_keys=True, default=str)
+
+
+def cache_key(
+    path: str, path_params: dict[str, Any], query: Optional[dict[str, Any]] = None, principal: Any = None
+) -> tuple:
+    """
+    :param path: the path of the operation as written in the spec
+    :param query: the validated query parameters, their order doesn't matter
+    :param principal: the credentials or the user of a secured operation, users don't share cached responses
+    """
+    return (
+        *cache_prefix(path, path_params),
+        json.dumps(query or {}, sort_keys=True, default=str),
+        json.dumps(principal, sort_keys=True, default=str),
+    )
+
+
+def invalidates(path: str, *params: str):
+    """
+    Removes the cached GET responses of the resource after a successful write, GET requests of a view which handles
+    several methods are ignored
+    :param params: the names of the path parameters of the handler
+    """
+
+    def invalidate(args: tuple, kwargs: dict, result: Any) -> None:
+        if args and getattr(args[0], "method", None) in SAFE_METHODS:
+            return
+        if getattr(result, "status_code", 200) < 400:
+            _backend.invalidate(cache_prefix(path, {name: kwargs.get(name) for name in params}))
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await func(*args, **kwargs)
+                invalidate(args, kwargs, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            invalidate(args, kwargs, result)
+            return result
+
+        return wrapper
+
+    return decorator
+'''
+
+
+def get_cache_ttl(method: Method) -> Optional[float]:
+    """
+    :return: the seconds the response of a GET operation is cached, None if it isn't cached
+    """
+    if method.request_type != "get" or (ttl := method.extensions.get(CACHE_TTL_EXTENSION)) is None:
+        return None
+    try:
+        ttl = float(ttl)
+    except (TypeError, ValueError):
+        print(f"Ignored {CACHE_TTL_EXTENSION}: {ttl} of {method.operation_id}, expected seconds")
+        return None
+    return ttl if ttl > 0 else None
+
+
+def invalidates_cache(path: ApiPath, method: Optional[Method] = None) -> bool:
+    """
+    :param method: a single write operation, all operations of the path if omitted
+    :return: true if a GET operation of the path is cached and writes of `method` have to invalidate it
+    """
+    if method is not None and method.request_type not in WRITE_METHODS:
+        return False
+    if method is None and not any(obj.request_type in WRITE_METHODS for obj in path.methods):
+        return False
+    return any(get_cache_ttl(obj) is not None for obj in path.methods)
+
+
+def create_invalidation_decorator(path: ApiPath, params: list[str]) -> str:
+    """
+    :param params: the names of the path parameters as the handler receives them
+    """
+    args = [f'"{obj}"' for obj in [path.path, *params]]
+    return f"@invalidates({', '.join(args)})"
+
+
+def format_key_params(params: list[str]) -> str:
+    """
+    :return: the dict literal of parameters the handler receives, used for the cache key
+    """
+    return "{" + ", ".join(f'"{obj}": {obj}' for obj in params) + "}"
+
+
+def write_cache_module(imports: list[str], *, export_folder: Optional[Path] = None, use_tempdir: bool = False) -> None:
+    """
+    Writes the response cache if one of the generated views uses it
+    :param imports: the import statements of a views module
+    """
+    if CACHE_LOOKUP_IMPORT not in imports and CACHE_INVALIDATION_IMPORT not in imports:
+        return
+    write_data_to_file(
+        [CACHE_MODULE],
+        import_statements=CACHE_MODULE_IMPORTS,
+        file_name=CACHE_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
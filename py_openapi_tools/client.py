@@ -0,0 +1,346 @@
+import re
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools import hooks
+from py_openapi_tools.fastapi import SERIALIZER_FILE_NAME, create_adapter
+from py_openapi_tools.naming import NameRegistry, to_argument_name, to_class_name, to_function_name
+from py_openapi_tools.schema import ApiPath, Method, OpenAPIDefinition, SchemaType
+from py_openapi_tools.utils import INDENT, add_unique, write_data_to_file
+
+CLIENT_FILE_NAME = "client"
+# per operation timeout in seconds, e.g. `x-timeout: 2.5`
+TIMEOUT_EXTENSION = "x-timeout"
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_BASE_URL = "http://localhost"
+
+BASE_IMPORTS = [
+    "import asyncio",
+    "import threading",
+    "import typing",
+    "import weakref",
+    "from concurrent.futures import ThreadPoolExecutor",
+    "from urllib.parse import quote",
+    "import httpx",
+]
+
+# the pooled transports and the helpers every generated client shares
+CLIENT_RUNTIME = Template('''
+BASE_URL = "$base_url"
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+T = typing.TypeVar("T")
+
+_clients: dict[str, httpx.Client] = {}
+# the connections of an async client belong to the event loop which opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status_code: int, content: str):
+        super().__init__(f"{status_code}: {content}")
+        self.status_code = status_code
+        self.content = content
+
+
+def get_client(base_url: str = BASE_URL) -> httpx.Client:
+    """
+    :return: the keep-alive client of the base URL, shared by every `Client`
+    """
+    with _clients_lock:
+        if (client := _clients.get(base_url)) is None:
+            client = _clients[base_url] = httpx.Client(base_url=base_url, limits=POOL_LIMITS)
+        return client
+
+
+def get_async_client(base_url: str = BASE_URL) -> httpx.AsyncClient:
+    """
+    :return: the keep-alive client of the base URL in the running event loop, shared by every `AsyncClient`
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if (client := clients.get(base_url)) is None:
+        client = clients[base_url] = httpx.AsyncClient(base_url=base_url, limits=POOL_LIMITS)
+    return client
+
+
+def close_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_clients() -> None:
+    """
+    Closes the async clients of the running event loop
+    """
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def fan_out(calls: typing.Iterable[typing.Callable[[], T]], *, max_concurrency: int = 8) -> list[T]:
+    """
+    Runs the calls in threads, at most `max_concurrency` at a time, e.g.
+    `fan_out([functools.partial(client.get_pet, obj) for obj in ids])`
+    :return: the results in the order of the calls, the first failure is raised
+    """
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return list(pool.map(lambda call: call(), calls))
+
+
+async def afan_out(
+    calls: typing.Iterable[typing.Callable[[], typing.Awaitable[T]]], *, max_concurrency: int = 8
+) -> list[T]:
+    """
+    Awaits the calls, at most `max_concurrency` at a time, e.g.
+    `await afan_out([functools.partial(client.get_pet, obj) for obj in ids])`
+    :return: the results in the order of the calls, the first failure is raised
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(call: typing.Callable[[], typing.Awaitable[T]]) -> T:
+        async with semaphore:
+            return await call()
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+
+def request_kwargs(
+    headers: dict[str, str], extra_headers: dict[str, typing.Any], params: dict[str, typing.Any]
+) -> dict[str, typing.Any]:
+    # parameters without a value aren't sent
+    return {
+        "headers": {**headers, **{key: str(val) for key, val in extra_headers.items() if val is not None}},
+        "params": {key: val for key, val in params.items() if val is not None},
+    }
+
+
+def check_response(response: httpx.Response) -> httpx.Response:
+    if response.is_error:
+        raise ApiError(response.status_code, response.text)
+    return response
+''')
+
+CLIENT_CLASS_TEMPLATE = Template('''
+class $class_name:
+    """
+    $docstring
+    :param headers: sent with every request, e.g. `{"Authorization": "Bearer ..."}`
+    :param transport: a dedicated transport instead of the pooled one, e.g. `$transport_example` for tests
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        *,
+        headers: typing.Optional[dict[str, str]] = None,
+        transport: typing.Optional[$transport_type] = None,
+    ):
+        self.headers = headers or {}
+        if transport is None:
+            self._client = $get_client(base_url)
+        else:
+            self._client = $client_type(base_url=base_url, transport=transport)
+
+    $def_keyword _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: float,
+        headers: typing.Optional[dict[str, typing.Any]] = None,
+        params: typing.Optional[dict[str, typing.Any]] = None,
+        json: typing.Any = None,
+    ) -> httpx.Response:
+        response = ${await}self._client.request(
+            method, url, json=json, timeout=timeout, **request_kwargs(self.headers, headers or {}, params or {})
+        )
+        return check_response(response)
+$methods
+''')
+
+method_template = Template("""
+$def_keyword $function_name(self$params) -> $result:
+    response = ${await}self._request($arguments)
+    return $parse
+""")
+
+
+def get_base_url(definition: OpenAPIDefinition) -> str:
+    """
+    :return: the URL of the first server, its variables replaced by their defaults
+    """
+    servers = definition.openapi_data.get("servers") or [{}]
+    url = servers[0].get("url", DEFAULT_BASE_URL)
+    variables = servers[0].get("variables", {})
+    url = re.sub(r"\{([^}]+)\}", lambda match: str(variables.get(match.group(1), {}).get("default", "")), url)
+    return url.rstrip("/") or DEFAULT_BASE_URL
+
+
+def get_timeout(method: Method) -> float:
+    if (value := method.extensions.get(TIMEOUT_EXTENSION)) is not None:
+        try:
+            if (timeout := float(value)) > 0:
+                return timeout
+        except (TypeError, ValueError):
+            pass
+        print(f"Operation {method.operation_id}: invalid {TIMEOUT_EXTENSION} {value!r}, using {DEFAULT_TIMEOUT}")
+    return DEFAULT_TIMEOUT
+
+
+def create_client_method(
+    path: ApiPath,
+    method: Method,
+    names: Optional[NameRegistry] = None,
+    *,
+    asynchronous: bool = False,
+    imports: list[str],
+    adapter_definitions: list[str],
+) -> Optional[str]:
+    """
+    Path parameters and the body are positional, query and header parameters keyword-only
+    """
+    if method.request_type not in ("get", "post", "put", "patch", "delete"):
+        return None
+    if names is None:
+        function_name = to_function_name(method.operation_id)
+    else:
+        function_name = names.function_name(
+            method.operation_id, owner=f"{method.request_type.upper()} {path.path}", namespace="client"
+        )
+
+    declared = {obj.name: obj for obj in method.parameters if obj.position == "path"}
+
+    def placeholder(match: re.Match) -> str:
+        return f"{{quote(str({to_argument_name(match.group(1))}), safe='')}}"
+
+    params = []
+    for name in re.findall(r"\{([^}]+)\}", path.path):
+        type_hint = declared[name].schema.get_type_hint_str() if name in declared else "str"
+        params.append(f"{to_argument_name(name)}: {type_hint}")
+    url = re.sub(r"\{([^}]+)\}", placeholder, path.path)
+    arguments = [f'"{method.request_type.upper()}"', f'f"{url}"' if url != path.path else f'"{url}"']
+
+    if method.request_type in ("post", "put", "patch") and method.request_schema.properties:
+        if request_model := method.request_schema.class_name:
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {request_model}")
+            params.append(f"body: {request_model}")
+            arguments.append('json=body.model_dump(mode="json", by_alias=True, exclude_unset=True)')
+        else:
+            params.append("body: typing.Any")
+            arguments.append("json=body")
+
+    keyword_params = []
+    for position, argument in (("query", "params"), ("header", "headers")):
+        values = []
+        # required parameters first, the optional ones have a default
+        for obj in sorted(
+            (obj for obj in method.parameters if obj.position == position), key=lambda obj: not obj.required
+        ):
+            type_hint = obj.schema.get_type_hint_str() or "str"
+            if obj.required:
+                keyword_params.append(f"{to_argument_name(obj.name)}: {type_hint}")
+            else:
+                keyword_params.append(f"{to_argument_name(obj.name)}: typing.Optional[{type_hint}] = None")
+            values.append(f'"{obj.name}": {to_argument_name(obj.name)}')
+        if values:
+            arguments.append(f"{argument}={{{', '.join(values)}}}")
+    keyword_params.append("timeout: typing.Optional[float] = None")
+    arguments.append(f"timeout={get_timeout(method)} if timeout is None else timeout")
+
+    result = "None"
+    parse = "None"
+    if response_schema := method.get_success_response_schema():
+        if model_name := response_schema.schema.class_name:
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {model_name}")
+            result = f"list[{model_name}]" if response_schema.type == SchemaType.ARRAY else model_name
+            parse = f"{create_adapter(result, imports, adapter_definitions)}.validate_json(response.content)"
+        else:
+            result = "typing.Any"
+            parse = "response.json()"
+
+    return method_template.substitute(
+        def_keyword="async def" if asynchronous else "def",
+        function_name=function_name,
+        params="".join(f", {obj}" for obj in [*params, "*", *keyword_params]),
+        result=result,
+        arguments=", ".join(arguments),
+        parse=parse,
+        **{"await": "await " if asynchronous else ""},
+    )
+
+
+def create_client_class(
+    definition: OpenAPIDefinition,
+    *,
+    asynchronous: bool = False,
+    imports: list[str],
+    adapter_definitions: list[str],
+) -> str:
+    methods = []
+    for path in definition.paths:
+        for method in path.methods:
+            method_txt = create_client_method(
+                path,
+                method,
+                definition.names,
+                asynchronous=asynchronous,
+                imports=imports,
+                adapter_definitions=adapter_definitions,
+            )
+            if method_txt is None:
+                continue
+            method_txt = hooks.get_registry().call(
+                "per_operation_emit", method_txt, path=path, methods=[method], framework="client"
+            )
+            methods.append("\n".join(f"{INDENT}{line}" if line else line for line in method_txt.splitlines()))
+    if asynchronous:
+        return CLIENT_CLASS_TEMPLATE.substitute(
+            class_name="AsyncClient",
+            docstring="Sends the requests through the pooled keep-alive client of its base URL and event loop",
+            transport_example="httpx.ASGITransport(app)",
+            transport_type="httpx.AsyncBaseTransport",
+            get_client="get_async_client",
+            client_type="httpx.AsyncClient",
+            def_keyword="async def",
+            methods="\n".join(methods),
+            **{"await": "await "},
+        )
+    return CLIENT_CLASS_TEMPLATE.substitute(
+        class_name="Client",
+        docstring="Sends the requests through the pooled keep-alive client of its base URL",
+        transport_example="httpx.MockTransport(handler)",
+        transport_type="httpx.BaseTransport",
+        get_client="get_client",
+        client_type="httpx.Client",
+        def_keyword="def",
+        methods="\n".join(methods),
+        **{"await": ""},
+    )
+
+
+def create_client_file(
+    definition: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    """
+    Writes the sync `Client` and the `AsyncClient` of the spec, the models are the pydantic models of
+    `fastapi.create_serializer_file`
+    """
+    imports = list(BASE_IMPORTS)
+    adapter_definitions = []
+    classes = [
+        create_client_class(definition, imports=imports, adapter_definitions=adapter_definitions),
+        create_client_class(definition, asynchronous=True, imports=imports, adapter_definitions=adapter_definitions),
+    ]
+    write_data_to_file(
+        [CLIENT_RUNTIME.substitute(base_url=get_base_url(definition)), *classes],
+        import_statements=imports + adapter_definitions,
+        file_name=CLIENT_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
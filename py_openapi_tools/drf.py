@@ -12,12 +12,46 @@ from py_openapi_tools.schema import (
     ApiPath,
     AuthType,
     ADDITIONAL_PROPERTIES,
+    NDJSON_MEDIA_TYPE,
     PYTHON_TYPE_MAPPING,
 )
+from py_openapi_tools import hooks
+from py_openapi_tools.caching import (
+    CACHE_INVALIDATION_IMPORT,
+    CACHE_LOOKUP_IMPORT,
+    create_invalidation_decorator,
+    format_key_params,
+    get_cache_ttl,
+    invalidates_cache,
+    write_cache_module,
+)
+from py_openapi_tools.etags import (
+    CONDITIONAL_GET_IMPORT,
+    PRECONDITION_IMPORT,
+    create_version_function,
+    etags_enabled,
+    version_function_name,
+    write_etag_module,
+)
+from py_openapi_tools.pagination import (
+    CURSOR_PARAMETER,
+    PAGINATION_IMPORT,
+    KeysetPagination,
+    create_page_function,
+    get_keyset_pagination,
+    page_function_name,
+    write_pagination_module,
+)
+from py_openapi_tools.naming import NameRegistry, to_class_name, to_snake_case
+from py_openapi_tools.patterns import PatternRegistry, allows_slow_pattern, check_pattern, get_pattern
+from py_openapi_tools.sharding import SHARD_SELECTION_IMPORTS, ShardBy, create_shard_selection, shard_paths
 from py_openapi_tools.utils import (
+    Concurrency,
+    FragmentFileWriter,
     HTTPResponse,
-    convert_camel_case_to_snake_case,
-    to_class_name,
+    add_unique,
+    check_features,
+    get_concurrency,
     write_data_to_file,
     INDENT,
 )
@@ -33,7 +67,12 @@ SERIALIZERS = {
     "regex": "serializers.RegexField",
 }
 
+SERIALIZER_FILE_NAME = "serializers"
+VIEW_FILE_NAME = "views"
+URLS_FILE_NAME = "urls"
+
 INITIAL_FILE_INPUTS = ["from rest_framework import serializers"]
+SERIALIZER_WILDCARD_IMPORT = "from serializers import *"
 INITIAL_VIEW_FILE_INPUTS = [
     "import typing",
     "from django.http import HttpResponse",
@@ -44,8 +83,28 @@ INITIAL_VIEW_FILE_INPUTS = [
     "from rest_framework.decorators import api_view",
     "from django.db import IntegrityError",
     "from rest_framework.serializers import Serializer",
-    "from serializers import *",
+    SERIALIZER_WILDCARD_IMPORT,
 ]
+# async views need the `adrf` package, DRF's own `api_view` only wraps sync functions
+ASYNC_VIEW_IMPORTS = [
+    "from adrf.decorators import api_view as async_api_view",
+    "from asgiref.sync import sync_to_async",
+]
+STREAMING_IMPORTS = [
+    "from django.http import StreamingHttpResponse",
+    "from rest_framework.renderers import JSONRenderer",
+]
+# the features one view template can't combine
+EXCLUSIVE_FEATURES = (
+    ("keyset pagination", "streaming"),
+    ("keyset pagination", "ETags"),
+    ("keyset pagination", "response cache"),
+    ("streaming", "ETags"),
+    ("streaming", "response cache"),
+)
+SYNC_SAVE = "serializer.save()"
+# the ORM can't be used from the event loop
+ASYNC_SAVE = "await sync_to_async(serializer.save)()"
 
 
 def to_drf_status_code(code: HTTPResponse) -> str:
@@ -164,20 +223,34 @@ def to_drf_status_code(code: HTTPResponse) -> str:
             return ""
 
 
+def serializer_name(schema_name: str) -> str:
+    return f"{to_class_name(schema_name)}Serializer"
+
+
+# constraints whose serializer field argument isn't the snake case name
+SERIALIZER_ARGUMENTS = {"minimum": "min_value", "maximum": "max_value"}
+
+
 def create_serializer_additional_parameters(prop: Property) -> list[str] | None:
     function_params = []
     if not hasattr(prop.type, "__name__"):
         return None
     for elem in ADDITIONAL_PROPERTIES.get(PYTHON_TYPE_MAPPING.get(prop.type, ""), []):
         if data := prop.additional_requirements.get(elem):
-            function_params.append(f"{convert_camel_case_to_snake_case(elem)}={data}")
+            function_params.append(f"{SERIALIZER_ARGUMENTS.get(elem, to_snake_case(elem))}={data}")
 
     if function_params:
         return function_params
     return None
 
 
-def serializer_func_from_property_type(prop: Property) -> str:
+def serializer_func_from_property_type(
+    prop: Property, patterns: Optional[PatternRegistry] = None, *, schema_name: str = ""
+) -> str:
+    """
+    :param patterns: collects the patterns as module level constants, the pattern is inlined if omitted
+    :param schema_name: the schema the property belongs to, used for the name of the pattern constant
+    """
     serializer_class = ""
     function_params = []
     function_params_str = "()"
@@ -185,7 +258,7 @@ def serializer_func_from_property_type(prop: Property) -> str:
     if not hasattr(prop.type, "__name__"):
         if prop.ref:
             if prop.ref.properties:
-                serializer_class = f"{prop.ref.name}Serializer"
+                serializer_class = serializer_name(prop.ref.class_name)
             else:
                 try:
                     serializer_class = SERIALIZERS.get(prop.ref.typ.to_python_type().__name__.lower(), "str")
@@ -204,7 +277,7 @@ def serializer_func_from_property_type(prop: Property) -> str:
             case "list":
                 if hasattr(prop.ref, "name") and prop.ref.name:
                     function_params.append("many=True")
-                    serializer_class = f"{prop.ref.name.title()}Serializer"
+                    serializer_class = serializer_name(prop.ref.class_name)
                 elif isinstance(prop.ref, Property):
                     return f"serializers.ListField(child={SERIALIZERS[prop.ref.type.__name__.lower()]}{function_params_str})"
                 else:
@@ -215,12 +288,17 @@ def serializer_func_from_property_type(prop: Property) -> str:
             case "str":
                 if prop.example and ("@" in prop.example or "email" in prop.name):
                     serializer_class = SERIALIZERS["email"]
-                elif "pattern" in prop.additional_requirements:
-                    data = {obj[0]: obj[1] for obj in [val.split("=") for val in function_params]}
-                    function_params = [f"{key}={val}" for key, val in data.items() if key != "pattern"]
-                    function_params[0] = data["pattern"]
-                    function_params_str = f"({', '.join(function_params)})"
+                elif pattern := get_pattern(prop):
+                    function_params = [obj for obj in function_params if not obj.startswith("pattern=")]
+                    hint = f"{schema_name}_{prop.name}"
+                    if patterns is None:
+                        check_pattern(pattern, hint=hint, allow_exponential=allows_slow_pattern(prop))
+                        regex = prop.additional_requirements["pattern"]
+                    else:
+                        regex = patterns.constant(pattern, hint=hint, allow_exponential=allows_slow_pattern(prop))
+                    function_params.insert(0, regex)
                     serializer_class = SERIALIZERS["regex"]
+                    function_params_str = f"({', '.join(function_params)})"
                 else:
                     serializer_class = SERIALIZERS["str"]
             case "datetime" | "date":
@@ -235,17 +313,25 @@ def serializer_func_from_property_type(prop: Property) -> str:
                 serializer_class = SERIALIZERS["bool"]
             case _:
                 if prop.ref:
-                    serializer_class = f"{prop.ref.name.title()}Serializer"
+                    serializer_class = serializer_name(prop.ref.class_name)
                 else:
                     serializer_class = "None"
     return f"{serializer_class}{function_params_str}"
 
 
-def schema_to_drf(schema_name: str, schema: Schema) -> str:
+def schema_to_drf(
+    schema_name: str,
+    schema: Schema,
+    patterns: Optional[PatternRegistry] = None,
+    *,
+    exclude: frozenset[str] = frozenset(),
+) -> str:
     """
     Converts the openapi schema to the body of a Serializer class from django-rest-framework
     :param schema_name: the name of the schema, used for the class name
     :param schema: a Schema object from the openapi definition
+    :param patterns: collects the patterns of the properties as module level constants
+    :param exclude: the names of the properties which get no field
     :return: the string body for django-rest-framework serializer class
     """
 
@@ -254,16 +340,23 @@ def schema_to_drf(schema_name: str, schema: Schema) -> str:
 
     properties: list[str] = []
     for prop in schema.properties:
-        properties.append(f"{prop.name.lower()} = {serializer_func_from_property_type(prop)}")
+        if prop.name in exclude:
+            continue
+        properties.append(
+            f"{prop.name.lower()} = {serializer_func_from_property_type(prop, patterns, schema_name=schema_name)}"
+        )
 
     class_inheritance: list[str] = []
     if schema.combined_schemas and "allOf" in schema.combined_schemas:
         for combined_schema in schema.combined_schemas["allOf"]:
             if combined_schema.name:
-                class_inheritance.append(combined_schema.name + "Serializer")
+                class_inheritance.append(serializer_name(combined_schema.class_name))
             else:
                 for prop in combined_schema.properties:
-                    properties.append(f"{prop.name.lower()} = {serializer_func_from_property_type(prop)}")
+                    properties.append(
+                        f"{prop.name.lower()} = "
+                        f"{serializer_func_from_property_type(prop, patterns, schema_name=schema_name)}"
+                    )
     else:
         class_inheritance.append("serializers.Serializer")
 
@@ -273,19 +366,44 @@ def schema_to_drf(schema_name: str, schema: Schema) -> str:
     if not schema_body:
         schema_body = "pass"
 
-    return f"""
-class {schema_name}Serializer({class_inheritance_str}):
+    serializer = f"""
+class {serializer_name(schema.class_name)}({class_inheritance_str}):
     {schema_body}
     """
+    return hooks.get_registry().call(
+        "per_schema_emit", serializer, schema_name=schema_name, schema=schema, framework="drf"
+    )
+
+
+def replaced_query_fields(method: Method, *, keyset_pagination: bool = False) -> frozenset[str]:
+    """
+    :param keyset_pagination: keyset pagination is enabled for list operations without `x-pagination`
+    :return: the query parameters the query serializer leaves out, the cursor replaces the offset of a keyset
+        paginated operation and the links of the next pages don't carry it
+    """
+    if pagination := get_keyset_pagination(method, default=keyset_pagination):
+        return frozenset((pagination.offset.name,))
+    return frozenset()
 
 
 # maybe return path to file instead of `None`
-def create_serializer_file(
-    definition: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False
-) -> None:
+def create_serializers(
+    definition: OpenAPIDefinition, patterns: Optional[PatternRegistry] = None, *, keyset_pagination: bool = False
+) -> list[str]:
+    """
+    :param patterns: collects the patterns as module level constants, their declarations have to precede the classes
+    :param keyset_pagination: the query serializers of keyset paginated operations leave out the offset
+    :return: the serializer classes of all created schemas, ordered so that referenced serializers come first
+    """
+    excluded = {
+        method.query_schema.name: replaced_query_fields(method, keyset_pagination=keyset_pagination)
+        for path in definition.paths
+        for method in path.methods
+        if method.query_schema is not None
+    }
     schemas: list[str] = []
     for schema_name, schema in definition.created_schemas.items():
-        schema_def = schema_to_drf(schema_name, schema)
+        schema_def = schema_to_drf(schema_name, schema, patterns, exclude=excluded.get(schema_name, frozenset()))
         if not schema_def:
             continue
 
@@ -303,11 +421,22 @@ def create_serializer_file(
                 schemas.append(schema_def)
             else:
                 schemas.insert(0, schema_def)
+    return schemas
+
 
+def create_serializer_file(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    keyset_pagination: bool = False,
+) -> None:
+    patterns = PatternRegistry(definition.names)
+    serializers = create_serializers(definition, patterns, keyset_pagination=keyset_pagination)
     write_data_to_file(
-        schemas,
-        import_statements=INITIAL_FILE_INPUTS,
-        file_name="serializers",
+        ["\n".join(patterns.declarations()), *serializers],
+        import_statements=INITIAL_FILE_INPUTS + patterns.imports(),
+        file_name=SERIALIZER_FILE_NAME,
         export_folder=export_folder,
         use_tempdir=use_tempdir,
     )
@@ -321,6 +450,69 @@ get_request_template = Template("""
         return Response(serializer.data)
 """)
 
+# the payload is only rendered if the version hook can't prove that the client's copy is current
+get_conditional_request_template = Template("""
+    if request.method == "GET":
+        $security
+        $data
+        $serializer
+        not_modified, content, etag = conditional_get(
+            request.headers.get("If-None-Match"), $load_version, lambda: JSONRenderer().render(serializer.data)
+        )
+        if not_modified:
+            return HttpResponse(status=drf_status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return HttpResponse(content, content_type="application/json", headers={"ETag": etag})
+""")
+
+# the rendered payload is cached, the key is validated before so that invalid queries aren't cached
+get_cached_request_template = Template("""
+    if request.method == "GET":
+        $security
+        $query
+        key = cache_key($cache_key_args, $query_data, $principal)
+        content = get_backend().get(key)
+        if content is None:
+            $data
+            $serializer
+            content = JSONRenderer().render(serializer.data)
+            get_backend().set(key, content, $ttl)
+        $response
+""")
+
+# every item is rendered on its own, the list is never materialized as one document
+get_streaming_request_template = Template("""
+    if request.method == "GET":
+        $security
+        $data
+        values = []
+        renderer = JSONRenderer()
+
+        $def_keyword rows():
+            for value in values:
+                yield renderer.render($serializer(value).data) + b"\\n"
+
+        return StreamingHttpResponse(rows(), content_type="$media_type")
+""")
+
+# the page is loaded after the keyset of the cursor, the link of the next page is sent in the `Link` header
+get_keyset_request_template = Template("""
+    if request.method == "GET":
+        $security
+        serializer = $query_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=$response_error)
+        try:
+            cursor = decode_cursor(request.query_params.get("$cursor"))
+        except ValueError:
+            return Response({"$cursor": ["Invalid cursor."]}, status=drf_status.HTTP_400_BAD_REQUEST)
+        limit = clamp_limit(serializer.validated_data.get("$limit"), default=$default_limit, maximum=$max_limit)
+        values, next_keyset = $load_page
+        response = Response($serializer(values, many=True).data)
+        if link := next_link(request.build_absolute_uri(), next_keyset):
+            response["Link"] = link
+        return response
+""")
+
 """
 serializer = SnippetSerializer(data=request.data)
 """
@@ -329,7 +521,7 @@ post_request_template = Template("""
         $security
         $serializer
         if serializer.is_valid():
-            serializer.save()
+            $save
             $response_success
         $response_error
 """)
@@ -339,7 +531,7 @@ put_request_template = Template("""
         $security
         $serializer
         if serializer.is_valid():
-            serializer.save()
+            $save
             $response_success
         $response_error
 """)
@@ -349,7 +541,7 @@ patch_request_template = Template("""
         $security
         $serializer
         if serializer.is_valid():
-            serializer.save()
+            $save
             $response_success
         $response_error
 """)
@@ -367,43 +559,157 @@ delete_request_template = Template("""
 """)
 
 
-def create_request_and_response_objects(method: Method, security_scopes: list[str]) -> str:
+def create_request_and_response_objects(
+    method: Method,
+    security_scopes: list[str],
+    concurrency: Concurrency = Concurrency.SYNC,
+    imports: Optional[list[str]] = None,
+    pagination: Optional[KeysetPagination] = None,
+    page_function: str = "",
+    load_version: str = "",
+    cache_key_args: str = "",
+    streaming_responses: bool = False,
+) -> str:
+    """
+    :param streaming_responses: stream every array response, not only the `application/x-ndjson` ones
+    :param pagination: the keyset pagination of a list operation, `page_function` loads its pages
+    :param load_version: the call of the version hook, enables the ETag handling of the operation
+    :param cache_key_args: the path and path parameters of the cache key, enables the response cache of the operation
+    """
+    if imports is None:
+        imports = list(INITIAL_VIEW_FILE_INPUTS)
+    save = ASYNC_SAVE if concurrency == Concurrency.ASYNC else SYNC_SAVE
     func_txt = ""
     security = ""
     if security_scopes:
         scopes = [f'"{scope_}"' for scope_ in security_scopes]
         security = f'if hasattr(request.auth, "is_valid") and not request.auth.is_valid({",".join(scopes)}):'
         security += f"{INDENT * 2}return Response(status=drf_status.HTTP_401_UNAUTHORIZED)"
+    if load_version and method.request_type != "get":
+        add_unique(imports, PRECONDITION_IMPORT)
+        precondition = (
+            f'if precondition_failed(request.headers.get("If-Match"), {load_version}):\n'
+            f"{INDENT * 3}return Response(status=drf_status.HTTP_412_PRECONDITION_FAILED)"
+        )
+        security = f"{security}\n{INDENT * 2}{precondition}" if security else precondition
     response_schema: Optional[ResponseSchema] = method.get_success_response_schema()
     success_error_code = method.get_success_error_code()
     fail_error_code = method.get_fail_error_code()
+    streaming = method.is_streaming(stream_arrays=streaming_responses)
+    ttl = get_cache_ttl(method) if cache_key_args and response_schema else None
+    check_features(
+        method.operation_id,
+        {
+            "keyset pagination": pagination is not None,
+            "streaming": streaming,
+            "ETags": bool(load_version) and (method.request_type != "get" or response_schema is not None),
+            "response cache": ttl is not None,
+        },
+        EXCLUSIVE_FEATURES,
+    )
     match method.request_type:
         case "get":
-            if response_schema:
-                if response_schema.type == SchemaType.ARRAY.value:
+            if response_schema and pagination is not None:
+                add_unique(imports, PAGINATION_IMPORT)
+                load_page = f"{page_function}(cursor, limit)"
+                if concurrency == Concurrency.ASYNC:
+                    load_page = f"await sync_to_async({page_function})(cursor, limit)"
+                func_txt = get_keyset_request_template.substitute(
+                    security=security,
+                    query_serializer=serializer_name(method.query_schema.class_name),
+                    response_error=to_drf_status_code(fail_error_code),
+                    cursor=CURSOR_PARAMETER,
+                    limit=pagination.limit.name,
+                    default_limit=pagination.default_limit,
+                    max_limit=pagination.max_limit,
+                    load_page=load_page,
+                    serializer=serializer_name(response_schema.schema.class_name),
+                )
+            elif response_schema:
+                if streaming:
+                    # the streaming template defines the values itself
+                    example_data = ""
+                elif response_schema.type == SchemaType.ARRAY:
                     example_data = "values = []"
-                    schema_txt = f"serializer = {response_schema.schema.name}Serializer(values, many=True)"
+                    schema_txt = f"serializer = {serializer_name(response_schema.schema.class_name)}(values, many=True)"
                 else:
                     example_data = "data = {}"
-                    schema_txt = f"serializer = {response_schema.schema.name}Serializer(data)"
+                    schema_txt = f"serializer = {serializer_name(response_schema.schema.class_name)}(data)"
                 if method.contains_query_params:
                     example_data = f"""
-        serializer = {to_class_name(method.operation_id)}Serializer(data=request.query_params)
+        serializer = {serializer_name(method.query_schema.class_name)}(data=request.query_params)
         if not serializer.is_valid():
             return Response(serializer.errors, status={to_drf_status_code(fail_error_code)})
         
         {example_data}
 """
 
-                func_txt = get_request_template.substitute(security=security, data=example_data, serializer=schema_txt)
+                if streaming:
+                    for import_statement in STREAMING_IMPORTS:
+                        add_unique(imports, import_statement)
+                    func_txt = get_streaming_request_template.substitute(
+                        security=security,
+                        data=example_data,
+                        serializer=serializer_name(response_schema.schema.class_name),
+                        def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+                        media_type=NDJSON_MEDIA_TYPE,
+                    )
+                elif ttl is not None:
+                    add_unique(imports, CACHE_LOOKUP_IMPORT)
+                    add_unique(imports, "from rest_framework.renderers import JSONRenderer")
+                    query_txt = ""
+                    if method.contains_query_params:
+                        error_status = to_drf_status_code(fail_error_code)
+                        query_serializer = serializer_name(method.query_schema.class_name)
+                        query_txt = (
+                            f"serializer = {query_serializer}(data=request.query_params)\n"
+                            f"{INDENT * 2}if not serializer.is_valid():\n"
+                            f"{INDENT * 3}return Response(serializer.errors, status={error_status})"
+                        )
+                    response_txt = 'return HttpResponse(content, content_type="application/json")'
+                    if load_version:
+                        add_unique(imports, CONDITIONAL_GET_IMPORT)
+                        response_txt = (
+                            "not_modified, content, etag = conditional_get(\n"
+                            f'{INDENT * 3}request.headers.get("If-None-Match"), {load_version}, lambda: content\n'
+                            f"{INDENT * 2})\n"
+                            f"{INDENT * 2}if not_modified:\n"
+                            f"{INDENT * 3}return HttpResponse(\n"
+                            f'{INDENT * 4}status=drf_status.HTTP_304_NOT_MODIFIED, headers={{"ETag": etag}}\n'
+                            f"{INDENT * 3})\n"
+                            f"{INDENT * 2}return HttpResponse(\n"
+                            f'{INDENT * 3}content, content_type="application/json", headers={{"ETag": etag}}\n'
+                            f"{INDENT * 2})"
+                        )
+                    func_txt = get_cached_request_template.substitute(
+                        security=security,
+                        query=query_txt,
+                        cache_key_args=cache_key_args,
+                        query_data="serializer.validated_data" if method.contains_query_params else "None",
+                        # users don't share the cached responses of a secured operation
+                        principal='getattr(request.user, "pk", None)' if method.security_schemes else "None",
+                        data="values = []" if response_schema.type == SchemaType.ARRAY else "data = {}",
+                        serializer=schema_txt,
+                        ttl=ttl,
+                        response=response_txt,
+                    )
+                elif load_version:
+                    add_unique(imports, CONDITIONAL_GET_IMPORT)
+                    add_unique(imports, "from rest_framework.renderers import JSONRenderer")
+                    func_txt = get_conditional_request_template.substitute(
+                        security=security, data=example_data, serializer=schema_txt, load_version=load_version
+                    )
+                else:
+                    func_txt = get_request_template.substitute(
+                        security=security, data=example_data, serializer=schema_txt
+                    )
         case "post":
             request_schema = method.request_schema
             if request_schema.name:
-                request_schema_txt = f"serializer = {request_schema.name}Serializer(data=request.data)"
+                request_schema_txt = f"serializer = {serializer_name(request_schema.class_name)}(data=request.data)"
             elif method.contains_query_params:
-                request_schema_txt = (
-                    f"serializer = {to_class_name(method.operation_id)}Serializer(data=request.query_params)"
-                )
+                query_serializer = serializer_name(method.query_schema.class_name)
+                request_schema_txt = f"serializer = {query_serializer}(data=request.query_params)"
             else:
                 request_schema_txt = "serializer = Serializer(data=request.data)"
             success_response_txt = f"return Response(serializer.data, status={to_drf_status_code(success_error_code)})"
@@ -411,34 +717,37 @@ def create_request_and_response_objects(method: Method, security_scopes: list[st
             func_txt = post_request_template.substitute(
                 security=security,
                 serializer=request_schema_txt,
+                save=save,
                 response_success=success_response_txt,
                 response_error=error_response_txt,
             )
         case "put":
             request_schema = method.request_schema
-            request_schema_txt = f"serializer = {request_schema.name}Serializer(data=request.data)"
+            request_schema_txt = f"serializer = {serializer_name(request_schema.class_name)}(data=request.data)"
             success_response_txt = f"return Response(serializer.data, status={to_drf_status_code(success_error_code)})"
             error_response_txt = f"return Response(serializer.errors, status={to_drf_status_code(fail_error_code)})"
             func_txt = put_request_template.substitute(
                 security=security,
                 serializer=request_schema_txt,
+                save=save,
                 response_success=success_response_txt,
                 response_error=error_response_txt,
             )
         case "patch":
             request_schema = method.request_schema
-            request_schema_txt = f"serializer = {request_schema.name}Serializer(data=request.data)"
+            request_schema_txt = f"serializer = {serializer_name(request_schema.class_name)}(data=request.data)"
             success_response_txt = f"return Response(serializer.data, status={to_drf_status_code(success_error_code)})"
             error_response_txt = f"return Response(serializer.errors, status={to_drf_status_code(fail_error_code)})"
             func_txt = patch_request_template.substitute(
                 security=security,
                 serializer=request_schema_txt,
+                save=save,
                 response_success=success_response_txt,
                 response_error=error_response_txt,
             )
         case "delete":
             if method.contains_query_params:
-                serializer_txt = f"obj = {to_class_name(method.operation_id)}Serializer(data=request.query_params)"
+                serializer_txt = f"obj = {serializer_name(method.query_schema.class_name)}(data=request.query_params)"
             else:
                 serializer_txt = f"#TODO replace me\n{INDENT}{INDENT}obj = Serializer()"
             success_response_txt = f"return HttpResponse(status={to_drf_status_code(success_error_code)})"
@@ -453,50 +762,117 @@ def create_request_and_response_objects(method: Method, security_scopes: list[st
     return func_txt
 
 
-def create_view_func(path: ApiPath) -> str:
-    function_name = convert_camel_case_to_snake_case(path.methods[0].operation_id)
+def view_function_name(path: ApiPath, names: Optional[NameRegistry] = None) -> str:
+    """
+    The DRF view handles all methods of a path and is named after the first operationId
+    :param path: the path the view function is created for
+    :param names: when given the name gets registered, so that views and urls agree on the resolved name
+    :return: the name of the view function
+    """
+    if names is None:
+        return to_snake_case(path.methods[0].operation_id)
+    return names.function_name(path.methods[0].operation_id, owner=path.path, namespace="drf.views")
+
+
+def view_concurrency(path: ApiPath, configured: Optional[Concurrency] = None) -> Concurrency:
+    """
+    One view handles all methods of a path, it is async only if every operation asks for it
+    :param configured: the handler kind of every operation without `x-concurrency`
+    """
+    kinds = {
+        get_concurrency(method.extensions, default=Concurrency.SYNC, configured=configured) for method in path.methods
+    }
+    if len(kinds) > 1:
+        print(f"Mixed sync and async operations on {path.path}, a sync view is generated")
+        return Concurrency.SYNC
+    return kinds.pop() if kinds else Concurrency.SYNC
+
+
+def create_view_func(
+    path: ApiPath,
+    names: Optional[NameRegistry] = None,
+    imports: Optional[list[str]] = None,
+    *,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+) -> str:
+    """
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates sync views
+    :param streaming_responses: stream every GET array response as ndjson
+    :param keyset_pagination: generate keyset pagination for every list operation without `x-pagination`
+    :param etags: generate the ETag handling for every operation without `x-etag`
+    """
+    if imports is None:
+        imports = list(INITIAL_VIEW_FILE_INPUTS)
+    function_name = view_function_name(path, names)
+    concurrency = view_concurrency(path, concurrency)
     api_requests = [f'"{obj.request_type.upper()}"' for obj in path.methods]
-    api_decorator_txt = f"@api_view([{', '.join(api_requests)}])"
+    if concurrency == Concurrency.ASYNC:
+        for import_statement in ASYNC_VIEW_IMPORTS:
+            add_unique(imports, import_statement)
+        api_decorator_txt = f"@async_api_view([{', '.join(api_requests)}])"
+    else:
+        api_decorator_txt = f"@api_view([{', '.join(api_requests)}])"
     functions = []
-    authentication_schemes = set()
-    permission_classes = set()
+    # repository/version hooks of the operations, they precede the view
+    hook_functions = []
+    path_param_names = [to_snake_case(obj) for obj in path.get_path_param_names()]
+    load_version = ""
+    if any(etags_enabled(method, default=etags) for method in path.methods):
+        version_function = version_function_name(path, names, namespace="drf.views")
+        hook_functions.append(create_version_function(version_function, path))
+        version_args = ", ".join(path_param_names)
+        load_version = f"{version_function}({version_args})"
+        if concurrency == Concurrency.ASYNC:
+            load_version = f"await sync_to_async({version_function})({version_args})"
+    cache_key_args = f'"{path.path}", {format_key_params(path_param_names)}'
+    authentication_schemes = []
+    permission_classes = []
     for method in path.methods:
         security_checks = []
 
         for security_schema in method.security_schemes:
-            permission_classes.add("IsAuthenticated")
+            add_unique(permission_classes, "IsAuthenticated")
             match security_schema.type:
                 case AuthType.API_KEY | AuthType.BEARER:
-                    if "from rest_framework.authentication import TokenAuthentication" not in INITIAL_VIEW_FILE_INPUTS:
-                        INITIAL_VIEW_FILE_INPUTS.append("from rest_framework.authentication import TokenAuthentication")
-                    authentication_schemes.add("TokenAuthentication")
+                    add_unique(imports, "from rest_framework.authentication import TokenAuthentication")
+                    add_unique(authentication_schemes, "TokenAuthentication")
                 case AuthType.BASIC:
-                    if "from rest_framework.authentication import BasicAuthentication" not in INITIAL_VIEW_FILE_INPUTS:
-                        INITIAL_VIEW_FILE_INPUTS.append("from rest_framework.authentication import BasicAuthentication")
-                    authentication_schemes.add("BasicAuthentication")
+                    add_unique(imports, "from rest_framework.authentication import BasicAuthentication")
+                    add_unique(authentication_schemes, "BasicAuthentication")
                 case AuthType.OAUTH2:
-                    if (
-                        "from oauth2_provider.contrib.rest_framework import OAuth2Authentication"
-                        not in INITIAL_VIEW_FILE_INPUTS
-                    ):
-                        INITIAL_VIEW_FILE_INPUTS.append(
-                            "from oauth2_provider.contrib.rest_framework import OAuth2Authentication"
-                        )
+                    add_unique(
+                        imports,
+                        "from oauth2_provider.contrib.rest_framework import OAuth2Authentication",
+                    )
                     # Optional: Add scope handling imports if your OpenAPI spec defines scopes
-                    if (
-                        "from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope"
-                        not in INITIAL_VIEW_FILE_INPUTS
-                    ):
-                        INITIAL_VIEW_FILE_INPUTS.append(
-                            "from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope"
-                        )
+                    add_unique(
+                        imports,
+                        "from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope",
+                    )
 
-                    authentication_schemes.add("OAuth2Authentication")
-                    permission_classes.add("TokenHasReadWriteScope")
+                    add_unique(authentication_schemes, "OAuth2Authentication")
+                    add_unique(permission_classes, "TokenHasReadWriteScope")
                     if hasattr(security_schema.auth, "scopes"):
                         security_checks = list(security_schema.auth.scopes)
 
-        func_txt = create_request_and_response_objects(method, security_checks)
+        page_function = ""
+        if pagination := get_keyset_pagination(method, default=keyset_pagination):
+            page_function = page_function_name(method, names, namespace="drf.views")
+            hook_functions.append(create_page_function(page_function))
+        func_txt = create_request_and_response_objects(
+            method,
+            security_checks,
+            concurrency,
+            imports,
+            pagination=pagination,
+            page_function=page_function,
+            load_version=load_version if etags_enabled(method, default=etags) else "",
+            cache_key_args=cache_key_args,
+            streaming_responses=streaming_responses,
+        )
         if len(functions) > 1:
             func_txt.replace("if", "else if", 1)
         functions.append(func_txt)
@@ -508,44 +884,122 @@ def create_view_func(path: ApiPath) -> str:
         query_params += ", ".join(params)
 
     if authentication_schemes:
-        INITIAL_VIEW_FILE_INPUTS.append("from rest_framework.permissions import IsAuthenticated")
-        INITIAL_VIEW_FILE_INPUTS.append(
-            "from rest_framework.decorators import authentication_classes, permission_classes"
-        )
+        add_unique(imports, "from rest_framework.permissions import IsAuthenticated")
+        add_unique(imports, "from rest_framework.decorators import authentication_classes, permission_classes")
         api_decorator_txt = f"{api_decorator_txt}\n@authentication_classes([{', '.join(authentication_schemes)}])"
         api_decorator_txt = f"{api_decorator_txt}\n@permission_classes([{', '.join(permission_classes)}])"
 
-    view_func_txt = f"""
+    if invalidates_cache(path):
+        add_unique(imports, CACHE_INVALIDATION_IMPORT)
+        api_decorator_txt = f"{api_decorator_txt}\n{create_invalidation_decorator(path, path_param_names)}"
+
+    view_func_txt = f"""{"".join(hook_functions)}
 {api_decorator_txt}
-def {function_name}({query_params}):
+{"async def" if concurrency == Concurrency.ASYNC else "def"} {function_name}({query_params}):
 {function_txt}
 
     return HttpResponse(status=drf_status.HTTP_400_BAD_REQUEST)
 """
-    return view_func_txt
+    return hooks.get_registry().call(
+        "per_operation_emit", view_func_txt, path=path, methods=path.methods, framework="drf"
+    )
+
+
+def serializer_imports(paths: list[ApiPath]) -> str:
+    """
+    :param paths: the paths of one shard
+    :return: an explicit import of all serializers the views of `paths` use
+    """
+    serializer_names = []
+    for path in paths:
+        for method in path.methods:
+            for schema in method.get_schemas():
+                if schema.properties or schema.combined_schemas:
+                    add_unique(serializer_names, serializer_name(schema.class_name))
+    if not serializer_names:
+        return ""
+    return f"from .{SERIALIZER_FILE_NAME} import {', '.join(serializer_names)}"
 
 
 def create_view_file(
-    open_API: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+    open_API: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    shard_by: Optional[ShardBy] = None,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
 ) -> None:  # noqa: C0103
+    """
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates sync views
+    :param streaming_responses: stream every GET array response as ndjson
+    :param keyset_pagination: generate keyset pagination for every list operation without `x-pagination`
+    :param etags: generate the ETag handling for every operation without `x-etag`
+    """
+    if shard_by is not None:
+        for shard_name, paths in shard_paths(open_API, shard_by).items():
+            imports = [obj for obj in INITIAL_VIEW_FILE_INPUTS if obj != SERIALIZER_WILDCARD_IMPORT]
+            if explicit_import := serializer_imports(paths):
+                imports.append(explicit_import)
+            views = [
+                create_view_func(
+                    path,
+                    open_API.names,
+                    imports,
+                    concurrency=concurrency,
+                    streaming_responses=streaming_responses,
+                    keyset_pagination=keyset_pagination,
+                    etags=etags,
+                )
+                for path in paths
+            ]
+            write_data_to_file(
+                views,
+                import_statements=imports,
+                file_name=f"{VIEW_FILE_NAME}_{shard_name}",
+                export_folder=export_folder,
+                use_tempdir=use_tempdir,
+            )
+            write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+            write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+            write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+        return
+
+    imports = list(INITIAL_VIEW_FILE_INPUTS)
     views = []
     for path in open_API.paths:
-        views.append(create_view_func(path))
+        views.append(
+            create_view_func(
+                path,
+                open_API.names,
+                imports,
+                concurrency=concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+            )
+        )
 
     write_data_to_file(
         views,
-        import_statements=INITIAL_VIEW_FILE_INPUTS,
-        file_name="views",
+        import_statements=imports,
+        file_name=VIEW_FILE_NAME,
         export_folder=export_folder,
         use_tempdir=use_tempdir,
     )
+    write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
 
 
 ROUTER_BASE_IMPORT = ["from django.urls import path"]
+ROUTER_INCLUDE_IMPORT = ["from django.urls import include, path"]
 
 
-def create_route(path: ApiPath) -> tuple[str, str]:
-    function_name = convert_camel_case_to_snake_case(path.methods[0].operation_id)
+def create_route(path: ApiPath, names: Optional[NameRegistry] = None) -> tuple[str, str]:
+    function_name = view_function_name(path, names)
     params: str = path.get_dispatcher_params()
     path_name: str = path.get_dispatcher_name()
     if params:
@@ -553,19 +1007,122 @@ def create_route(path: ApiPath) -> tuple[str, str]:
     return function_name, f"{path_name}/"
 
 
-def create_urls_file(open_API: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False):
-    import_statements = ROUTER_BASE_IMPORT
+def create_urlpatterns(
+    paths: list[ApiPath], names: NameRegistry, *, view_module: str = VIEW_FILE_NAME
+) -> tuple[list[str], list[str]]:
+    """
+    :return: the import statements and the `urlpatterns` definition for the views of `paths`
+    """
+    import_statements = list(ROUTER_BASE_IMPORT)
     path_statements = ["urlpatterns = ["]
-    for path in open_API.paths:
-        view_name, _url = create_route(path)
-        import_statements.append(f"from .views import {view_name}")
+    for path in paths:
+        view_name, _url = create_route(path, names)
+        import_statements.append(f"from .{view_module} import {view_name}")
         path_statements.append(f"{INDENT}path('{_url}', {view_name}),")
     path_statements.append("]")
+    return import_statements, path_statements
+
+
+def create_urls_file(
+    open_API: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    shard_by: Optional[ShardBy] = None,
+):
+    if shard_by is None:
+        import_statements, path_statements = create_urlpatterns(open_API.paths, open_API.names)
+    else:
+        # every shard gets its own urlconf, the root urlconf includes the selected ones by their dotted path
+        import_statements = ROUTER_INCLUDE_IMPORT + SHARD_SELECTION_IMPORTS
+        shards = shard_paths(open_API, shard_by)
+        for shard_name, paths in shards.items():
+            shard_imports, shard_path_statements = create_urlpatterns(
+                paths, open_API.names, view_module=f"{VIEW_FILE_NAME}_{shard_name}"
+            )
+            write_data_to_file(
+                shard_path_statements,
+                import_statements=shard_imports,
+                file_name=f"{URLS_FILE_NAME}_{shard_name}",
+                export_folder=export_folder,
+                use_tempdir=use_tempdir,
+            )
+        include_shard = f'path("", include(f"{{__package__}}.{URLS_FILE_NAME}_{{shard}}"))'
+        path_statements = [
+            create_shard_selection(shards),
+            f"urlpatterns = [{include_shard} for shard in SELECTED_SHARDS]",
+        ]
 
     write_data_to_file(
         path_statements,
         import_statements=import_statements,
-        file_name="urls",
+        file_name=URLS_FILE_NAME,
         export_folder=export_folder,
         use_tempdir=use_tempdir,
     )
+
+
+def create_files_streaming(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+) -> None:
+    """
+    Writes the serializers, views and urls files while the paths are lowered one at a time.
+    Every path is dropped as soon as its view and url were written, so the memory usage doesn't grow with the number
+    of paths. Only the components of `definition` may be parsed (`parse_components`), its raw paths get consumed.
+    """
+    patterns = PatternRegistry(definition.names)
+    serializers = FragmentFileWriter(SERIALIZER_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    schema_defs = create_serializers(definition, patterns, keyset_pagination=keyset_pagination)
+    # the pattern constants are referenced by the class bodies
+    serializers.write("\n".join(patterns.new_declarations()))
+    for schema_def in schema_defs:
+        serializers.write(schema_def)
+
+    imports = list(INITIAL_VIEW_FILE_INPUTS)
+    views = FragmentFileWriter(VIEW_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    urls = FragmentFileWriter(URLS_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    urls.write_raw("urlpatterns = [\n")
+    for path in definition.iter_paths(consume=True):
+        if not path.methods:
+            continue
+        # query serializers only reference component serializers, appending them keeps the file importable
+        for method in path.methods:
+            if method.query_schema and (
+                schema_def := schema_to_drf(
+                    method.query_schema.name,
+                    method.query_schema,
+                    patterns,
+                    exclude=replaced_query_fields(method, keyset_pagination=keyset_pagination),
+                )
+            ):
+                serializers.write("\n".join(patterns.new_declarations()))
+                serializers.write(schema_def)
+
+        views.write(
+            create_view_func(
+                path,
+                definition.names,
+                imports,
+                concurrency=concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+            )
+        )
+        view_name, _url = create_route(path, definition.names)
+        urls.write_list_item(f"{INDENT}path('{_url}', {VIEW_FILE_NAME}.{view_name}),")
+    urls.write_raw("]")
+
+    serializers.close(INITIAL_FILE_INPUTS + patterns.imports())
+    views.close(imports)
+    write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    urls.close([*ROUTER_BASE_IMPORT, f"from . import {VIEW_FILE_NAME}"])
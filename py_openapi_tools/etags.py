@@ -0,0 +1,116 @@
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools.naming import NameRegistry, to_function_name
+from py_openapi_tools.schema import ApiPath, Method
+from py_openapi_tools.utils import extension_flag, write_data_to_file
+
+ETAG_FILE_NAME = "etags"
+# per operation override, `x-etag: false` keeps the operation unconditional
+ETAG_EXTENSION = "x-etag"
+
+CONDITIONAL_GET_IMPORT = f"from .{ETAG_FILE_NAME} import conditional_get"
+PRECONDITION_IMPORT = f"from .{ETAG_FILE_NAME} import precondition_failed"
+ETAG_MODULE_IMPORTS = ["import hashlib", "from typing import Any, Callable, Optional"]
+
+ETAG_MODULE = '''
+def strong_etag(data: bytes) -> str:
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def etag_matches(header: Optional[str], etag: str, *, weak: bool) -> bool:
+    """
+    :param header: the value of If-None-Match (weak comparison) or If-Match (strong comparison)
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_get(
+    if_none_match: Optional[str], version: Optional[Any], render: Callable[[], bytes]
+) -> tuple[bool, bytes, str]:
+    """
+    :param version: the cheap version of the resource, the rendered payload is hashed if it is None
+    :param render: serializes the response, it isn't called if the version proves the client's copy is current
+    :return: whether the client's copy is current, the payload (empty then) and the ETag
+    """
+    if version is not None:
+        etag = strong_etag(str(version).encode())
+        if etag_matches(if_none_match, etag, weak=True):
+            return True, b"", etag
+        return False, render(), etag
+    payload = render()
+    etag = strong_etag(payload)
+    if etag_matches(if_none_match, etag, weak=True):
+        return True, b"", etag
+    return False, payload, etag
+
+
+def precondition_failed(if_match: Optional[str], version: Optional[Any]) -> bool:
+    """
+    :return: true if the write has to be rejected with 412, the client didn't modify the current version
+    """
+    if not if_match:
+        return False
+    if version is None:
+        return True
+    return not etag_matches(if_match, strong_etag(str(version).encode()), weak=False)
+'''
+
+# the version hook of a path, used by its GET and write operations
+VERSION_FUNCTION_TEMPLATE = Template("""
+def $function_name($params) -> typing.Optional[str]:
+    # TODO replace me: return a cheap version of the resource, e.g. its `updated_at` or a revision counter.
+    # With None GET responses are hashed after serializing them and writes sending If-Match are rejected
+    return None
+""")
+
+
+def etags_enabled(method: Method, *, default: bool = False) -> bool:
+    """
+    :param default: generate ETag/If-None-Match handling for GET and If-Match handling for write operations without
+        `x-etag`
+    """
+    return extension_flag(method.extensions, ETAG_EXTENSION, default=default)
+
+
+def version_function_name(path: ApiPath, names: Optional[NameRegistry] = None, *, namespace: str) -> str:
+    """
+    :return: the name of the version hook of the path, named after its first operationId
+    """
+    operation_id = f"{path.methods[0].operation_id}_version"
+    if names is None:
+        return to_function_name(operation_id)
+    return names.function_name(operation_id, owner=f"version {path.path}", namespace=namespace)
+
+
+def create_version_function(function_name: str, path: ApiPath) -> str:
+    return VERSION_FUNCTION_TEMPLATE.substitute(function_name=function_name, params=", ".join(path.get_path_params()))
+
+
+def write_etag_module(imports: list[str], *, export_folder: Optional[Path] = None, use_tempdir: bool = False) -> None:
+    """
+    Writes the ETag helpers if one of the generated views uses them
+    :param imports: the import statements of a views module
+    """
+    if CONDITIONAL_GET_IMPORT not in imports and PRECONDITION_IMPORT not in imports:
+        return
+    write_data_to_file(
+        [ETAG_MODULE],
+        import_statements=ETAG_MODULE_IMPORTS,
+        file_name=ETAG_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
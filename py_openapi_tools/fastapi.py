@@ -2,6 +2,54 @@ from pathlib import Path
 from string import Template
 from typing import Optional
 
+from py_openapi_tools import hooks
+from py_openapi_tools.batching import (
+    LOADER_IMPORT,
+    batch_loader_enabled,
+    create_loader_functions,
+    loader_function_names,
+    write_loaders_module,
+)
+from py_openapi_tools.caching import (
+    CACHE_INVALIDATION_IMPORT,
+    CACHE_LOOKUP_IMPORT,
+    create_invalidation_decorator,
+    format_key_params,
+    get_cache_ttl,
+    invalidates_cache,
+    write_cache_module,
+)
+from py_openapi_tools.etags import (
+    CONDITIONAL_GET_IMPORT,
+    PRECONDITION_IMPORT,
+    create_version_function,
+    etags_enabled,
+    version_function_name,
+    write_etag_module,
+)
+from py_openapi_tools.pagination import (
+    CURSOR_PARAMETER,
+    PAGINATION_IMPORT,
+    create_page_function,
+    get_keyset_pagination,
+    page_function_name,
+    write_pagination_module,
+)
+from py_openapi_tools.single_flight import (
+    SINGLE_FLIGHT_IMPORT,
+    create_single_flight_decorator,
+    single_flight_enabled,
+    write_single_flight_module,
+)
+from py_openapi_tools.structs import (
+    ENCODER_NAME,
+    STRUCT_IMPORTS,
+    create_struct,
+    create_struct_file,
+    create_structs,
+    decoder_name,
+    is_union,
+)
 from py_openapi_tools.schema import (
     OpenAPIDefinition,
     Property,
@@ -11,25 +59,73 @@ from py_openapi_tools.schema import (
     Method,
     ApiPath,
     SecurityScheme,
+    NDJSON_MEDIA_TYPE,
 )
+from py_openapi_tools.naming import (
+    NameRegistry,
+    function_like_name_to_class_name,
+    to_class_name,
+    to_function_name,
+    to_module_name,
+)
+from py_openapi_tools.patterns import PatternRegistry, allows_slow_pattern, get_pattern
+from py_openapi_tools.sharding import SHARD_SELECTION_IMPORTS, ShardBy, create_shard_selection, shard_paths
 from py_openapi_tools.utils import (
+    Concurrency,
+    FragmentFileWriter,
+    GenerationError,
+    add_unique,
+    check_features,
+    get_concurrency,
     write_data_to_file,
     INDENT,
-    operation_id_to_function_name,
 )
 
-BASE_IMPORTS = {
+BASE_IMPORTS = [
     "import datetime as dt",
     "import typing",
     "from fastapi import FastAPI, HTTPException",
-}
+]
 
-SECURITY_DEFINITIONS = set()
+# the features one handler template can't combine
+EXCLUSIVE_FEATURES = (
+    ("keyset pagination", "streaming"),
+    ("keyset pagination", "ETags"),
+    ("keyset pagination", "single-flight"),
+    ("keyset pagination", "response cache"),
+    ("streaming", "ETags"),
+    ("streaming", "single-flight"),
+    ("streaming", "response cache"),
+    ("ETags", "single-flight"),
+    ("ETags", "batch loader"),
+    ("response cache", "batch loader"),
+)
+
+ROUTER_IMPORTS = [
+    "import datetime as dt",
+    "import typing",
+    "from fastapi import APIRouter, HTTPException",
+]
 
 SERIALIZER_FILE_NAME = "serializers"
 VIEW_FILE_NAME = "views"
 
-SERIALIZER_IMPORT = ["from pydantic import BaseModel"]
+# the names the models and the type hints of `serializer_func_from_property_type` refer to
+SERIALIZER_IMPORT = [
+    "import datetime as dt",
+    "import enum",
+    "from typing import Optional",
+    "from pydantic import BaseModel",
+]
+PATTERN_VALIDATOR_IMPORT = "from pydantic import field_validator"
+
+OPENAPI_SCHEMA_IMPORTS = ["import json", "from pathlib import Path"]
+
+# FastAPI returns `app.openapi_schema` as is instead of building it from every model on the first request
+APP_WITH_OPENAPI_SCHEMA_TEMPLATE = Template("""
+app = FastAPI()
+app.openapi_schema = json.loads((Path(__file__).parent / "$file_name").read_text(encoding="utf-8"))
+""")
 
 
 def string_constraints(type_info: dict) -> str:
@@ -62,9 +158,8 @@ def number_constraints(type_info: dict) -> str:
 
 
 def create_validator(field_name: str, field_type: str):
-    function_name = f"optional_{operation_id_to_function_name(field_name)}"
-    return Template(
-        """
+    function_name = f"optional_{to_function_name(field_name)}"
+    return Template("""
     @classmethod
     @field_validator("$field_name")
     def $function_name(cls, val: $field_type) -> $field_type:
@@ -72,14 +167,13 @@ def create_validator(field_name: str, field_type: str):
             return val
         else:
             raise ValueError("$field_name may not be None")
-        """
-    ).substitute(field_name=field_name, function_name=function_name, field_type=field_type)
+        """).substitute(field_name=field_name, function_name=function_name, field_type=field_type)
 
 
 def serializer_func_from_property_type(prop) -> str:
     if not hasattr(prop.type, "__name__"):
         if prop.ref:
-            return f"{prop.ref.name.title()}"
+            return prop.ref.class_name
         raise ValueError
     match prop.type.__name__.lower():
         case "list":
@@ -89,14 +183,12 @@ def serializer_func_from_property_type(prop) -> str:
         case "str" | "int" | "float" | "bool":
             return prop.type.__name__.lower()
         case "datetime" | "date":
-            SERIALIZER_IMPORT[0] = "from datetime import datetime as dt"
             return f"dt.{prop.type.__name__.lower()}"
         case "enum" | "Enum":
-            SERIALIZER_IMPORT[0] = "import enum"
-            return prop.name.title()
+            return function_like_name_to_class_name(prop.name)
         case _:
             if prop.ref:
-                return f"{prop.ref.name.title()}"
+                return prop.ref.class_name
             return "None"
 
 
@@ -111,7 +203,7 @@ def create_enum_class(prop) -> str:
     for enum_value in prop.enum_values:
         attrs.append(f"{enum_value.upper()} = '{enum_value}'")
     attrs_str = [f"{INDENT}{obj}\n" for obj in attrs]
-    return ENUM_CLASS_TEMPLATE.substitute(name=prop.name.title(), values="".join(attrs_str))
+    return ENUM_CLASS_TEMPLATE.substitute(name=function_like_name_to_class_name(prop.name), values="".join(attrs_str))
 
 
 def schema_to_fastapi(schema, enum_classes: dict, required_fields: tuple) -> str:
@@ -128,26 +220,67 @@ def schema_to_fastapi(schema, enum_classes: dict, required_fields: tuple) -> str
     return f"\n{INDENT}".join(properties)
 
 
-def validators_from_schema(schema) -> str:
-    return ""
+PATTERN_VALIDATOR_TEMPLATE = Template("""
+    @field_validator("$field_name")
+    @classmethod
+    def $function_name(cls, val):
+        if val is not None and not $pattern.search(val):
+            raise ValueError("$field_name doesn't match the pattern")
+        return val
+""")
 
 
-def create_serializer_file(
-    definition: OpenAPIDefinition,
-    *,
-    export_folder: Optional[Path] = None,
-    use_tempdir: bool = False,
-):
-    schemas: list[str] = []
-    enum_classes = {}
-    for schema_name, schema in definition.created_schemas.items():
-        schema_body = schema_to_fastapi(schema, enum_classes, tuple(schema.required_fields))
-        validators = validators_from_schema(schema)
-        schema_def = f"""
-class {schema_name}(BaseModel):
+def validators_from_schema(schema, patterns: Optional[PatternRegistry] = None, *, schema_name: str = "") -> str:
+    """
+    :param patterns: collects the patterns as module level constants, the validators reference them
+    """
+    if patterns is None:
+        return ""
+    validators = []
+    for prop in schema.properties:
+        if not (pattern := get_pattern(prop)):
+            continue
+        constant = patterns.constant(
+            pattern, hint=f"{schema_name}_{prop.name}", allow_exponential=allows_slow_pattern(prop)
+        )
+        validators.append(
+            PATTERN_VALIDATOR_TEMPLATE.substitute(
+                field_name=prop.name.lower(),
+                function_name=f"check_{to_function_name(prop.name)}_pattern",
+                pattern=constant,
+            )
+        )
+    return "".join(validators)
+
+
+def create_model(schema_name: str, schema, enum_classes: dict, patterns: Optional[PatternRegistry] = None) -> str:
+    schema_body = schema_to_fastapi(schema, enum_classes, tuple(schema.required_fields))
+    validators = validators_from_schema(schema, patterns, schema_name=schema_name)
+    model = f"""
+class {schema.class_name}(BaseModel):
     {schema_body}
     {validators}
     """
+    return hooks.get_registry().call(
+        "per_schema_emit", model, schema_name=schema_name, schema=schema, framework="fastapi"
+    )
+
+
+def create_models(
+    definition: OpenAPIDefinition, enum_classes: Optional[dict] = None, patterns: Optional[PatternRegistry] = None
+) -> list[str]:
+    """
+    :param enum_classes: collects the enum classes, they are part of the result as well
+    :param patterns: collects the patterns as module level constants, their declarations have to precede the models
+    :return: the enum classes followed by the models of all created schemas
+    """
+    schemas: list[str] = []
+    if enum_classes is None:
+        enum_classes = {}
+    for schema_name, schema in definition.created_schemas.items():
+        schema_def = create_model(schema_name, schema, enum_classes, patterns)
+        if not schema_def:
+            continue
         if refs := schema.get_refs():
             min_idx = len(schemas)
             for ref in refs:
@@ -160,20 +293,155 @@ class {schema_name}(BaseModel):
         else:
             schemas.insert(0, schema_def)
     enum_schemas = list(enum_classes.values())
-    schemas = enum_schemas + schemas
+    return enum_schemas + schemas
 
+
+def pattern_imports(patterns: PatternRegistry) -> list[str]:
+    return [*patterns.imports(), PATTERN_VALIDATOR_IMPORT] if patterns.constants else []
+
+
+def create_serializer_file(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    msgspec_models: bool = False,
+):
+    """
+    :param msgspec_models: write `msgspec.Struct`s and their encoder/decoders instead of pydantic models
+    """
+    if msgspec_models:
+        create_struct_file(
+            definition, file_name=SERIALIZER_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir
+        )
+        return
+    patterns = PatternRegistry(definition.names)
+    models = create_models(definition, patterns=patterns)
     write_data_to_file(
-        schemas,
-        import_statements=SERIALIZER_IMPORT,
-        file_name="serializers",
+        ["\n".join(patterns.declarations()), *models],
+        import_statements=SERIALIZER_IMPORT + pattern_imports(patterns),
+        file_name=SERIALIZER_FILE_NAME,
         export_folder=export_folder,
         use_tempdir=use_tempdir,
     )
 
 
-async_request_template = Template("""
-@app.$http_kind("$path", status_code=$response_success_status_code)
-async def $function_name($params) -> $result:
+# `def` handlers are run in the threadpool, blocking calls don't stall the event loop
+request_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    if True:
+        return $response_success
+    else:
+        raise HTTPException(status_code=$response_error_status_code)
+""")
+
+# the response is serialized by the adapter of its type, FastAPI doesn't validate it again
+fast_request_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    if True:
+        # model_construct skips the validation, only use it for data which is known to be valid (e.g. loaded rows)
+        content = $adapter.dump_json($response_success)
+        return Response(content, status_code=$response_success_status_code, media_type="application/json")
+    else:
+        raise HTTPException(status_code=$response_error_status_code)
+""")
+
+# msgspec decodes and validates the body and encodes the Structs, FastAPI neither validates nor serializes them
+struct_request_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code, response_model=None)
+$def_keyword $function_name($params) -> Response:$decode
+    if True:
+        content = $encoder.encode($response_success)
+        return Response(content, status_code=$response_success_status_code, media_type="application/json")
+    else:
+        raise HTTPException(status_code=$response_error_status_code)
+""")
+
+struct_decode_template = Template("""
+    try:
+        body = $decoder.decode(await request.body())
+    except msgspec.ValidationError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except msgspec.DecodeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+""")
+
+# the models are serialized one at a time, the list is never materialized as one document
+streaming_request_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code, response_class=StreamingResponse)
+$def_keyword $function_name($params) -> StreamingResponse:
+    values: list[$model_name] = []
+
+    $def_keyword rows():
+        for value in values:
+            yield value.model_dump_json() + "\\n"
+
+    return StreamingResponse(rows(), media_type="$media_type")
+""")
+
+# the page is loaded after the keyset of the cursor, the link of the next page is sent in the `Link` header
+keyset_request_template = Template("""
+$page_function
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$def_keyword $function_name($params) -> $result:
+    try:
+        keyset = decode_cursor($cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    limit = clamp_limit($limit, default=$default_limit, maximum=$max_limit)
+    values, next_keyset = $load_page
+    if link := next_link(str(request.url), next_keyset):
+        response.headers["Link"] = link
+    return values
+""")
+
+# the payload is only rendered if the version hook can't prove that the client's copy is current
+conditional_get_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    not_modified, content, etag = conditional_get(
+        request.headers.get("If-None-Match"), $load_version, lambda: $adapter.dump_json($response_success)
+    )
+    if not_modified:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+""")
+
+# the shared loader batches the ids of concurrent requests
+loader_request_template = Template("""
+$loader_functions
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    if (value := await loader.load($id_param)) is None:
+        raise HTTPException(status_code=404)
+    return value
+""")
+
+# the rendered payload is cached, a hit skips the handler logic and the serialization
+cached_get_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    key = cache_key("$path", $path_params, $query_params, $principal)
+    content = get_backend().get(key)
+    if content is None:
+        content = $adapter.dump_json($response_success)
+        get_backend().set(key, content, $ttl)
+    $response
+""")
+
+conditional_write_template = Template("""
+@$router.$http_kind("$path", status_code=$response_success_status_code)
+$decorators
+$def_keyword $function_name($params) -> $result:
+    if precondition_failed(request.headers.get("If-Match"), $load_version):
+        raise HTTPException(status_code=412)
     if True:
         return $response_success
     else:
@@ -294,7 +562,88 @@ SECURITY_PARAMS = {
 }
 
 
-def create_request_and_response_objects(path: ApiPath, method: Method, security_scopes: list[SecurityScheme]) -> str:
+def adapter_name(result: str) -> str:
+    """
+    :param result: the return annotation of a handler, e.g. `Pet` or `list[Pet]`
+    :return: the name of its module level adapter, e.g. `PET_ADAPTER` or `PET_LIST_ADAPTER`
+    """
+    if result.startswith("list[") and result.endswith("]"):
+        return f"{to_module_name(result[5:-1]).upper()}_LIST_ADAPTER"
+    return f"{to_module_name(result).upper()}_ADAPTER"
+
+
+def create_adapter(result: str, imports: list[str], adapter_definitions: list[str]) -> str:
+    """
+    Defines the adapter of a response type once per module, building one is expensive
+    :return: the name of the adapter
+    """
+    add_unique(imports, "from pydantic import TypeAdapter")
+    name = adapter_name(result)
+    add_unique(adapter_definitions, f"{name} = TypeAdapter({result})")
+    return name
+
+
+def declare_path_params(path: ApiPath, method: Method, params: list[str]) -> list[str]:
+    """
+    :param params: the parameters of the handler so far
+    :return: `params` and the path parameters which aren't declared yet, typed after the spec if it defines them
+    """
+    params = list(params)
+    declared = [obj.split(":")[0] for obj in params]
+    for param in method.parameters:
+        if param.position == "path" and param.name not in declared:
+            params.append(f"{param.name}: {param.schema.get_type_hint_str()}")
+            declared.append(param.name)
+    for name in path.get_path_param_names():
+        if name not in declared:
+            params.append(f"{name}: str")
+    return params
+
+
+def create_request_and_response_objects(
+    path: ApiPath,
+    method: Method,
+    security_scopes: list[SecurityScheme],
+    names: Optional[NameRegistry] = None,
+    *,
+    router: str = "app",
+    imports: Optional[list[str]] = None,
+    security_definitions: Optional[list[str]] = None,
+    adapter_definitions: Optional[list[str]] = None,
+    version_function: str = "",
+    fast_responses: bool = False,
+    msgspec_models: bool = False,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    single_flight: bool = False,
+    batch_loaders: bool = False,
+) -> str:
+    """
+    :param version_function: the version hook of the path, enables the ETag handling of the operation
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates async handlers
+    :param streaming_responses: stream every GET array response as ndjson
+    :param keyset_pagination: generate keyset pagination for every list operation without `x-pagination`
+    :param single_flight: coalesce identical concurrent requests of every async GET handler without `x-single-flight`
+    :param batch_loaders: load the resources of every GET by-id operation without `x-batch-loader` through a loader
+    :param etags: generate the ETag handling for every operation without `x-etag`
+    :param fast_responses: handlers return the JSON of the module level adapter of their response type, their
+        placeholders are built with `model_construct`
+    :param msgspec_models: the models are `msgspec.Struct`s, handlers decode the body and encode the response with
+        the module level decoders/encoder of the serializers module
+    """
+    if imports is None:
+        imports = list(BASE_IMPORTS)
+    if security_definitions is None:
+        security_definitions = []
+    if adapter_definitions is None:
+        adapter_definitions = []
+    if names is None:
+        function_name = to_function_name(method.operation_id)
+    else:
+        function_name = names.function_name(
+            method.operation_id, owner=f"{method.request_type.upper()} {path.path}", namespace="fastapi.views"
+        )
     response_schema: Optional[ResponseSchema] = method.get_success_response_schema()
     success_error_code = method.get_success_error_code()
     fail_error_code = method.get_fail_error_code()
@@ -304,134 +653,558 @@ def create_request_and_response_objects(path: ApiPath, method: Method, security_
         for auth_ in security_scopes:
             match auth_.type:
                 case AuthType.API_KEY:
-                    SECURITY_DEFINITIONS.add(api_key_template.substitute())
+                    add_unique(security_definitions, api_key_template.substitute())
                 case AuthType.BASIC:
-                    SECURITY_DEFINITIONS.add(basic_auth_template.substitute())
+                    add_unique(security_definitions, basic_auth_template.substitute())
                 case AuthType.BEARER:
-                    SECURITY_DEFINITIONS.add(bearer_auth_template.substitute())
+                    add_unique(security_definitions, bearer_auth_template.substitute())
                 case AuthType.COOKIE:
-                    SECURITY_DEFINITIONS.add(cookie_auth_template.substitute())
+                    add_unique(security_definitions, cookie_auth_template.substitute())
                 case _:
                     pass
-            BASE_IMPORTS.add(SECURITY_IMPORTS[auth_.type])
-            BASE_IMPORTS.add("from fastapi import Depends")
-            BASE_IMPORTS.add("from fastapi import Annotated")
+            add_unique(imports, SECURITY_IMPORTS[auth_.type])
+            add_unique(imports, "from fastapi import Depends")
+            add_unique(imports, "from fastapi import Annotated")
             if auth_.type == AuthType.OAUTH2:
                 if hasattr(auth_.auth, "scopes"):
                     scopes = [f'"{obj}"' for obj in auth_.auth.scopes]
-                    BASE_IMPORTS.add("from fastapi import SecurityScopes")
-                    SECURITY_DEFINITIONS.add(
+                    add_unique(imports, "from fastapi import SecurityScopes")
+                    add_unique(
+                        security_definitions,
                         oauth2_scoped_template.substitute(
                             tokenUrl=auth_.auth.authorizationUrl, scopes=f"[{', '.join(scopes)}]"
-                        )
+                        ),
                     )
                     query_params.append(
                         f"token: Annotated[str, Security(get_oauth2_scoped_token, scopes=[{', '.join(scopes)}])]"
                     )
                 else:
-                    SECURITY_DEFINITIONS.add(oauth2_template.substitute(tokenUrl=auth_.auth.authorizationUrl))
+                    add_unique(security_definitions, oauth2_template.substitute(tokenUrl=auth_.auth.authorizationUrl))
                     query_params.append(SECURITY_PARAMS[auth_.type])
             else:
                 query_params.append(SECURITY_PARAMS[auth_.type])
+    security_params = [obj.split(":")[0] for obj in query_params]
     if method.contains_query_params:
         query_params = [f"{obj.name}: {obj.schema.get_type_hint_str()}" for obj in method.parameters]
 
     response_txt = "typing.Any"
     response_success = "None"
 
+    model_name = ""
     if response_schema:
-        if response_schema.type == SchemaType.OBJECT and response_schema.schema.name:
-            BASE_IMPORTS.add(f"from .{SERIALIZER_FILE_NAME} import {response_schema.schema.name}")
-        if response_schema.type == SchemaType.ARRAY.value:
-            response_txt = f"list[{response_schema.schema.name}]"
-            response_success = f"[{response_schema.schema.name}()]"
+        model_name = response_schema.schema.class_name
+        if model_name:
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {model_name}")
+        constructor = f"{model_name}.model_construct()" if fast_responses else f"{model_name}()"
+        if response_schema.type == SchemaType.ARRAY:
+            response_txt = f"list[{model_name}]"
+            response_success = f"[{constructor}]"
         else:
-            response_txt = response_schema.schema.name if response_schema.schema.name else "None"
-            response_success = f"{response_schema.schema.name}()" if response_schema.schema.name else "None"
-
-    match method.request_type:
-        case "get":
-            return async_request_template.substitute(
-                http_kind="get",
-                path=path.path,
-                function_name=operation_id_to_function_name(method.operation_id),
-                params=", ".join(query_params) if query_params else "",
-                result=response_txt,
-                response_success=response_success,
-                response_success_status_code=success_error_code,
-                response_error_status_code=fail_error_code,
-            )
-        case "post":
-            return async_request_template.substitute(
-                http_kind="post",
-                path=path.path,
-                function_name=operation_id_to_function_name(method.operation_id),
-                params=", ".join(query_params) if query_params else "",
-                result=response_txt,
-                response_success=response_success,
-                response_success_status_code=success_error_code,
-                response_error_status_code=fail_error_code,
-            )
-        case "put":
-            return async_request_template.substitute(
-                http_kind="put",
-                path=path.path,
-                function_name=operation_id_to_function_name(method.operation_id),
-                params=", ".join(query_params) if query_params else "",
-                result=response_txt,
-                response_success=response_success,
-                response_success_status_code=success_error_code,
-                response_error_status_code=fail_error_code,
-            )
-        case "patch":
-            return async_request_template.substitute(
-                http_kind="patch",
-                path=path.path,
-                function_name=operation_id_to_function_name(method.operation_id),
-                params=", ".join(query_params) if query_params else "",
-                result=response_txt,
-                response_success=response_success,
-                response_success_status_code=success_error_code,
-                response_error_status_code=fail_error_code,
-            )
-        case "delete":
-            return async_request_template.substitute(
-                http_kind="delete",
-                path=path.path,
-                function_name=operation_id_to_function_name(method.operation_id),
-                params=", ".join(query_params) if query_params else "",
-                result=response_txt,
-                response_success=response_success,
-                response_success_status_code=success_error_code,
-                response_error_status_code=fail_error_code,
+            response_txt = model_name if model_name else "None"
+            response_success = constructor if model_name else "None"
+
+    if method.request_type not in ("get", "post", "put", "patch", "delete"):
+        return None
+
+    concurrency = get_concurrency(method.extensions, default=Concurrency.ASYNC, configured=concurrency)
+    pagination = get_keyset_pagination(method, default=keyset_pagination)
+    streaming = method.is_streaming(stream_arrays=streaming_responses)
+    ttl = get_cache_ttl(method) if response_schema else None
+    features = {
+        "keyset pagination": pagination is not None,
+        "streaming": streaming,
+        "ETags": bool(version_function) and (method.request_type != "get" or response_schema is not None),
+        "single-flight": concurrency == Concurrency.ASYNC and single_flight_enabled(method, default=single_flight),
+        "response cache": ttl is not None,
+        "batch loader": concurrency == Concurrency.ASYNC and batch_loader_enabled(path, method, default=batch_loaders),
+        "cache invalidation": invalidates_cache(path, method),
+    }
+    check_features(method.operation_id, features, EXCLUSIVE_FEATURES)
+    if msgspec_models:
+        # the Struct handlers encode their responses themselves, none of the other templates applies
+        if unsupported := [name for name, enabled in features.items() if enabled]:
+            raise GenerationError(f"{method.operation_id}: {', '.join(unsupported)} isn't supported by msgspec models")
+        add_unique(imports, "from fastapi import Response")
+        add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {ENCODER_NAME}")
+        params = declare_path_params(path, method, query_params)
+        decode = ""
+        if method.request_type in ("post", "put", "patch") and method.request_schema.name:
+            decoder = decoder_name(method.request_schema.class_name)
+            add_unique(imports, "import msgspec")
+            add_unique(imports, "from fastapi import Request")
+            add_unique(imports, f"from .{SERIALIZER_FILE_NAME} import {decoder}")
+            params.insert(0, "request: Request")
+            decode = "\n" + struct_decode_template.substitute(decoder=decoder).strip("\n")
+        if response_schema and is_union(response_schema.schema):
+            # a union alias can't be instantiated
+            response_success = "None"
+        return struct_request_template.substitute(
+            router=router,
+            # the body is read from the request, which is async only
+            def_keyword="async def" if decode or concurrency == Concurrency.ASYNC else "def",
+            http_kind=method.request_type,
+            path=path.path,
+            function_name=function_name,
+            params=", ".join(params),
+            decode=decode,
+            encoder=ENCODER_NAME,
+            response_success=response_success,
+            response_success_status_code=success_error_code,
+            response_error_status_code=fail_error_code,
+        )
+    if pagination is not None:
+        add_unique(imports, PAGINATION_IMPORT)
+        add_unique(imports, "from fastapi import Query, Request, Response")
+        page_function = page_function_name(method, names, namespace="fastapi.views")
+        # the cursor replaces the offset, `limit` is validated against its maximum
+        params = ["request: Request", "response: Response"]
+        params.extend(
+            obj for obj in query_params if obj.split(":")[0] not in (pagination.limit.name, pagination.offset.name)
+        )
+        params.append(
+            f"{pagination.limit.name}: int = Query({pagination.default_limit}, ge=1, le={pagination.max_limit})"
+        )
+        params.append(f"{CURSOR_PARAMETER}: typing.Optional[str] = None")
+        load_page = f"{page_function}(keyset, limit)"
+        if concurrency == Concurrency.ASYNC:
+            # the repository hook is sync, it mustn't block the event loop
+            add_unique(imports, "from fastapi.concurrency import run_in_threadpool")
+            load_page = f"await run_in_threadpool({page_function}, keyset, limit)"
+        return keyset_request_template.substitute(
+            page_function=create_page_function(page_function),
+            router=router,
+            http_kind=method.request_type,
+            path=path.path,
+            response_success_status_code=success_error_code,
+            def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+            function_name=function_name,
+            params=", ".join(params),
+            result=response_txt,
+            cursor=CURSOR_PARAMETER,
+            load_page=load_page,
+            limit=pagination.limit.name,
+            default_limit=pagination.default_limit,
+            max_limit=pagination.max_limit,
+        )
+    load_version = ""
+    if version_function:
+        load_version = f"{version_function}({', '.join(path.get_path_param_names())})"
+        if concurrency == Concurrency.ASYNC:
+            add_unique(imports, "from fastapi.concurrency import run_in_threadpool")
+            load_version = f"await run_in_threadpool({', '.join([version_function, *path.get_path_param_names()])})"
+    decorators = ""
+    # the result mustn't depend on the request, `EXCLUSIVE_FEATURES` rules out streamed/paginated/conditional ones
+    if features["single-flight"]:
+        add_unique(imports, SINGLE_FLIGHT_IMPORT)
+        # the path parameters are part of the key
+        query_params = declare_path_params(path, method, query_params)
+        decorators = create_single_flight_decorator(method)
+    if features["response cache"]:
+        add_unique(imports, CACHE_LOOKUP_IMPORT)
+        params = declare_path_params(path, method, query_params)
+        # the credentials the handler receives are part of the key, users don't share cached responses
+        principal = [obj for obj in security_params if obj in (param.split(":")[0] for param in params)]
+        response = 'return Response(content, media_type="application/json")'
+        if load_version:
+            add_unique(imports, CONDITIONAL_GET_IMPORT)
+            add_unique(imports, "from fastapi import Request, Response")
+            params.insert(0, "request: Request")
+            response = (
+                "not_modified, content, etag = conditional_get(\n"
+                f'{INDENT * 2}request.headers.get("If-None-Match"), {load_version}, lambda: content\n'
+                f"{INDENT})\n"
+                f"{INDENT}if not_modified:\n"
+                f'{INDENT * 2}return Response(status_code=304, headers={{"ETag": etag}})\n'
+                f'{INDENT}return Response(content, media_type="application/json", headers={{"ETag": etag}})'
             )
+        else:
+            add_unique(imports, "from fastapi import Response")
+        return cached_get_template.substitute(
+            router=router,
+            http_kind=method.request_type,
+            path=path.path,
+            response_success_status_code=success_error_code,
+            def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+            function_name=function_name,
+            params=", ".join(params),
+            result=response_txt,
+            adapter=create_adapter(response_txt, imports, adapter_definitions),
+            path_params=format_key_params(path.get_path_param_names()),
+            query_params=format_key_params([obj.name for obj in method.parameters if obj.position == "query"]),
+            principal=format_key_params(principal) if principal else None,
+            response_success=response_success,
+            ttl=ttl,
+            response=response,
+            decorators=decorators,
+        )
+    if features["batch loader"]:
+        add_unique(imports, LOADER_IMPORT)
+        add_unique(imports, "from fastapi import Depends")
+        load_many_function, loader_function = loader_function_names(method, names, namespace="fastapi.views")
+        id_param = path.get_id_param()
+        params = declare_path_params(path, method, query_params)
+        params.append(f"loader: DataLoader = Depends({loader_function})")
+        return loader_request_template.substitute(
+            loader_functions=create_loader_functions(
+                load_many_function,
+                loader_function,
+                id_type=id_param.schema.get_type_hint_str(),
+                model_name=response_txt,
+            ),
+            router=router,
+            http_kind=method.request_type,
+            path=path.path,
+            response_success_status_code=success_error_code,
+            def_keyword="async def",
+            function_name=function_name,
+            params=", ".join(params),
+            result=response_txt,
+            id_param=id_param.name,
+            decorators=decorators,
+        )
+    if features["cache invalidation"]:
+        add_unique(imports, CACHE_INVALIDATION_IMPORT)
+        # the decorator reads the path parameters from the arguments of the handler
+        query_params = declare_path_params(path, method, query_params)
+        decorators = create_invalidation_decorator(path, path.get_path_param_names())
+    if features["ETags"]:
+        add_unique(imports, "from fastapi import Request, Response")
+        params = declare_path_params(path, method, ["request: Request", *query_params])
+        if method.request_type == "get":
+            add_unique(imports, CONDITIONAL_GET_IMPORT)
+            template = conditional_get_template
+        else:
+            add_unique(imports, PRECONDITION_IMPORT)
+            template = conditional_write_template
+        return template.substitute(
+            router=router,
+            http_kind=method.request_type,
+            path=path.path,
+            response_success_status_code=success_error_code,
+            response_error_status_code=fail_error_code,
+            def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+            function_name=function_name,
+            params=", ".join(params),
+            result=response_txt,
+            response_success=response_success,
+            load_version=load_version,
+            decorators=decorators,
+            adapter=create_adapter(response_txt, imports, adapter_definitions) if method.request_type == "get" else "",
+        )
+    if streaming:
+        add_unique(imports, "from fastapi.responses import StreamingResponse")
+        return streaming_request_template.substitute(
+            router=router,
+            def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+            http_kind=method.request_type,
+            path=path.path,
+            function_name=function_name,
+            params=", ".join(query_params) if query_params else "",
+            model_name=response_schema.schema.class_name,
+            response_success_status_code=success_error_code,
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    template = request_template
+    adapter = ""
+    if fast_responses and model_name:
+        add_unique(imports, "from fastapi import Response")
+        template = fast_request_template
+        adapter = create_adapter(response_txt, imports, adapter_definitions)
+    return template.substitute(
+        router=router,
+        def_keyword="async def" if concurrency == Concurrency.ASYNC else "def",
+        http_kind=method.request_type,
+        path=path.path,
+        function_name=function_name,
+        params=", ".join(query_params) if query_params else "",
+        result=response_txt,
+        response_success=response_success,
+        response_success_status_code=success_error_code,
+        response_error_status_code=fail_error_code,
+        decorators=decorators,
+        adapter=adapter,
+    )
 
 
-def create_view_func(path) -> str:
+def create_view_func(path, names: Optional[NameRegistry] = None, *, etags: bool = False, **kwargs) -> str:
+    """
+    :param etags: generate the ETag handling for every operation without `x-etag`
+    """
     functions = []
+    version_function = ""
+    if any(etags_enabled(method, default=etags) for method in path.methods):
+        version_function = version_function_name(path, names, namespace="fastapi.views")
+        functions.append(create_version_function(version_function, path))
     for method in path.methods:
         security_checks = []
 
         for security_schema in method.security_schemes:
             security_checks.append(security_schema)
 
-        func_txt = create_request_and_response_objects(path, method, security_checks)
-        functions.append(func_txt)
+        func_txt = create_request_and_response_objects(
+            path,
+            method,
+            security_checks,
+            names,
+            version_function=version_function if etags_enabled(method, default=etags) else "",
+            **kwargs,
+        )
+        if func_txt is None:
+            continue
+        functions.append(
+            hooks.get_registry().call("per_operation_emit", func_txt, path=path, methods=[method], framework="fastapi")
+        )
 
     return "\n".join(functions)
 
 
+def create_app(openapi_schema_file: Optional[str] = None, imports: Optional[list[str]] = None) -> str:
+    """
+    :param openapi_schema_file: file name of a bundled spec next to the views module, see `bundle.write_bundle`
+    :param imports: receives the imports the app statement needs
+    """
+    if openapi_schema_file is None:
+        return "app = FastAPI()"
+    if imports is not None:
+        for import_statement in OPENAPI_SCHEMA_IMPORTS:
+            add_unique(imports, import_statement)
+    return APP_WITH_OPENAPI_SCHEMA_TEMPLATE.substitute(file_name=openapi_schema_file).strip()
+
+
 def create_view_file(
-    definition: OpenAPIDefinition, *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    shard_by: Optional[ShardBy] = None,
+    openapi_schema_file: Optional[str] = None,
+    fast_responses: bool = False,
+    msgspec_models: bool = False,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+    single_flight: bool = False,
+    batch_loaders: bool = False,
 ) -> None:
-    views = ["app = FastAPI()", "\n"]
+    """
+    :param fast_responses: handlers return the JSON of module level `TypeAdapter`s instead of the models
+    :param msgspec_models: handlers decode and encode the `msgspec.Struct`s of `create_serializer_file`
+    :param concurrency: the handler kind of every operation without `x-concurrency`, None generates async handlers
+    :param streaming_responses: stream every GET array response as ndjson
+    :param keyset_pagination: generate keyset pagination for every list operation without `x-pagination`
+    :param single_flight: coalesce identical concurrent requests of every async GET handler without `x-single-flight`
+    :param batch_loaders: load the resources of every GET by-id operation without `x-batch-loader` through a loader
+    :param etags: generate the ETag handling for every operation without `x-etag`
+    """
+    if shard_by is not None:
+        create_router_files(
+            definition,
+            shard_by,
+            export_folder=export_folder,
+            use_tempdir=use_tempdir,
+            openapi_schema_file=openapi_schema_file,
+            fast_responses=fast_responses,
+            msgspec_models=msgspec_models,
+            concurrency=concurrency,
+            streaming_responses=streaming_responses,
+            keyset_pagination=keyset_pagination,
+            etags=etags,
+            single_flight=single_flight,
+            batch_loaders=batch_loaders,
+        )
+        return
+
+    imports = list(BASE_IMPORTS)
+    security_definitions = []
+    # the module level `TypeAdapter`s of the response types
+    adapter_definitions = []
+    app_imports = []
+    views = [create_app(openapi_schema_file, app_imports), "\n"]
     for path in definition.paths:
-        views.append(create_view_func(path))
+        views.append(
+            create_view_func(
+                path,
+                definition.names,
+                imports=imports,
+                security_definitions=security_definitions,
+                adapter_definitions=adapter_definitions,
+                fast_responses=fast_responses,
+                msgspec_models=msgspec_models,
+                concurrency=concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+                single_flight=single_flight,
+                batch_loaders=batch_loaders,
+            )
+        )
 
     write_data_to_file(
         views,
-        import_statements=list(BASE_IMPORTS) + list(SECURITY_DEFINITIONS),
+        import_statements=imports + security_definitions + app_imports + adapter_definitions,
         file_name=VIEW_FILE_NAME,
         export_folder=export_folder,
         use_tempdir=use_tempdir,
     )
+    write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_single_flight_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_loaders_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+
+
+def create_router_files(
+    definition: OpenAPIDefinition,
+    shard_by: ShardBy,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    openapi_schema_file: Optional[str] = None,
+    fast_responses: bool = False,
+    msgspec_models: bool = False,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+    single_flight: bool = False,
+    batch_loaders: bool = False,
+) -> None:
+    """
+    Writes one module with an `APIRouter` per shard, each module only imports the models its routes use.
+    The views file only creates the app and imports the routers of the selected shards.
+    """
+    app_imports = ["import importlib", "from fastapi import FastAPI", *SHARD_SELECTION_IMPORTS]
+    shards = shard_paths(definition, shard_by)
+    app_statements = [create_app(openapi_schema_file, app_imports)]
+    for shard_name, paths in shards.items():
+        imports = list(ROUTER_IMPORTS)
+        security_definitions = []
+        adapter_definitions = []
+        views = ["router = APIRouter()", "\n"]
+        for path in paths:
+            views.append(
+                create_view_func(
+                    path,
+                    definition.names,
+                    router="router",
+                    imports=imports,
+                    security_definitions=security_definitions,
+                    adapter_definitions=adapter_definitions,
+                    fast_responses=fast_responses,
+                    msgspec_models=msgspec_models,
+                    concurrency=concurrency,
+                    streaming_responses=streaming_responses,
+                    keyset_pagination=keyset_pagination,
+                    etags=etags,
+                    single_flight=single_flight,
+                    batch_loaders=batch_loaders,
+                )
+            )
+
+        module_name = f"{VIEW_FILE_NAME}_{shard_name}"
+        write_data_to_file(
+            views,
+            import_statements=imports + security_definitions + adapter_definitions,
+            file_name=module_name,
+            export_folder=export_folder,
+            use_tempdir=use_tempdir,
+        )
+        write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+        write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+        write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+        write_single_flight_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+        write_loaders_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    app_statements.append(
+        "for shard in SELECTED_SHARDS:\n"
+        f'{INDENT}app.include_router(importlib.import_module(f".{VIEW_FILE_NAME}_{{shard}}", __package__).router)'
+    )
+
+    write_data_to_file(
+        [create_shard_selection(shards), "\n".join(app_statements)],
+        import_statements=app_imports,
+        file_name=VIEW_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
+
+
+def create_files_streaming(
+    definition: OpenAPIDefinition,
+    *,
+    export_folder: Optional[Path] = None,
+    use_tempdir: bool = False,
+    openapi_schema_file: Optional[str] = None,
+    fast_responses: bool = False,
+    msgspec_models: bool = False,
+    concurrency: Optional[Concurrency] = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+    single_flight: bool = False,
+    batch_loaders: bool = False,
+) -> None:
+    """
+    Writes the models and views files while the paths are lowered one at a time.
+    Every path is dropped as soon as its routes were written, so the memory usage doesn't grow with the number
+    of paths. Only the components of `definition` may be parsed (`parse_components`), its raw paths get consumed.
+    """
+    enum_classes = {}
+    patterns = PatternRegistry(definition.names)
+    serializers = FragmentFileWriter(SERIALIZER_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    if msgspec_models:
+        models = create_structs(definition)
+    else:
+        models = create_models(definition, enum_classes, patterns)
+        # the pattern constants are referenced by the validators
+        serializers.write("\n".join(patterns.new_declarations()))
+    for schema_def in models:
+        serializers.write(schema_def)
+
+    imports = list(BASE_IMPORTS)
+    security_definitions = []
+    adapter_definitions = []
+    views = FragmentFileWriter(VIEW_FILE_NAME, export_folder=export_folder, use_tempdir=use_tempdir)
+    app_imports = []
+    views.write(create_app(openapi_schema_file, app_imports))
+    for path in definition.iter_paths(consume=True):
+        for method in path.methods:
+            if method.query_schema is None:
+                continue
+            if msgspec_models:
+                # the annotations are lazy, a Struct may follow the codecs
+                serializers.write(create_struct(method.query_schema.name, method.query_schema))
+                continue
+            known_enum_classes = len(enum_classes)
+            schema_def = create_model(method.query_schema.name, method.query_schema, enum_classes, patterns)
+            # enum classes and patterns have to be defined before the first model which uses them
+            for enum_class in list(enum_classes.values())[known_enum_classes:]:
+                serializers.write(enum_class)
+            serializers.write("\n".join(patterns.new_declarations()))
+            serializers.write(schema_def)
+
+        views.write(
+            create_view_func(
+                path,
+                definition.names,
+                imports=imports,
+                security_definitions=security_definitions,
+                adapter_definitions=adapter_definitions,
+                fast_responses=fast_responses,
+                msgspec_models=msgspec_models,
+                concurrency=concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+                single_flight=single_flight,
+                batch_loaders=batch_loaders,
+            )
+        )
+
+    serializers.close(STRUCT_IMPORTS if msgspec_models else SERIALIZER_IMPORT + pattern_imports(patterns))
+    views.close(imports + security_definitions + app_imports + adapter_definitions)
+    write_pagination_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_etag_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_cache_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_single_flight_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
+    write_loaders_module(imports, export_folder=export_folder, use_tempdir=use_tempdir)
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import black
+import isort
+
+CACHE_DIR_ENV = "PY_OPENAPI_TOOLS_CACHE_DIR"
+# the fragment cache drops the least recently used entries above this size, down to `PRUNE_RATIO` of it
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+PRUNE_RATIO = 0.75
+
+BLACK_MODE = black.Mode()
+
+# isort places two blank lines after the imports if one of these follows, otherwise one
+STATEMENT_DECLARATIONS = ("def ", "class ", "@", "async def ")
+
+
+def default_cache_dir() -> Path:
+    if cache_dir := os.environ.get(CACHE_DIR_ENV):
+        return Path(cache_dir)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "py-openapi-tools" / "fragments"
+
+
+def _normalize(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(str, value))
+    if isinstance(value, (list, tuple)):
+        return [_normalize(obj) for obj in value]
+    if isinstance(value, dict):
+        return {str(key): _normalize(val) for key, val in value.items()}
+    if isinstance(value, (int, float, str, bool, type(None))):
+        return value
+    return str(value)
+
+
+def formatter_fingerprint(isort_config: isort.Config) -> str:
+    """
+    Everything besides the fragment itself which changes the formatted result
+    """
+    isort_settings = {key: _normalize(val) for key, val in vars(isort_config).items() if not key.startswith("_")}
+    return json.dumps(
+        {
+            "black": black.__version__,
+            "black_mode": BLACK_MODE.get_cache_key(),
+            "isort": isort.__version__,
+            "isort_config": isort_settings,
+        },
+        sort_keys=True,
+    )
+
+
+class FragmentCache:
+    """
+    Content addressed on-disk cache of formatted code fragments.
+    The key is built from the unformatted fragment, the formatter versions and their configuration.
+    The modification time of an entry is its last use, the least recently used entries are evicted once the cache
+    grows above `max_bytes`.
+    """
+
+    directory: Path
+    max_bytes: int
+    hits: int
+    misses: int
+    _size: Optional[int]
+
+    __slots__ = ("directory", "max_bytes", "hits", "misses", "_size")
+
+    def __init__(self, directory: Path, *, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # the size of the entries, measured by the first `set`
+        self._size = None
+
+    @staticmethod
+    def key(kind: str, fingerprint: str, fragment: str) -> str:
+        digest = hashlib.sha256()
+        for part in (kind, fingerprint, fragment):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.py"
+
+    def get(self, key: str) -> Optional[str]:
+        file = self._file(key)
+        try:
+            value = file.read_text()
+            os.utime(file)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        file = self._file(key)
+        if self._size is None:
+            self.prune()
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first so that concurrent runs never read half written entries
+            with tempfile.NamedTemporaryFile("w", dir=file.parent, delete=False, suffix=".tmp") as fp:
+                fp.write(value)
+            os.replace(fp.name, file)
+        except OSError:
+            return
+        self._size += len(value.encode())
+        if self._size > self.max_bytes:
+            self.prune()
+
+    def prune(self) -> None:
+        """
+        Evicts the least recently used entries until the cache is below `PRUNE_RATIO` of `max_bytes`
+        """
+        entries = []
+        for file in self.directory.glob("*/*.py"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        self._size = sum(size for _, size, _ in entries)
+        if self._size <= self.max_bytes:
+            return
+        for _, size, file in sorted(entries, key=lambda obj: obj[0]):
+            if self._size <= self.max_bytes * PRUNE_RATIO:
+                break
+            try:
+                file.unlink()
+            except OSError:
+                continue
+            self._size -= size
+
+
+_fragment_cache: Optional[FragmentCache] = None
+_cache_enabled = True
+
+
+def configure_cache(directory: Optional[Path] = None, *, enabled: bool = True) -> None:
+    global _fragment_cache, _cache_enabled
+    _cache_enabled = enabled
+    _fragment_cache = FragmentCache(directory) if directory is not None else None
+
+
+def get_cache() -> Optional[FragmentCache]:
+    global _fragment_cache
+    if not _cache_enabled:
+        return None
+    if _fragment_cache is None:
+        _fragment_cache = FragmentCache(default_cache_dir())
+    return _fragment_cache
+
+
+def _is_import_block(code: str) -> bool:
+    return all(
+        line.startswith(("import ", "from ")) or line.startswith((" ", ")")) or not line.strip()
+        for line in code.splitlines()
+    )
+
+
+class FragmentFormatter:
+    """
+    Formats the import header and single fragments (class, view function, ...) of a generated file
+    """
+
+    isort_config: isort.Config
+    fingerprint: str
+    cache: Optional[FragmentCache]
+
+    __slots__ = ("isort_config", "fingerprint", "cache")
+
+    def __init__(self, *, settings_path: Optional[Path] = None, cache: Optional[FragmentCache] = None):
+        self.isort_config = isort.Config(settings_path=str(settings_path)) if settings_path else isort.Config()
+        self.fingerprint = formatter_fingerprint(self.isort_config)
+        self.cache = cache
+
+    def _cached(self, kind: str, code: str, formatter) -> str:
+        if self.cache is None:
+            return formatter(code)
+        key = FragmentCache.key(kind, self.fingerprint, code)
+        if (formatted := self.cache.get(key)) is not None:
+            return formatted
+        formatted = formatter(code)
+        self.cache.set(key, formatted)
+        return formatted
+
+    def format_header(self, import_statements: list[str]) -> str:
+        return self._cached(
+            "header",
+            "\n".join(import_statements),
+            lambda code: black.format_str(isort.code(code, config=self.isort_config), mode=BLACK_MODE),
+        ).rstrip("\n")
+
+    def format_fragment(self, fragment: str) -> str:
+        """
+        :raises black.InvalidInput: if the fragment isn't valid python on its own
+        """
+        return self._cached("fragment", fragment, lambda code: black.format_str(code, mode=BLACK_MODE)).rstrip("\n")
+
+    def format_list_item(self, item: str) -> str:
+        """
+        Formats a single element of a top level list literal, e.g. one entry of `urlpatterns`
+        :return: the formatted element including its trailing comma and newline
+        """
+        formatted = self._cached("list_item", item, lambda code: black.format_str(f"_ = [\n{code}\n]", mode=BLACK_MODE))
+        return "".join(formatted.splitlines(keepends=True)[1:-1])
+
+    @staticmethod
+    def header_separator(header: str, first_fragment: str) -> str:
+        """
+        The blank lines isort + black put between the imports and the first statement
+        """
+        if not header or not first_fragment:
+            return ""
+        if _is_import_block(header) and not first_fragment.startswith(STATEMENT_DECLARATIONS):
+            return "\n\n"
+        return "\n\n\n"
+
+
+def format_fragments(
+    import_statements: list[str],
+    data: list[str],
+    *,
+    settings_path: Optional[Path] = None,
+    cache: Optional[FragmentCache] = None,
+) -> str:
+    """
+    Formats the import header and every fragment (class, view function, ...) on its own and puts the results
+    together the way isort + black would format the complete file.
+    :raises black.InvalidInput: if a fragment isn't valid python on its own
+    """
+    formatter = FragmentFormatter(settings_path=settings_path, cache=cache)
+    header = formatter.format_header(import_statements)
+    fragments = [formatter.format_fragment(obj) for obj in data if obj.strip()]
+
+    first_fragment = fragments[0] if fragments else ""
+    return header + formatter.header_separator(header, first_fragment) + "\n\n\n".join(fragments) + "\n"
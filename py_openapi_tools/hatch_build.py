@@ -0,0 +1,194 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Optional
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+from hatchling.plugin import hookimpl
+
+from py_openapi_tools import formatting, hooks
+from py_openapi_tools.sharding import ShardBy
+
+PLUGIN_NAME = "py-openapi-tools"
+
+FRAMEWORKS = ("drf", "fastapi", "asgi", "aiohttp", "client")
+
+# bump to invalidate every cached build output
+CACHE_VERSION = "1"
+
+
+def default_cache_dir() -> Path:
+    return formatting.default_cache_dir().parent / "builds"
+
+
+def generator_fingerprint() -> str:
+    """
+    Hash of the generator sources, a changed generator never reuses outputs of an older one
+    """
+    digest = hashlib.sha256()
+    for file in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(file.name.encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def plugin_fingerprint() -> list[str]:
+    """
+    The installed hook plugins and their versions, the plugins change the generated code too
+    """
+    res = []
+    for entry_point in entry_points(group=hooks.ENTRY_POINT_GROUP):
+        dist = f"{entry_point.dist.name} {entry_point.dist.version}" if entry_point.dist else ""
+        res.append(f"{entry_point.name} = {entry_point.value} ({dist})")
+    return sorted(res)
+
+
+def cache_key(spec: Path, options: dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    digest.update(CACHE_VERSION.encode())
+    digest.update(generator_fingerprint().encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    if options.get("plugins"):
+        digest.update(json.dumps(plugin_fingerprint()).encode())
+    digest.update(spec.read_bytes())
+    return digest.hexdigest()
+
+
+def run_generator(args: list[str]) -> None:
+    """
+    Runs `py_openapi_tools generate` in the build process, its output is dropped
+    """
+    from py_openapi_tools.reader import cli
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main(args, standalone_mode=False)
+
+
+def generate_target(spec: Path, options: dict[str, Any], *, cache_dir: Path) -> Path:
+    """
+    Runs the generator for the spec unless the cache already contains its output
+    :param options: `framework`, `shard-by`, `concurrency`, `streaming-responses`, `keyset-pagination`,
+        `etags`, `single-flight`, `batch-loaders`, `precomputed-openapi`, `fast-responses`, `models` and `plugins` of
+        the target, the hook plugins are only loaded if `plugins` is set
+    :return: the directory with the generated files
+    """
+    output = cache_dir / cache_key(spec, options)
+    if output.is_dir():
+        return output
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+        export_folder = Path(tmp_dir) / "output"
+        args = [
+            "generate",
+            str(spec),
+            "--framework",
+            options["framework"],
+            "--export-folder",
+            str(export_folder),
+        ]
+        if options.get("shard-by"):
+            args.extend(["--shard-by", options["shard-by"]])
+        if options.get("concurrency"):
+            args.extend(["--concurrency", options["concurrency"]])
+        if options.get("streaming-responses"):
+            args.append("--streaming-responses")
+        if options.get("keyset-pagination"):
+            args.append("--keyset-pagination")
+        if options.get("etags"):
+            args.append("--etags")
+        if options.get("single-flight"):
+            args.append("--single-flight")
+        if options.get("batch-loaders"):
+            args.append("--batch-loaders")
+        if options.get("precomputed-openapi"):
+            args.append("--precomputed-openapi")
+        if options.get("fast-responses"):
+            args.append("--fast-responses")
+        if options.get("models"):
+            args.extend(["--models", options["models"]])
+        if not options.get("plugins"):
+            args.append("--no-plugins")
+        run_generator(args)
+        try:
+            os.replace(export_folder, output)
+        except OSError:
+            # a concurrent build already stored the same output
+            if not output.is_dir():
+                raise
+    return output
+
+
+class OpenAPIBuildHook(BuildHookInterface):
+    """
+    Generates the serializers/views of the configured specs while the wheel gets built.
+
+    [[tool.hatch.build.targets.wheel.hooks.py-openapi-tools.targets]]
+    spec = "openapi.yaml"
+    framework = "fastapi"
+    package = "my_app/api"
+    """
+
+    PLUGIN_NAME = PLUGIN_NAME
+
+    def _target_options(self, idx: int, target: dict) -> tuple[Path, str, dict[str, Any]]:
+        prefix = f"Option `targets[{idx}]` of build hook `{PLUGIN_NAME}`"
+        if not isinstance(target, dict) or not target.get("spec") or not target.get("package"):
+            raise TypeError(f"{prefix} must be a table with `spec` and `package`")
+
+        spec = Path(self.root) / target["spec"]
+        if not spec.is_file():
+            raise FileNotFoundError(f"{prefix}: spec `{target['spec']}` doesn't exist")
+
+        options = {
+            "framework": target.get("framework", "drf"),
+            "shard-by": target.get("shard-by"),
+            "concurrency": target.get("concurrency"),
+            "streaming-responses": bool(target.get("streaming-responses", False)),
+            "keyset-pagination": bool(target.get("keyset-pagination", False)),
+            "etags": bool(target.get("etags", False)),
+            "single-flight": bool(target.get("single-flight", False)),
+            "batch-loaders": bool(target.get("batch-loaders", False)),
+            "precomputed-openapi": bool(target.get("precomputed-openapi", False)),
+            "fast-responses": bool(target.get("fast-responses", False)),
+            "models": target.get("models"),
+            "plugins": bool(target.get("plugins", False)),
+        }
+        if options["framework"] not in FRAMEWORKS:
+            raise ValueError(f"{prefix}: `framework` must be one of {', '.join(FRAMEWORKS)}")
+        if options["shard-by"] is not None and options["shard-by"] not in [obj.value for obj in ShardBy]:
+            raise ValueError(f"{prefix}: `shard-by` must be one of {', '.join(obj.value for obj in ShardBy)}")
+        if options["concurrency"] not in (None, "sync", "async"):
+            raise ValueError(f"{prefix}: `concurrency` must be one of sync, async")
+        if options["models"] not in (None, "pydantic", "msgspec"):
+            raise ValueError(f"{prefix}: `models` must be one of pydantic, msgspec")
+        return spec, target["package"].strip("/"), options
+
+    def _cache_dir(self) -> Path:
+        if cache_dir := self.config.get("cache-dir"):
+            return Path(self.root) / cache_dir
+        return default_cache_dir()
+
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        # the sdist ships the specs, only wheels contain generated code
+        if self.target_name != "wheel":
+            return
+
+        cache_dir = self._cache_dir()
+        for idx, target in enumerate(self.config.get("targets", [])):
+            spec, package, options = self._target_options(idx, target)
+            output = generate_target(spec, options, cache_dir=cache_dir)
+            for file in sorted(output.iterdir()):
+                build_data["force_include"][str(file)] = f"{package}/{file.name}"
+            if self.app is not None:
+                self.app.display_info(f"{PLUGIN_NAME}: {target['spec']} -> {package}")
+
+
+@hookimpl
+def hatch_register_build_hook() -> Optional[type[BuildHookInterface]]:
+    return OpenAPIBuildHook
@@ -0,0 +1,122 @@
+import time
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Callable, Optional
+
+ENTRY_POINT_GROUP = "py_openapi_tools.hooks"
+
+# post_load(data, *, file) -> the raw openapi data, after the file was read
+# post_parse(definition) -> the parsed OpenAPIDefinition
+# per_schema_emit(code, *, schema_name, schema, framework) -> the code of a serializer/model, "" drops it
+# per_operation_emit(code, *, path, methods, framework) -> the code of a view, "" drops it
+# pre_write(content, *, file) -> the formatted content of a generated file
+HOOK_NAMES = ("post_load", "post_parse", "per_schema_emit", "per_operation_emit", "pre_write")
+
+Hook = Callable[..., Any]
+
+
+@dataclass(slots=True)
+class HookTiming:
+    hook: str
+    plugin: str
+    calls: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+
+def _plugin_name(func: Hook) -> str:
+    return f"{getattr(func, '__module__', '?')}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class HookRegistry:
+    """
+    Extension points of the pipeline. A hook gets the current value and returns a replacement,
+    returning None keeps the value. Every call is timed, a hook name without registered hooks costs one dict lookup.
+    """
+
+    _hooks: dict[str, list[Hook]]
+    timings: dict[tuple[str, str], HookTiming]
+
+    __slots__ = ("_hooks", "timings")
+
+    def __init__(self):
+        self._hooks = {}
+        self.timings = {}
+
+    def register(self, name: str, func: Optional[Hook] = None):
+        """
+        Can be used as decorator, `@hooks.register("post_parse")`
+        :raises ValueError: for unknown hook names
+        """
+        if name not in HOOK_NAMES:
+            raise ValueError(f"Unknown hook {name}, expected one of {', '.join(HOOK_NAMES)}")
+        if func is None:
+            return lambda obj: self.register(name, obj)
+        self._hooks.setdefault(name, []).append(func)
+        return func
+
+    def has(self, name: str) -> bool:
+        return name in self._hooks
+
+    def call(self, name: str, value, **context):
+        hooks = self._hooks.get(name)
+        if not hooks:
+            return value
+        for hook in hooks:
+            start = time.perf_counter_ns()
+            try:
+                result = hook(value, **context)
+            finally:
+                self._record(name, hook, time.perf_counter_ns() - start)
+            if result is not None:
+                value = result
+        return value
+
+    def _record(self, name: str, hook: Hook, duration_ns: int) -> None:
+        plugin = _plugin_name(hook)
+        timing = self.timings.get((name, plugin))
+        if timing is None:
+            timing = self.timings[(name, plugin)] = HookTiming(hook=name, plugin=plugin)
+        timing.calls += 1
+        timing.total_ns += duration_ns
+        timing.max_ns = max(timing.max_ns, duration_ns)
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """
+        Every entry point refers to a callable which gets the registry, e.g. `def register(hooks): ...`
+        """
+        for entry_point in entry_points(group=group):
+            try:
+                entry_point.load()(self)
+            except Exception as exc:
+                print(f"Couldn't load hook plugin {entry_point.name}: {exc}")
+
+    def report(self) -> list[str]:
+        """
+        :return: one line per registered hook function, the slowest first
+        """
+        lines = []
+        for timing in sorted(self.timings.values(), key=lambda obj: obj.total_ns, reverse=True):
+            lines.append(
+                f"{timing.hook} {timing.plugin}: {timing.calls} calls, "
+                f"{timing.total_ns / 1e6:.2f} ms total, {timing.max_ns / 1e6:.2f} ms max"
+            )
+        return lines
+
+
+_registry: Optional[HookRegistry] = None
+
+
+def configure_hooks(*, load_plugins: bool = True) -> HookRegistry:
+    global _registry
+    _registry = HookRegistry()
+    if load_plugins:
+        _registry.load_entry_points()
+    return _registry
+
+
+def get_registry() -> HookRegistry:
+    global _registry
+    if _registry is None:
+        _registry = HookRegistry()
+    return _registry
@@ -0,0 +1,230 @@
+import enum
+import json
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from py_openapi_tools.patterns import PatternRisk, analyze_pattern, get_pattern
+from py_openapi_tools.schema import ApiPath, Method, OpenAPIDefinition, Property, QueryParam, Schema, SchemaType
+
+# compared after lower casing and removing `-` and `_`
+PAGINATION_PARAMETERS = frozenset(
+    ("limit", "offset", "page", "pagesize", "perpage", "cursor", "after", "before", "pagetoken", "nexttoken")
+)
+LIMIT_PARAMETERS = frozenset(("limit", "pagesize", "perpage", "size", "top", "first"))
+
+# `allOf` schemas nested deeper than this are flagged
+MAX_ALL_OF_DEPTH = 3
+
+
+class Severity(enum.Enum):
+    WARNING = "warning"
+    ERROR = "error"
+
+
+@dataclass(slots=True, frozen=True)
+class LintIssue:
+    rule: str
+    severity: Severity
+    # `GET /pet` for operations, the JSON pointer for component schemas
+    location: str
+    message: str
+
+    def to_dict(self) -> dict:
+        return {
+            "rule": self.rule,
+            "severity": self.severity.value,
+            "location": self.location,
+            "message": self.message,
+        }
+
+
+def _normalize_parameter_name(name: str) -> str:
+    return name.lower().replace("_", "").replace("-", "")
+
+
+def _operation(path: ApiPath, method: Method) -> str:
+    return f"{method.request_type.upper()} {path.path}"
+
+
+def _is_paginated(method: Method) -> bool:
+    return any(
+        param.position == "query" and _normalize_parameter_name(param.name) in PAGINATION_PARAMETERS
+        for param in method.parameters
+    )
+
+
+def _returns_array(method: Method) -> bool:
+    response_schema = method.get_success_response_schema()
+    return response_schema is not None and response_schema.type == SchemaType.ARRAY
+
+
+def _string_properties(schema: Schema, seen: set[int], prefix: str = "") -> Iterator[tuple[str, Property]]:
+    """
+    :return: the dotted name and the property of every string property, nested schemas included
+    """
+    if id(schema) in seen:
+        return
+    seen.add(id(schema))
+    for prop in schema.properties:
+        if prop.type is str:
+            yield f"{prefix}{prop.name}", prop
+        elif isinstance(prop.ref, Schema):
+            yield from _string_properties(prop.ref, seen, f"{prefix}{prop.name}.")
+
+
+def _has_maximum(param: QueryParam) -> bool:
+    return any("maximum" in prop.additional_requirements for prop in param.schema.properties)
+
+
+def _all_of_depth(schema: Schema, seen: tuple[int, ...] = ()) -> int:
+    if not schema.combined_schemas or id(schema) in seen:
+        return 0
+    children = [obj for obj in schema.combined_schemas.get("allOf", ()) if isinstance(obj, Schema)]
+    if not children:
+        return 0
+    return 1 + max(_all_of_depth(obj, (*seen, id(schema))) for obj in children)
+
+
+def _is_unbounded_array(method: Method) -> bool:
+    """
+    :return: true if neither pagination parameters nor `maxItems` limit the array response of the operation
+    """
+    if not _returns_array(method) or _is_paginated(method):
+        return False
+    return "maxItems" not in method.get_success_response_schema().additional_requirements
+
+
+def unbounded_array_response(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for path in definition.paths:
+        for method in path.methods:
+            if _is_unbounded_array(method):
+                yield LintIssue(
+                    rule="unbounded-array-response",
+                    severity=Severity.ERROR,
+                    location=_operation(path, method),
+                    message="Array response without maxItems and without limit/offset or cursor parameters.",
+                )
+
+
+def list_endpoint_without_pagination(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for path in definition.paths:
+        for method in path.methods:
+            # an unbounded response is already reported as unbounded-array-response
+            if _is_unbounded_array(method):
+                continue
+            if method.request_type == "get" and _returns_array(method) and not _is_paginated(method):
+                yield LintIssue(
+                    rule="list-endpoint-without-pagination",
+                    severity=Severity.WARNING,
+                    location=_operation(path, method),
+                    message="GET list endpoint without pagination parameters.",
+                )
+
+
+def unbounded_request_string(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for path in definition.paths:
+        for method in path.methods:
+            if method.request_type == "get" or not method.request_schema.name:
+                continue
+            for name, prop in _string_properties(method.request_schema, set()):
+                if prop.enum_values or "maxLength" in prop.additional_requirements:
+                    continue
+                yield LintIssue(
+                    rule="unbounded-request-string",
+                    severity=Severity.WARNING,
+                    location=_operation(path, method),
+                    message=f"String property '{name}' of the request body has no maxLength.",
+                )
+
+
+def unbounded_limit_parameter(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for path in definition.paths:
+        for method in path.methods:
+            for param in method.parameters:
+                if param.position != "query" or _normalize_parameter_name(param.name) not in LIMIT_PARAMETERS:
+                    continue
+                if not _has_maximum(param):
+                    yield LintIssue(
+                        rule="unbounded-limit-parameter",
+                        severity=Severity.ERROR,
+                        location=_operation(path, method),
+                        message=f"Parameter '{param.name}' has no maximum.",
+                    )
+
+
+def deep_all_of_chain(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for name, schema in definition.created_schemas.items():
+        if (depth := _all_of_depth(schema)) > MAX_ALL_OF_DEPTH:
+            yield LintIssue(
+                rule="deep-all-of-chain",
+                severity=Severity.WARNING,
+                location=f"#/components/schemas/{name}",
+                message=f"allOf chain is {depth} levels deep (maximum {MAX_ALL_OF_DEPTH}).",
+            )
+
+
+def _pattern_issues(pattern: str, location: str, name: str) -> Iterator[LintIssue]:
+    for issue in analyze_pattern(pattern):
+        yield LintIssue(
+            rule="redos-pattern" if issue.risk != PatternRisk.INVALID else "invalid-pattern",
+            severity=Severity.ERROR if issue.risk == PatternRisk.INVALID or issue.exponential else Severity.WARNING,
+            location=location,
+            message=f"Pattern of '{name}': {issue.message} ({issue.risk.value})",
+        )
+
+
+def unsafe_pattern(definition: OpenAPIDefinition) -> Iterator[LintIssue]:
+    for name, schema in definition.created_schemas.items():
+        for prop in schema.properties:
+            if pattern := get_pattern(prop):
+                yield from _pattern_issues(pattern, f"#/components/schemas/{name}", prop.name)
+    for path in definition.paths:
+        for method in path.methods:
+            for param in method.parameters:
+                for prop in param.schema.properties:
+                    if pattern := get_pattern(prop):
+                        yield from _pattern_issues(pattern, _operation(path, method), param.name)
+
+
+PERF_RULES: tuple[Callable[[OpenAPIDefinition], Iterator[LintIssue]], ...] = (
+    unbounded_array_response,
+    list_endpoint_without_pagination,
+    unbounded_request_string,
+    unbounded_limit_parameter,
+    deep_all_of_chain,
+    unsafe_pattern,
+)
+
+RULES = {"perf": PERF_RULES}
+
+
+def lint(definition: OpenAPIDefinition, categories: tuple[str, ...] = tuple(RULES)) -> list[LintIssue]:
+    """
+    :param definition: the parsed openapi definition
+    :param categories: the rule sets to run, see `RULES`
+    :return: the issues in rule order, every rule reports in spec order
+    """
+    issues = []
+    for category in categories:
+        for rule in RULES[category]:
+            issues.extend(rule(definition))
+    return issues
+
+
+def issues_to_json(issues: list[LintIssue]) -> str:
+    summary = {severity.value: 0 for severity in Severity}
+    for issue in issues:
+        summary[issue.severity.value] += 1
+    return json.dumps({"issues": [issue.to_dict() for issue in issues], "summary": summary}, indent=2)
+
+
+def should_fail(issues: list[LintIssue], fail_on: str) -> bool:
+    """
+    :param fail_on: `error`, `warning` or `never`
+    """
+    match fail_on:
+        case "error":
+            return any(issue.severity == Severity.ERROR for issue in issues)
+        case "warning":
+            return bool(issues)
+    return False
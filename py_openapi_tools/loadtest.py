@@ -0,0 +1,611 @@
+import datetime as dt
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Template
+from typing import Any, Optional
+from urllib.parse import quote
+
+from py_openapi_tools.formatting import format_fragments
+from py_openapi_tools.schema import ApiPath, Method, OpenAPIDefinition, Property, QueryParam, Schema, create_property
+from py_openapi_tools.sharding import DEFAULT_SHARD
+from py_openapi_tools.structs import struct_fields
+
+LOADTEST_FILE_NAME = "loadtest.py"
+# the generated apps listen here when they are started locally
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+# relative weight of an operation within its tag, e.g. `x-loadtest-weight: 5` for a hot read path
+WEIGHT_EXTENSION = "x-loadtest-weight"
+# nested schemas deeper than this only get their required fields
+MAX_PAYLOAD_DEPTH = 4
+
+# used for the payloads if a value has neither an example nor an enum
+DEFAULT_SAMPLES = {
+    str: "string",
+    int: 1,
+    float: 1.0,
+    bool: True,
+    dt.date: "2024-01-01",
+    dt.datetime: "2024-01-01T00:00:00Z",
+}
+
+LOADTEST_IMPORTS = [
+    "import argparse",
+    "import asyncio",
+    "import json",
+    "import math",
+    "import random",
+    "import ssl",
+    "import sys",
+    "import urllib.parse",
+    "from dataclasses import dataclass, field, replace",
+]
+
+LOADTEST_DOCSTRING = Template('''#!/usr/bin/env python
+"""
+Open-loop load test of $title, only the standard library is needed.
+
+    python $file_name --base-url $base_url --rate 200 --duration 30 --weight $example_tag=3
+
+The requests are started at a constant rate whether or not the earlier ones have been answered. The latency of a
+request is measured from the time it was scheduled, the time it waited for a connection of the pool is part of it.
+"""
+
+''')
+
+LOADTEST_CONSTANTS = Template("""
+BASE_URL = "$base_url"
+# tag -> weight, the share of an operation is the weight of its tag times its own weight
+TAG_WEIGHTS = $tag_weights
+PERCENTILES = (50, 95, 99)
+""")
+
+# the HTTP/1.1 keep-alive pool, the open-loop scheduler and the report
+LOADTEST_RUNTIME = '''
+@dataclass(slots=True)
+class Operation:
+    operation_id: str
+    method: str
+    path: str
+    tag: str
+    weight: float = 1.0
+    query: dict[str, object] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    body: object = None
+
+
+@dataclass(slots=True)
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    # requests without an answer: refused connections, timeouts, ...
+    failures: int = 0
+
+
+def query_value(value: object) -> object:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return [query_value(obj) for obj in value]
+    return value
+
+
+def encode_request(operation: Operation, url: urllib.parse.SplitResult, headers: dict[str, str]) -> bytes:
+    """
+    :return: the complete request, built once per operation and sent as is
+    """
+    target = url.path.rstrip("/") + operation.path
+    if operation.query:
+        query = {key: query_value(val) for key, val in operation.query.items()}
+        target += "?" + urllib.parse.urlencode(query, doseq=True)
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    lines = [f"{operation.method} {target} HTTP/1.1", f"Host: {url.netloc}", f"Content-Length: {len(body)}"]
+    if operation.body is not None:
+        lines.append("Content-Type: application/json")
+    lines.extend(f"{key}: {val}" for key, val in {**operation.headers, **headers}.items())
+    return ("\\r\\n".join(lines) + "\\r\\n\\r\\n").encode("latin-1") + body
+
+
+class ConnectionPool:
+    """
+    At most `size` keep-alive connections, a request waits for a free one
+    """
+
+    def __init__(self, url: urllib.parse.SplitResult, *, size: int):
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def request(self, method: str, data: bytes) -> int:
+        async with self._semaphore:
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._connect()
+            try:
+                status, keep_alive = await self._exchange(connection, method, data)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection[1].close()
+                if not reused:
+                    raise
+                # the server closed the idle connection in the meantime
+                connection = await self._connect()
+                status, keep_alive = await self._exchange(connection, method, data)
+            except BaseException:
+                connection[1].close()
+                raise
+            if keep_alive:
+                self._idle.append(connection)
+            else:
+                connection[1].close()
+            return status
+
+    async def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    @staticmethod
+    async def _exchange(
+        connection: tuple[asyncio.StreamReader, asyncio.StreamWriter], method: str, data: bytes
+    ) -> tuple[int, bool]:
+        """
+        :return: the status code and whether the connection can be used again, the body is read and dropped
+        """
+        reader, writer = connection
+        writer.write(data)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("the server closed the connection")
+        version, status, *_ = status_line.split(b" ", 2)
+        status_code = int(status)
+        headers = {}
+        while (line := await reader.readline()) not in (b"\\r\\n", b"\\n", b""):
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip().lower()
+        keep_alive = version == b"HTTP/1.1" and headers.get(b"connection") != b"close"
+        if method == "HEAD" or status_code in (204, 304) or status_code < 200:
+            return status_code, keep_alive
+        if b"chunked" in headers.get(b"transfer-encoding", b""):
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                await reader.readexactly(size + 2)
+            # the trailers end with an empty line
+            while (await reader.readline()) not in (b"\\r\\n", b"\\n", b""):
+                pass
+        elif b"content-length" in headers:
+            await reader.readexactly(int(headers[b"content-length"]))
+        else:
+            # the body ends with the connection
+            await reader.read()
+            keep_alive = False
+        return status_code, keep_alive
+
+
+async def send(
+    pool: ConnectionPool, operation: Operation, data: bytes, *, scheduled: float, timeout: float, stats: Stats
+) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        status = await asyncio.wait_for(pool.request(operation.method, data), timeout)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+        stats.failures += 1
+        return
+    stats.latencies.append(loop.time() - scheduled)
+    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+
+async def run(
+    operations: list[Operation],
+    *,
+    url: urllib.parse.SplitResult,
+    rate: float,
+    duration: float,
+    connections: int,
+    timeout: float,
+    headers: dict[str, str],
+    seed: int,
+) -> tuple[dict[str, Stats], float, float]:
+    """
+    Starts `rate` requests per second for `duration` seconds, the operations are picked by their weights
+    :return: operationId -> stats, the seconds from the first request to the last answer, the largest delay of the
+    scheduler
+    """
+    loop = asyncio.get_running_loop()
+    pool = ConnectionPool(url, size=connections)
+    stats = {operation.operation_id: Stats() for operation in operations}
+    requests = [encode_request(operation, url, headers) for operation in operations]
+    indexes = random.Random(seed).choices(
+        range(len(operations)), weights=[operation.weight for operation in operations], k=int(rate * duration)
+    )
+    tasks = []
+    lag = 0.0
+    start = loop.time()
+    for count, index in enumerate(indexes):
+        scheduled = start + count / rate
+        if (delay := scheduled - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        else:
+            lag = max(lag, -delay)
+        operation = operations[index]
+        tasks.append(
+            asyncio.create_task(
+                send(
+                    pool,
+                    operation,
+                    requests[index],
+                    scheduled=scheduled,
+                    timeout=timeout,
+                    stats=stats[operation.operation_id],
+                )
+            )
+        )
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    await pool.close()
+    return stats, elapsed, lag
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """
+    :return: the nearest-rank percentile of the sorted values
+    """
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def summarize(stats: dict[str, Stats], elapsed: float) -> dict[str, dict[str, object]]:
+    """
+    :return: operationId -> count, errors (failures and status codes from 400), throughput (requests per second) and
+    the latency percentiles of the answered requests in milliseconds, the operations which were never picked are left
+    out
+    """
+    report = {}
+    total = Stats()
+    for operation_id, obj in [*stats.items(), ("total", total)]:
+        count = len(obj.latencies) + obj.failures
+        if not count:
+            continue
+        ordered = sorted(obj.latencies)
+        report[operation_id] = {
+            "count": count,
+            "errors": obj.failures + sum(val for key, val in obj.statuses.items() if key >= 400),
+            "statuses": dict(sorted(obj.statuses.items())),
+            "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+            **{f"p{percent}": round(percentile(ordered, percent) * 1000, 2) for percent in PERCENTILES},
+        }
+        if obj is not total:
+            total.latencies.extend(obj.latencies)
+            total.failures += obj.failures
+            for status, status_count in obj.statuses.items():
+                total.statuses[status] = total.statuses.get(status, 0) + status_count
+    return report
+
+
+def report_to_text(report: dict[str, dict[str, object]]) -> str:
+    columns = {"count": "count", "errors": "errors", "throughput": "req/s"}
+    columns.update({f"p{percent}": f"p{percent} ms" for percent in PERCENTILES})
+    width = max([len("operation"), *(len(obj) for obj in report)])
+    lines = [f"{'operation':<{width}}" + "".join(f"{label:>12}" for label in columns.values())]
+    for operation_id, row in report.items():
+        lines.append(f"{operation_id:<{width}}" + "".join(f"{row[column]:>12}" for column in columns))
+    return "\\n".join(lines)
+
+
+def parse_weights(values: list[str]) -> dict[str, float]:
+    weights = dict(TAG_WEIGHTS)
+    for value in values:
+        tag, _, weight = value.rpartition("=")
+        try:
+            weights[tag] = float(weight)
+        except ValueError:
+            raise SystemExit(f"invalid weight {value!r}, expected TAG=WEIGHT")
+    return weights
+
+
+def parse_headers(values: list[str]) -> dict[str, str]:
+    headers = {}
+    for value in values:
+        name, separator, content = value.partition(":")
+        if not separator:
+            raise SystemExit(f"invalid header {value!r}, expected NAME: VALUE")
+        headers[name.strip()] = content.strip()
+    return headers
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--rate", type=float, default=50.0, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--connections", type=int, default=64, help="size of the keep-alive pool")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per request, counted as error")
+    parser.add_argument("--weight", action="append", default=[], metavar="TAG=WEIGHT", help="0 leaves a tag out")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME: VALUE", help="e.g. Authorization")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the operation mix")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.rate <= 0 or args.duration <= 0 or args.connections <= 0:
+        parser.error("--rate, --duration and --connections must be positive")
+
+    weights = parse_weights(args.weight)
+    operations = []
+    for operation in OPERATIONS:
+        weight = weights.get(operation.tag, 1.0) * operation.weight
+        if weight > 0:
+            operations.append(replace(operation, weight=weight))
+    if not operations:
+        parser.error("every operation has the weight 0")
+
+    stats, elapsed, lag = asyncio.run(
+        run(
+            operations,
+            url=urllib.parse.urlsplit(args.base_url),
+            rate=args.rate,
+            duration=args.duration,
+            connections=args.connections,
+            timeout=args.timeout,
+            headers=parse_headers(args.header),
+            seed=args.seed,
+        )
+    )
+    report = summarize(stats, elapsed)
+    print(json.dumps(report, indent=2) if args.json else report_to_text(report))
+    if lag > 0.01:
+        print(f"The load generator fell behind by up to {lag * 1000:.0f} ms, lower the rate", file=sys.stderr)
+    return 0
+'''
+
+LOADTEST_MAIN = """
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
+
+@dataclass(slots=True)
+class SampleRequest:
+    operation_id: str
+    method: str
+    # the path parameters are filled in and quoted
+    path: str
+    tag: str
+    query: dict[str, Any] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    # the JSON body, None if the operation has none
+    body: Any = None
+
+
+def _jsonable(value: Any) -> Any:
+    # yaml turns unquoted dates into date objects
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_jsonable(obj) for obj in value]
+    if isinstance(value, dict):
+        return {key: _jsonable(val) for key, val in value.items()}
+    return value
+
+
+def _resolve(definition: OpenAPIDefinition, schema: Schema) -> Schema:
+    return definition.created_schemas.get(schema.name, schema) if schema.name else schema
+
+
+def sample_value(prop: Property, definition: OpenAPIDefinition, *, depth: int = 0) -> Any:
+    """
+    :return: the example of the property, else its first enum value, else a value of its type within its
+    `minimum`/`minLength`... constraints
+    """
+    if prop.example not in (None, ""):
+        return _jsonable(prop.example)
+    if prop.enum_values:
+        return _jsonable(prop.enum_values[0])
+    requirements = prop.additional_requirements
+    if prop.type is list:
+        if isinstance(prop.ref, Schema):
+            item = sample_payload(prop.ref, definition, depth=depth + 1)
+        elif isinstance(prop.ref, Property):
+            item = sample_value(prop.ref, definition, depth=depth + 1)
+        else:
+            item = DEFAULT_SAMPLES[str]
+        return [item] * max(requirements.get("minItems", 1), 1)
+    if isinstance(prop.ref, Schema):
+        return sample_payload(prop.ref, definition, depth=depth + 1)
+    value = DEFAULT_SAMPLES.get(prop.type)
+    if prop.type in (int, float):
+        if (minimum := requirements.get("minimum")) is not None:
+            value = max(value, prop.type(math.ceil(minimum)))
+        if (maximum := requirements.get("maximum")) is not None:
+            value = min(value, prop.type(maximum))
+    elif prop.type is str:
+        value = value.ljust(requirements.get("minLength", 0), "x")[: requirements.get("maxLength")]
+    return value
+
+
+def sample_payload(schema: Schema, definition: OpenAPIDefinition, *, depth: int = 0) -> dict[str, Any]:
+    """
+    :return: the required and the exemplified properties of the schema, oneOf/anyOf schemas use their first schema
+    """
+    schema = _resolve(definition, schema)
+    combined = schema.combined_schemas or {}
+    members = [obj for obj in combined.get("oneOf") or combined.get("anyOf") or () if obj is not None]
+    if members:
+        return sample_payload(members[0], definition, depth=depth)
+    properties, required_fields = struct_fields(schema)
+    payload = {}
+    for prop in properties:
+        if prop.name in schema.read_only_fields or prop.additional_requirements.get("readOnly"):
+            continue
+        required = prop.name in required_fields
+        if required or (depth < MAX_PAYLOAD_DEPTH and (prop.example not in (None, "") or prop.enum_values)):
+            payload[prop.name] = sample_value(prop, definition, depth=depth)
+    return payload
+
+
+def sample_body(data: dict, definition: OpenAPIDefinition) -> Any:
+    """
+    :param data: the JSON schema of a request body as written in the spec
+    """
+    if "$ref" in data:
+        name = data["$ref"].split("/")[-1]
+        if name in definition.created_schemas:
+            return sample_payload(definition.created_schemas[name], definition)
+        return {}
+    if data.get("example") is not None:
+        return _jsonable(data["example"])
+    if data.get("type") == "array":
+        return [sample_body(data.get("items", {}), definition)]
+    if "properties" in data:
+        required_fields = set(data.get("required", []))
+        properties = [create_property(key, val, definition) for key, val in data["properties"].items()]
+        return {
+            prop.name: sample_value(prop, definition)
+            for prop in properties
+            if prop.name in required_fields or prop.example not in (None, "") or prop.enum_values
+        }
+    return sample_value(create_property("", data, definition), definition)
+
+
+def get_request_body(path: ApiPath, method: Method, definition: OpenAPIDefinition) -> Optional[dict]:
+    """
+    :return: the schema of the JSON request body, other media types aren't sent
+    """
+    operation = definition.openapi_data.get("paths", {}).get(path.path, {}).get(method.request_type, {})
+    request_body = operation.get("requestBody", {})
+    if "$ref" in request_body:
+        name = request_body["$ref"].split("/")[-1]
+        request_body = definition.openapi_data.get("components", {}).get("requestBodies", {}).get(name, {})
+    return request_body.get("content", {}).get("application/json", {}).get("schema")
+
+
+def sample_parameter(param: QueryParam, definition: OpenAPIDefinition) -> Any:
+    if not param.schema.properties:
+        return DEFAULT_SAMPLES[str]
+    value = sample_value(param.schema.properties[0], definition)
+    return DEFAULT_SAMPLES[str] if value is None else value
+
+
+def parse_tag_weights(values: list[str]) -> dict[str, float]:
+    """
+    :param values: e.g. `["pet=3", "store=0"]`
+    :raises ValueError: if a value isn't `TAG=WEIGHT` with a weight of at least 0
+    """
+    weights = {}
+    for value in values:
+        tag, separator, weight = value.rpartition("=")
+        if not separator or not tag:
+            raise ValueError(f"{value!r} isn't TAG=WEIGHT")
+        weights[tag] = float(weight)
+        if weights[tag] < 0:
+            raise ValueError(f"the weight of {tag!r} is negative")
+    return weights
+
+
+def get_weight(method: Method) -> float:
+    if (value := method.extensions.get(WEIGHT_EXTENSION)) is not None:
+        try:
+            if (weight := float(value)) >= 0:
+                return weight
+        except (TypeError, ValueError):
+            pass
+        print(f"Operation {method.operation_id}: invalid {WEIGHT_EXTENSION} {value!r}, using 1.0")
+    return 1.0
+
+
+def sample_request(path: ApiPath, method: Method, definition: OpenAPIDefinition) -> SampleRequest:
+    """
+    The path parameters are filled in, the required query, header and cookie parameters and the exemplified optional
+    ones get a value
+    """
+    request = SampleRequest(
+        operation_id=method.operation_id,
+        method=method.request_type.upper(),
+        path=path.path,
+        tag=method.tags[0] if method.tags else DEFAULT_SHARD,
+    )
+    cookies = []
+    for param in method.parameters:
+        if param.position == "path":
+            value = quote(str(sample_parameter(param, definition)), safe="")
+            request.path = request.path.replace(f"{{{param.name}}}", value)
+            continue
+        if not param.required and param.schema.properties and param.schema.properties[0].example in (None, ""):
+            continue
+        value = sample_parameter(param, definition)
+        match param.position:
+            case "query":
+                request.query[param.name] = value
+            case "header":
+                request.headers[param.name] = str(value)
+            case "cookie":
+                cookies.append(f"{param.name}={value}")
+    if cookies:
+        request.headers["Cookie"] = "; ".join(cookies)
+    if (request_body := get_request_body(path, method, definition)) is not None:
+        request.body = sample_body(request_body, definition)
+    return request
+
+
+def create_operation(path: ApiPath, method: Method, definition: OpenAPIDefinition) -> str:
+    """
+    :return: the `Operation(...)` of the method for the `OPERATIONS` of the script
+    """
+    request = sample_request(path, method, definition)
+    arguments = [repr(request.operation_id), repr(request.method), repr(request.path), repr(request.tag)]
+    if (weight := get_weight(method)) != 1.0:
+        arguments.append(f"weight={weight!r}")
+    if request.query:
+        arguments.append(f"query={request.query!r}")
+    if request.headers:
+        arguments.append(f"headers={request.headers!r}")
+    if request.body is not None:
+        arguments.append(f"body={request.body!r}")
+    return f"Operation({', '.join(arguments)})"
+
+
+def create_loadtest(
+    definition: OpenAPIDefinition,
+    *,
+    tag_weights: Optional[dict[str, float]] = None,
+    base_url: str = DEFAULT_BASE_URL,
+    file_name: str = LOADTEST_FILE_NAME,
+) -> str:
+    """
+    :param definition: the parsed openapi definition
+    :param tag_weights: tag -> weight, the tags of the spec which aren't part of it have the weight 1
+    :return: the source of the load test script
+    """
+    operations = []
+    weights = {}
+    for path in definition.paths:
+        for method in path.methods:
+            operations.append(create_operation(path, method, definition))
+            weights.setdefault(method.tags[0] if method.tags else DEFAULT_SHARD, 1.0)
+    weights.update({key: float(val) for key, val in (tag_weights or {}).items()})
+
+    docstring = LOADTEST_DOCSTRING.substitute(
+        title=definition.openapi_data.get("info", {}).get("title") or "the API",
+        file_name=file_name,
+        base_url=base_url,
+        example_tag=next(iter(weights), DEFAULT_SHARD),
+    )
+    constants = LOADTEST_CONSTANTS.substitute(base_url=base_url, tag_weights=repr(weights))
+    operation_list = "\nOPERATIONS = [\n" + "".join(f"    {obj},\n" for obj in operations) + "]\n"
+    return docstring + format_fragments(LOADTEST_IMPORTS, [constants, LOADTEST_RUNTIME, operation_list, LOADTEST_MAIN])
+
+
+def write_loadtest(
+    definition: OpenAPIDefinition,
+    output: Path,
+    *,
+    tag_weights: Optional[dict[str, float]] = None,
+    base_url: str = DEFAULT_BASE_URL,
+) -> Path:
+    output.write_text(
+        create_loadtest(definition, tag_weights=tag_weights, base_url=base_url, file_name=output.name),
+        encoding="utf-8",
+    )
+    return output
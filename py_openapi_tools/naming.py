@@ -0,0 +1,120 @@
+import functools
+import keyword
+import re
+from dataclasses import dataclass
+
+INVALID_CHARS = re.compile(r"\W")
+MODULE_SEPARATORS = re.compile(r"\W+|_+")
+
+CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def to_snake_case(txt: str) -> str:
+    """
+    Converts `camelCase`/`PascalCase` to `snake_case` and drops every character which is not allowed
+    inside a python identifier
+    :param txt: e.g. an operationId or a parameter name
+    :return: the snake_case version of `txt`
+    """
+    if not txt:
+        return txt
+
+    parts = []
+    for char in INVALID_CHARS.sub("", txt):
+        if char.isupper():
+            parts.append("_")
+        parts.append(char.lower())
+    return "".join(parts)
+
+
+def to_function_name(operation_id: str) -> str:
+    return to_snake_case(operation_id)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def to_class_name(txt: str) -> str:
+    return txt[:1].upper() + txt[1:]
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def function_like_name_to_class_name(val: str, /) -> str:
+    """
+    `order_status` -> `OrderStatus`, `petType` -> `PetType`
+    """
+    return "".join(to_class_name(part) for part in val.split("_"))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def to_module_name(txt: str) -> str:
+    """
+    `Pet Store` -> `pet_store`, `petStore` -> `pet_store`
+    """
+    return MODULE_SEPARATORS.sub("_", to_snake_case(MODULE_SEPARATORS.sub("_", txt))).strip("_")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def to_argument_name(txt: str) -> str:
+    """
+    `petId` -> `pet_id`, `api-key` -> `api_key`, `class` -> `class_`
+    :return: a keyword argument for a parameter name of the spec
+    """
+    argument = to_module_name(txt) or "param"
+    return f"{argument}_" if keyword.iskeyword(argument) else argument
+
+
+@dataclass(slots=True, frozen=True)
+class NameCollision:
+    namespace: str
+    name: str
+    owners: tuple[str, str]
+    resolved: str
+
+
+class NameRegistry:
+    """
+    Hands out identifiers per namespace (e.g. the view functions of one backend).
+    Each owner (e.g. `GET /pet/{petId}`) always gets the same identifier back, if the mangled name is already
+    taken by another owner a numeric suffix gets appended and the collision is recorded.
+    """
+
+    collisions: list[NameCollision]
+    _names: dict[tuple[str, str], str]
+    _owners: dict[tuple[str, str], str]
+
+    __slots__ = ("collisions", "_names", "_owners")
+
+    def __init__(self):
+        self.collisions = []
+        self._names = {}
+        self._owners = {}
+
+    def claim(self, name: str, *, owner: str, namespace: str = "default") -> str:
+        if (resolved := self._names.get((namespace, owner))) is not None:
+            return resolved
+
+        resolved = name
+        counter = 1
+        while (namespace, resolved) in self._owners:
+            counter += 1
+            resolved = f"{name}_{counter}"
+
+        if resolved != name:
+            collision = NameCollision(
+                namespace=namespace,
+                name=name,
+                owners=(self._owners[(namespace, name)], owner),
+                resolved=resolved,
+            )
+            self.collisions.append(collision)
+            print(f"Name collision in {namespace}: {owner} and {collision.owners[0]} map to {name}, using {resolved}")
+
+        self._names[(namespace, owner)] = resolved
+        self._owners[(namespace, resolved)] = owner
+        return resolved
+
+    def function_name(self, operation_id: str, *, owner: str, namespace: str) -> str:
+        return self.claim(to_function_name(operation_id), owner=owner, namespace=namespace)
+
+    def class_name(self, name: str, *, owner: str, namespace: str = "schemas") -> str:
+        return self.claim(to_class_name(name), owner=owner, namespace=namespace)
@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from py_openapi_tools.naming import NameRegistry, to_function_name
+from py_openapi_tools.schema import Method, QueryParam, SchemaType
+from py_openapi_tools.utils import write_data_to_file
+
+PAGINATION_FILE_NAME = "pagination"
+# per operation override, `x-pagination: keyset` or `x-pagination: offset`
+PAGINATION_EXTENSION = "x-pagination"
+
+# compared after lower casing and removing `-` and `_`
+LIMIT_PARAMETERS = frozenset(("limit", "pagesize", "perpage"))
+OFFSET_PARAMETERS = frozenset(("offset", "cursor", "page", "after"))
+
+# used if the `limit` parameter of the spec has no default/maximum
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+CURSOR_PARAMETER = "cursor"
+
+PAGINATION_IMPORT = f"from .{PAGINATION_FILE_NAME} import clamp_limit, decode_cursor, next_link"
+PAGINATION_MODULE_IMPORTS = [
+    "import base64",
+    "import json",
+    "from typing import Any, Optional",
+    "from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit",
+]
+
+PAGINATION_MODULE = '''
+CURSOR_PARAMETER = "cursor"
+# replaced by the cursor in the link of the next page
+OFFSET_PARAMETERS = ("offset", "page", "after")
+
+
+def encode_cursor(keyset: dict[str, Any]) -> str:
+    """
+    :param keyset: the sort key values of the last row of a page, e.g. `{"id": 42}`
+    :return: an opaque url safe cursor, clients must not build it themselves
+    """
+    data = json.dumps(keyset, separators=(",", ":"), sort_keys=True, default=str).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[dict[str, Any]]:
+    """
+    :return: the keyset of the cursor, None for the first page
+    :raises ValueError: if the cursor wasn't created by `encode_cursor`
+    """
+    if not cursor:
+        return None
+    try:
+        keyset = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(keyset, dict):
+        raise ValueError("Invalid cursor")
+    return keyset
+
+
+def clamp_limit(limit: Optional[int], *, default: int, maximum: int) -> int:
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def next_link(url: str, keyset: Optional[dict[str, Any]]) -> Optional[str]:
+    """
+    :param url: the url of the current page
+    :param keyset: the keyset of the last row, None on the last page
+    :return: the `Link` header of the next page
+    """
+    if keyset is None:
+        return None
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    params = [
+        (key, val)
+        for key, val in parse_qsl(query, keep_blank_values=True)
+        if key != CURSOR_PARAMETER and key not in OFFSET_PARAMETERS
+    ]
+    params.append((CURSOR_PARAMETER, encode_cursor(keyset)))
+    return f'<{urlunsplit((scheme, netloc, path, urlencode(params), fragment))}>; rel="next"'
+'''
+
+# the repository hook of an operation, generated next to its view
+PAGE_FUNCTION_TEMPLATE = Template("""
+def $function_name(cursor: typing.Optional[dict], limit: int) -> tuple[list, typing.Optional[dict]]:
+    # TODO replace me: return at most `limit` rows ordered by a unique key, starting after the keyset of `cursor`,
+    # and the keyset of the last row (None on the last page), e.g. `{"id": rows[-1].id}`
+    return [], None
+""")
+
+
+def _normalize_parameter_name(name: str) -> str:
+    return name.lower().replace("_", "").replace("-", "")
+
+
+def _query_param(method: Method, names: frozenset[str]) -> Optional[QueryParam]:
+    for param in method.parameters:
+        if param.position == "query" and _normalize_parameter_name(param.name) in names:
+            return param
+    return None
+
+
+@dataclass(slots=True)
+class KeysetPagination:
+    limit: QueryParam
+    # the offset/page parameter of the spec, replaced by the cursor
+    offset: QueryParam
+    default_limit: int
+    max_limit: int
+
+
+def get_keyset_pagination(method: Method, *, default: bool = False) -> Optional[KeysetPagination]:
+    """
+    :param default: generate keyset pagination for every list operation without `x-pagination`
+    :return: the pagination of a GET operation returning an array with limit and offset (or cursor) parameters,
+        None if the operation isn't a list operation or keyset pagination isn't enabled for it
+    """
+    enabled = default
+    if override := method.extensions.get(PAGINATION_EXTENSION):
+        enabled = str(override).lower() == "keyset"
+    if not enabled or method.request_type != "get":
+        return None
+    response_schema = method.get_success_response_schema()
+    if response_schema is None or response_schema.type != SchemaType.ARRAY or not response_schema.schema.name:
+        return None
+    limit = _query_param(method, LIMIT_PARAMETERS)
+    offset = _query_param(method, OFFSET_PARAMETERS)
+    if limit is None or offset is None:
+        return None
+
+    requirements = limit.schema.properties[0].additional_requirements
+    max_limit = requirements.get("maximum", MAX_LIMIT)
+    return KeysetPagination(
+        limit=limit,
+        offset=offset,
+        default_limit=requirements.get("default", min(DEFAULT_LIMIT, max_limit)),
+        max_limit=max_limit,
+    )
+
+
+def page_function_name(method: Method, names: Optional[NameRegistry] = None, *, namespace: str) -> str:
+    """
+    :return: the name of the repository hook which loads one page of the operation
+    """
+    if names is None:
+        return to_function_name(f"{method.operation_id}_page")
+    return names.function_name(f"{method.operation_id}_page", owner=f"page {method.operation_id}", namespace=namespace)
+
+
+def create_page_function(function_name: str) -> str:
+    return PAGE_FUNCTION_TEMPLATE.substitute(function_name=function_name)
+
+
+def write_pagination_module(
+    imports: list[str], *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    """
+    Writes the cursor helpers if one of the generated views uses them
+    :param imports: the import statements of a views module
+    """
+    if PAGINATION_IMPORT not in imports:
+        return
+    write_data_to_file(
+        [PAGINATION_MODULE],
+        import_statements=PAGINATION_MODULE_IMPORTS,
+        file_name=PAGINATION_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
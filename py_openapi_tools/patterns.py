@@ -0,0 +1,310 @@
+import enum
+import re
+import string
+from dataclasses import dataclass
+from re import _constants as sre_constants
+from re import _parser as sre_parse
+from typing import Optional
+
+from py_openapi_tools.naming import NameRegistry, to_snake_case
+from py_openapi_tools.schema import SLOW_PATTERN_EXTENSION, Property
+from py_openapi_tools.utils import GenerationError
+
+PATTERN_IMPORT = "import re"
+
+# characters the character classes are evaluated against when checking if two branches overlap
+ALPHABET = frozenset(string.printable)
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda char: not char.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda char: not char.isspace(),
+    sre_constants.CATEGORY_WORD: lambda char: char.isalnum() or char == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda char: not (char.isalnum() or char == "_"),
+}
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+
+class PatternRisk(enum.Enum):
+    # the pattern doesn't compile
+    INVALID = "invalid"
+    # exponential backtracking, e.g. `(a+)+` or `(ab|a.)*`
+    NESTED_QUANTIFIER = "nested-quantifier"
+    OVERLAPPING_ALTERNATION = "overlapping-alternation"
+    # polynomial backtracking, e.g. `\d+\d+`
+    ADJACENT_QUANTIFIERS = "adjacent-quantifiers"
+
+
+RISK_MESSAGES = {
+    PatternRisk.NESTED_QUANTIFIER: "Quantified group contains a quantifier which can match the same input.",
+    PatternRisk.OVERLAPPING_ALTERNATION: "Quantified alternation with alternatives that can match the same input.",
+    PatternRisk.ADJACENT_QUANTIFIERS: "Adjacent unbounded quantifiers can match the same characters.",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class PatternIssue:
+    pattern: str
+    risk: PatternRisk
+    message: str
+
+    @property
+    def exponential(self) -> bool:
+        return self.risk in (PatternRisk.NESTED_QUANTIFIER, PatternRisk.OVERLAPPING_ALTERNATION)
+
+
+def _is_unbounded_repeat(item) -> bool:
+    op, av = item
+    return op in REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _children(item) -> list:
+    """
+    :return: the sub patterns (sequences of items) of a single item
+    """
+    op, av = item
+    if op in REPEATS:
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[3]]
+    if op == sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == sre_constants.ATOMIC_GROUP:
+        return [av]
+    return []
+
+
+def _class_chars(items, negate: bool = False) -> frozenset[str]:
+    chars = set()
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op == sre_constants.RANGE:
+            chars.update(char for char in ALPHABET if av[0] <= ord(char) <= av[1])
+        elif op == sre_constants.CATEGORY and av in CATEGORIES:
+            chars.update(filter(CATEGORIES[av], ALPHABET))
+        elif op == sre_constants.CATEGORY:
+            chars.update(ALPHABET)
+    return frozenset(ALPHABET - chars) if negate else frozenset(chars)
+
+
+def _nullable(sequence) -> bool:
+    return all(_item_nullable(item) for item in sequence)
+
+
+def _item_nullable(item) -> bool:
+    op, av = item
+    if op in REPEATS:
+        return av[0] == 0 or _nullable(av[2])
+    if op == sre_constants.SUBPATTERN:
+        return _nullable(av[3])
+    if op == sre_constants.BRANCH:
+        return any(_nullable(branch) for branch in av[1])
+    return op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.GROUPREF)
+
+
+def _edge_chars(sequence, *, last: bool = False) -> frozenset[str]:
+    """
+    :param last: the characters a match can end with instead of the characters it can start with
+    """
+    res = set()
+    for item in reversed(sequence) if last else sequence:
+        op, av = item
+        if op == sre_constants.LITERAL:
+            res.add(chr(av))
+        elif op == sre_constants.NOT_LITERAL:
+            res.update(ALPHABET - {chr(av)})
+        elif op == sre_constants.ANY:
+            res.update(ALPHABET)
+        elif op == sre_constants.IN:
+            res.update(_class_chars(av))
+        elif op == sre_constants.BRANCH:
+            for branch in av[1]:
+                res.update(_edge_chars(branch, last=last))
+        elif op in REPEATS:
+            res.update(_edge_chars(av[2], last=last))
+        elif op == sre_constants.SUBPATTERN:
+            res.update(_edge_chars(av[3], last=last))
+        elif op == sre_constants.ATOMIC_GROUP:
+            res.update(_edge_chars(av, last=last))
+        if not _item_nullable(item):
+            break
+    return frozenset(res)
+
+
+def _first_chars(sequence) -> frozenset[str]:
+    return _edge_chars(sequence)
+
+
+def _last_chars(sequence) -> frozenset[str]:
+    return _edge_chars(sequence, last=True)
+
+
+def _is_variable(item) -> bool:
+    """
+    :return: true if the item can match inputs of different lengths and may give characters back when backtracking
+    """
+    op, av = item
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        return av[0] != av[1]
+    if op == sre_constants.BRANCH:
+        return len({branch.getwidth() for branch in av[1]}) > 1
+    return False
+
+
+def _ambiguous(sequence, follow: frozenset[str]) -> Optional[PatternRisk]:
+    """
+    Checks if the input of a quantified group can be split between its items in more than one way,
+    e.g. `a+` inside of `(a+)+` can give an `a` to the next iteration
+    :param follow: the characters which can follow the sequence
+    """
+    items = list(sequence)
+    for idx, item in enumerate(items):
+        op, av = item
+        # possessive quantifiers and atomic groups never give characters back
+        if op in (sre_constants.POSSESSIVE_REPEAT, sre_constants.ATOMIC_GROUP):
+            continue
+        rest = items[idx + 1 :]
+        item_follow = _first_chars(rest) | (follow if _nullable(rest) else frozenset())
+        if _is_variable(item) and _first_chars([item]) & item_follow:
+            return PatternRisk.NESTED_QUANTIFIER
+        if op == sre_constants.BRANCH:
+            branches = [_first_chars(branch) for branch in av[1]]
+            if any(left & right for idx, left in enumerate(branches) for right in branches[idx + 1 :]):
+                return PatternRisk.OVERLAPPING_ALTERNATION
+        for child in _children(item):
+            child_follow = item_follow | _first_chars(child) if op in REPEATS else item_follow
+            if risk := _ambiguous(child, child_follow):
+                return risk
+    return None
+
+
+def _check_sequence(pattern: str, sequence, issues: list[PatternIssue]) -> None:
+    items = list(sequence)
+    for idx, item in enumerate(items):
+        op, av = item
+        # possessive quantifiers and atomic groups never backtrack
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[1] > 1:
+            if risk := _ambiguous(av[2], _first_chars(av[2])):
+                issues.append(PatternIssue(pattern, risk, RISK_MESSAGES[risk]))
+
+        if idx + 1 < len(items) and _is_unbounded_repeat(item):
+            following = items[idx + 1]
+            if _is_unbounded_repeat(following) and _last_chars([item]) & _first_chars([following]):
+                risk = PatternRisk.ADJACENT_QUANTIFIERS
+                issues.append(PatternIssue(pattern, risk, RISK_MESSAGES[risk]))
+
+        if op != sre_constants.ATOMIC_GROUP and op != sre_constants.POSSESSIVE_REPEAT:
+            for child in _children(item):
+                _check_sequence(pattern, child, issues)
+
+
+def analyze_pattern(pattern: str) -> list[PatternIssue]:
+    """
+    Checks if the pattern compiles and looks for shapes which lead to catastrophic backtracking.
+    The checks are heuristics, a pattern without issues can still be slow.
+    :return: the issues, every risk is reported once
+    """
+    try:
+        re.compile(pattern)
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError, OverflowError) as exc:
+        return [PatternIssue(pattern, PatternRisk.INVALID, f"Pattern doesn't compile: {exc}")]
+
+    issues: list[PatternIssue] = []
+    _check_sequence(pattern, parsed, issues)
+
+    res: dict[PatternRisk, PatternIssue] = {}
+    for issue in issues:
+        res.setdefault(issue.risk, issue)
+    return list(res.values())
+
+
+def check_pattern(pattern: str, *, hint: str, allow_exponential: bool = False) -> list[PatternIssue]:
+    """
+    Checks the pattern of a generated validator, the polynomial risks are printed
+    :param hint: names the field in the messages, e.g. `Pet_name`
+    :param allow_exponential: the spec accepts the exponential backtracking of the pattern, see `allows_slow_pattern`
+    :raises GenerationError: if the pattern doesn't compile or backtracks exponentially without being allowed to
+    """
+    issues = analyze_pattern(pattern)
+    for issue in issues:
+        if issue.risk == PatternRisk.INVALID:
+            raise GenerationError(f"Pattern {hint}: {issue.message}: {pattern}")
+        if issue.exponential and not allow_exponential:
+            raise GenerationError(
+                f"Pattern {hint}: {issue.message} ({issue.risk.value}): {pattern}, rewrite it "
+                f"or set `{SLOW_PATTERN_EXTENSION}: true` on the property to accept the risk"
+            )
+        print(f"Pattern {hint}: {issue.message} ({issue.risk.value}): {pattern}")
+    return issues
+
+
+def allows_slow_pattern(prop: Property) -> bool:
+    return bool(prop.additional_requirements.get(SLOW_PATTERN_EXTENSION))
+
+
+def get_pattern(prop: Property) -> Optional[str]:
+    """
+    :return: the raw pattern of the property, `create_property` stores it quoted for the generated code
+    """
+    pattern = prop.additional_requirements.get("pattern")
+    if not pattern:
+        return None
+    return pattern[1:-1]
+
+
+class PatternRegistry:
+    """
+    Collects the patterns of a generated module, every pattern becomes a module level `re.compile` constant
+    which the generated code references, nothing compiles a regex per request.
+    Identical patterns share a constant.
+    """
+
+    names: NameRegistry
+    constants: dict[str, str]
+    issues: list[PatternIssue]
+    _declared: int
+
+    __slots__ = ("names", "constants", "issues", "_declared")
+
+    def __init__(self, names: Optional[NameRegistry] = None):
+        self.names = names or NameRegistry()
+        self.constants = {}
+        self.issues = []
+        self._declared = 0
+
+    def constant(self, pattern: str, *, hint: str, allow_exponential: bool = False) -> str:
+        """
+        :param hint: e.g. `Pet_name`, used for the constant name `PET_NAME_PATTERN`
+        :param allow_exponential: see `check_pattern`
+        :return: the name of the constant
+        """
+        if pattern in self.constants:
+            return self.constants[pattern]
+
+        self.issues.extend(check_pattern(pattern, hint=hint, allow_exponential=allow_exponential))
+        name = f"{to_snake_case(hint).strip('_')}_pattern".upper()
+        name = self.names.claim(name, owner=pattern, namespace="patterns")
+        self.constants[pattern] = name
+        return name
+
+    def declarations(self) -> list[str]:
+        return [f"{name} = re.compile({pattern!r})" for pattern, name in self.constants.items()]
+
+    def imports(self) -> list[str]:
+        return [PATTERN_IMPORT] if self.constants else []
+
+    def new_declarations(self) -> list[str]:
+        """
+        :return: the declarations which were added since the last call, used for streaming generation
+        """
+        res = self.declarations()[self._declared :]
+        self._declared = len(self.constants)
+        return res
@@ -1,42 +1,374 @@
+import json
 from pathlib import Path
+from typing import Any, Iterator
 import yaml
 import click
 
-from py_openapi_tools.schema import OpenAPIDefinition
+from py_openapi_tools import analyze, benchmark, bundle, formatting, hooks, lint, loadtest
+from py_openapi_tools.batching import BATCH_LOADER_EXTENSION
+from py_openapi_tools.etags import ETAG_EXTENSION
+from py_openapi_tools.pagination import PAGINATION_EXTENSION
+from py_openapi_tools.schema import NDJSON_MEDIA_TYPE, OpenAPIDefinition
+from py_openapi_tools.single_flight import SINGLE_FLIGHT_EXTENSION
+from py_openapi_tools.sharding import ShardBy
+from py_openapi_tools.utils import (
+    CONCURRENCY_EXTENSION,
+    Concurrency,
+    GenerationError,
+)
 
 
-def read_openapi_schema(file: Path) -> dict | None:
+def read_openapi_schema(file: Path, *, paths: bool = True) -> dict | None:
+    """
+    :param paths: read the paths too, without them `paths` is empty and `iter_openapi_paths` reads them lazily
+    """
     if not file.exists():
         return None
 
+    if not paths:
+        return {**dict(_iter_root_mapping(file, paths=False)), "paths": {}}
     with file.open() as fp:
         return yaml.safe_load(fp)
 
 
-@click.command()
-@click.argument("openapifile", type=click.Path(exists=True))
-@click.option("--export-folder", type=click.Path(), default=None)
+def iter_openapi_paths(file: Path) -> Iterator[tuple[str, dict]]:
+    """
+    Reads one entry of `paths` after the other, only the current path is kept in memory
+    :return: the (path, methods) pairs in spec order
+    """
+    return _iter_root_mapping(file, paths=True)
+
+
+def _skip_node(loader: yaml.SafeLoader) -> None:
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _load_node(loader: yaml.SafeLoader) -> Any:
+    return loader.construct_document(loader.compose_node(None, None))
+
+
+def _iter_root_mapping(file: Path, *, paths: bool) -> Iterator[tuple[str, Any]]:
+    """
+    Walks the parser events of the document, the skipped values are never built
+    :param paths: yield the entries of `paths` instead of the other top level entries
+    """
+    with file.open() as fp:
+        loader = yaml.SafeLoader(fp)
+        try:
+            # the stream and the document start
+            loader.get_event()
+            loader.get_event()
+            if not loader.check_event(yaml.MappingStartEvent):
+                return
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                key = _load_node(loader)
+                if (key == "paths") != paths:
+                    _skip_node(loader)
+                elif not paths:
+                    yield key, _load_node(loader)
+                elif not loader.check_event(yaml.MappingStartEvent):
+                    # `paths:` without entries
+                    _skip_node(loader)
+                else:
+                    loader.get_event()
+                    while not loader.check_event(yaml.MappingEndEvent):
+                        path = _load_node(loader)
+                        yield path, _load_node(loader)
+                    loader.get_event()
+        finally:
+            loader.dispose()
+
+
+def print_hook_report(registry: hooks.HookRegistry) -> None:
+    if lines := registry.report():
+        click.echo("Hook timings:")
+        for line in lines:
+            click.echo(f"  {line}")
+
+
+class DefaultCommandGroup(click.Group):
+    """
+    Runs the `generate` command if the first argument isn't a command name,
+    `py-openapi-tools openapi.yaml --framework drf` keeps working next to the other commands
+    """
+
+    default_command = "generate"
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+def cli():
+    """
+    Create files for various Python-Web-Frameworks from a OpenApi definition.
+    """
+
+
+class GenerateCommand(click.Command):
+    def invoke(self, ctx: click.Context):
+        try:
+            return super().invoke(ctx)
+        except GenerationError as exc:
+            raise click.ClickException(str(exc)) from exc
+
+
+@cli.command("generate", cls=GenerateCommand)
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option("--export-folder", type=click.Path(file_okay=False, path_type=Path), default=None)
 @click.option(
     "--framework",
-    type=click.Choice(["drf", "fastapi"]),
+    type=click.Choice(["drf", "fastapi", "asgi", "aiohttp", "client"]),
     default="drf",
 )
-def main(openapifile: Path, export_folder: Path | None = None, framework: str = "drf"):
-    openapi_yaml = read_openapi_schema(openapifile)
+@click.option(
+    "--shard-by",
+    type=click.Choice([obj.value for obj in ShardBy]),
+    default=None,
+    help="Write one views/urls module per tag or per path prefix instead of a single views file.",
+)
+@click.option(
+    "--format-cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help=(
+        "Directory of the formatted fragment cache "
+        f"(default: ${formatting.CACHE_DIR_ENV} or ~/.cache/py-openapi-tools)."
+    ),
+)
+@click.option("--no-format-cache", is_flag=True, default=False, help="Format every fragment again.")
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help=(
+        "Read, lower and write one path at a time, keeps the memory usage flat for huge specs. The post_load hooks "
+        "don't see the paths, --precomputed-openapi still loads the complete spec."
+    ),
+)
+@click.option(
+    "--precomputed-openapi",
+    is_flag=True,
+    default=False,
+    help=f"FastAPI only: bundle the spec into {bundle.BUNDLE_FILE_NAME} and serve it as `app.openapi_schema`.",
+)
+@click.option(
+    "--fast-responses",
+    is_flag=True,
+    default=False,
+    help="FastAPI only: handlers return the JSON of module level TypeAdapters, FastAPI doesn't validate the "
+    "responses again.",
+)
+@click.option(
+    "--models",
+    type=click.Choice(["pydantic", "msgspec"]),
+    default="pydantic",
+    help="FastAPI only: write pydantic models or msgspec Structs, msgspec handlers decode the bodies and encode the "
+    "responses with module level decoders/encoder.",
+)
+@click.option(
+    "--concurrency",
+    type=click.Choice(["sync", "async"]),
+    default=None,
+    help=f"Generate sync or async handlers (default: async for fastapi and asgi, sync for drf), "
+    f"`{CONCURRENCY_EXTENSION}` of an operation takes precedence. Async DRF views need the `adrf` package "
+    "(`pip install py-openapi-tools[drf-async]`).",
+)
+@click.option(
+    "--streaming-responses",
+    is_flag=True,
+    default=False,
+    help=f"Stream the items of GET array responses as {NDJSON_MEDIA_TYPE}, "
+    f"responses declared as {NDJSON_MEDIA_TYPE} are always streamed.",
+)
+@click.option(
+    "--keyset-pagination",
+    is_flag=True,
+    default=False,
+    help="Generate cursor based pagination for GET list operations with limit/offset parameters, "
+    f"`{PAGINATION_EXTENSION}: keyset|offset` of an operation takes precedence.",
+)
+@click.option(
+    "--etags",
+    is_flag=True,
+    default=False,
+    help="GET handlers send an ETag and answer If-None-Match with 304, write handlers check If-Match, "
+    f"`{ETAG_EXTENSION}: true|false` of an operation takes precedence.",
+)
+@click.option(
+    "--single-flight",
+    is_flag=True,
+    default=False,
+    help="FastAPI only, identical concurrent requests of async GET handlers share one execution, "
+    f"`{SINGLE_FLIGHT_EXTENSION}: true|false` of an operation takes precedence.",
+)
+@click.option(
+    "--batch-loaders",
+    is_flag=True,
+    default=False,
+    help="FastAPI only, async GET by-id handlers load through a per request DataLoader which batches the ids, "
+    f"`{BATCH_LOADER_EXTENSION}: true|false` of an operation takes precedence.",
+)
+@click.option(
+    "--no-plugins",
+    is_flag=True,
+    default=False,
+    help=f"Don't load the hook plugins of the `{hooks.ENTRY_POINT_GROUP}` entry point group.",
+)
+def main(
+    openapifile: Path,
+    export_folder: Path | None = None,
+    framework: str = "drf",
+    shard_by: str | None = None,
+    format_cache_dir: Path | None = None,
+    no_format_cache: bool = False,
+    stream: bool = False,
+    precomputed_openapi: bool = False,
+    fast_responses: bool = False,
+    models: str = "pydantic",
+    concurrency: str | None = None,
+    streaming_responses: bool = False,
+    keyset_pagination: bool = False,
+    etags: bool = False,
+    single_flight: bool = False,
+    batch_loaders: bool = False,
+    no_plugins: bool = False,
+):
+    """
+    Generates the serializers, views and urls for the chosen framework.
+    """
+    if stream and shard_by:
+        raise click.UsageError("--stream can't be combined with --shard-by")
+    if shard_by and framework == "asgi":
+        raise click.UsageError("--shard-by isn't supported by --framework asgi, the routes are one tree")
+    if (stream or shard_by) and framework in ("aiohttp", "client"):
+        raise click.UsageError(f"--stream and --shard-by aren't supported by --framework {framework}")
+    if precomputed_openapi and (framework != "fastapi" or export_folder is None):
+        raise click.UsageError("--precomputed-openapi requires --framework fastapi and --export-folder")
+    if fast_responses and framework != "fastapi":
+        raise click.UsageError("--fast-responses requires --framework fastapi")
+    if models != "pydantic" and framework != "fastapi":
+        raise click.UsageError("--models requires --framework fastapi")
+    if models == "msgspec" and (
+        fast_responses or streaming_responses or keyset_pagination or etags or single_flight or batch_loaders
+    ):
+        raise click.UsageError(
+            "--models msgspec can't be combined with --fast-responses, --streaming-responses, --keyset-pagination, "
+            "--etags, --single-flight or --batch-loaders"
+        )
+    if concurrency and framework in ("aiohttp", "client"):
+        raise click.UsageError(f"--concurrency isn't supported by --framework {framework}")
+    if streaming_responses and framework not in ("drf", "fastapi"):
+        raise click.UsageError("--streaming-responses requires --framework drf or fastapi")
+    if keyset_pagination and framework not in ("drf", "fastapi"):
+        raise click.UsageError("--keyset-pagination requires --framework drf or fastapi")
+    if etags and framework not in ("drf", "fastapi"):
+        raise click.UsageError("--etags requires --framework drf or fastapi")
+    if single_flight and framework != "fastapi":
+        raise click.UsageError("--single-flight requires --framework fastapi")
+    if batch_loaders and framework != "fastapi":
+        raise click.UsageError("--batch-loaders requires --framework fastapi")
+    if keyset_pagination and streaming_responses:
+        raise click.UsageError("--keyset-pagination can't be combined with --streaming-responses")
+    if etags and (single_flight or batch_loaders):
+        raise click.UsageError("--etags can't be combined with --single-flight or --batch-loaders")
+
+    registry = hooks.configure_hooks(load_plugins=not no_plugins)
+    # the bundle needs the complete spec
+    lazy_paths = stream and not precomputed_openapi
+    openapi_yaml = read_openapi_schema(openapifile, paths=not lazy_paths)
     if not openapi_yaml:
         click.echo("OpenAPI schema file not found")
         return
+    openapi_yaml = registry.call("post_load", openapi_yaml, file=openapifile)
 
-    definition = OpenAPIDefinition(openapi_yaml)
-    definition.parse()
+    formatting.configure_cache(format_cache_dir, enabled=not no_format_cache)
+    handler_concurrency = Concurrency.from_str(concurrency) if concurrency else None
+
+    definition = OpenAPIDefinition(openapi_yaml, raw_paths=iter_openapi_paths(openapifile) if lazy_paths else None)
     use_tempdir = export_folder is None
+    if export_folder is not None:
+        export_folder.mkdir(parents=True, exist_ok=True)
+    shard_by = ShardBy(shard_by) if shard_by else None
+
+    openapi_schema_file = None
+    if precomputed_openapi:
+        # written before the paths are parsed, `--stream` consumes them
+        openapi_schema_file = bundle.write_bundle(definition, export_folder / bundle.BUNDLE_FILE_NAME).name
+
+    if stream:
+        definition.parse_components()
+        # the paths are parsed while the files get written, hooks only see the components
+        definition = registry.call("post_parse", definition)
+        if framework == "drf":
+            from py_openapi_tools.drf import create_files_streaming
+
+            create_files_streaming(
+                definition,
+                export_folder=export_folder,
+                use_tempdir=use_tempdir,
+                concurrency=handler_concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+            )
+        elif framework == "asgi":
+            from py_openapi_tools.asgi import create_files_streaming
+
+            create_files_streaming(
+                definition, export_folder=export_folder, use_tempdir=use_tempdir, concurrency=handler_concurrency
+            )
+        else:
+            from py_openapi_tools.fastapi import create_files_streaming
+
+            create_files_streaming(
+                definition,
+                export_folder=export_folder,
+                use_tempdir=use_tempdir,
+                openapi_schema_file=openapi_schema_file,
+                fast_responses=fast_responses,
+                msgspec_models=models == "msgspec",
+                concurrency=handler_concurrency,
+                streaming_responses=streaming_responses,
+                keyset_pagination=keyset_pagination,
+                etags=etags,
+                single_flight=single_flight,
+                batch_loaders=batch_loaders,
+            )
+        print_hook_report(registry)
+        return
+
+    definition.parse()
+    definition = registry.call("post_parse", definition)
 
     if framework == "drf":
         from py_openapi_tools.drf import create_view_file, create_serializer_file, create_urls_file
 
-        create_serializer_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
-        create_view_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
-        create_urls_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
+        create_serializer_file(
+            definition, export_folder=export_folder, use_tempdir=use_tempdir, keyset_pagination=keyset_pagination
+        )
+        create_view_file(
+            definition,
+            export_folder=export_folder,
+            use_tempdir=use_tempdir,
+            shard_by=shard_by,
+            concurrency=handler_concurrency,
+            streaming_responses=streaming_responses,
+            keyset_pagination=keyset_pagination,
+            etags=etags,
+        )
+        create_urls_file(definition, export_folder=export_folder, use_tempdir=use_tempdir, shard_by=shard_by)
 
     if framework == "fastapi":
         from py_openapi_tools.fastapi import create_view_file, create_serializer_file
@@ -45,5 +377,249 @@ def main(openapifile: Path, export_folder: Path | None = None, framework: str =
             definition,
             export_folder=export_folder,
             use_tempdir=use_tempdir,
+            msgspec_models=models == "msgspec",
+        )
+        create_view_file(
+            definition,
+            export_folder=export_folder,
+            use_tempdir=use_tempdir,
+            shard_by=shard_by,
+            openapi_schema_file=openapi_schema_file,
+            fast_responses=fast_responses,
+            msgspec_models=models == "msgspec",
+            concurrency=handler_concurrency,
+            streaming_responses=streaming_responses,
+            keyset_pagination=keyset_pagination,
+            etags=etags,
+            single_flight=single_flight,
+            batch_loaders=batch_loaders,
+        )
+
+    if framework == "asgi":
+        from py_openapi_tools.asgi import create_view_file
+
+        create_view_file(
+            definition, export_folder=export_folder, use_tempdir=use_tempdir, concurrency=handler_concurrency
         )
+
+    if framework == "aiohttp":
+        from py_openapi_tools.aiohttp import create_view_file
+        from py_openapi_tools.fastapi import create_serializer_file
+
+        # the same pydantic models as the FastAPI target
+        create_serializer_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
         create_view_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
+
+    if framework == "client":
+        from py_openapi_tools.client import create_client_file
+        from py_openapi_tools.fastapi import create_serializer_file
+
+        create_serializer_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
+        create_client_file(definition, export_folder=export_folder, use_tempdir=use_tempdir)
+    print_hook_report(registry)
+
+
+@cli.command("bundle")
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the bundled spec into this file instead of stdout.",
+)
+def bundle_command(openapifile: Path, output: Path | None = None):
+    """
+    Writes the spec fully dereferenced as minified JSON with sorted keys.
+    """
+    openapi_yaml = read_openapi_schema(openapifile)
+    if not openapi_yaml:
+        click.echo("OpenAPI schema file not found")
+        return
+
+    definition = OpenAPIDefinition(openapi_yaml)
+    if output is None:
+        click.echo(bundle.bundle(definition))
+    else:
+        bundle.write_bundle(definition, output)
+
+
+@cli.command("lint")
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option("--perf", is_flag=True, default=False, help="Check for patterns which hurt under production load.")
+@click.option(
+    "--output-format",
+    type=click.Choice(["json", "text"]),
+    default="json",
+    help="json is meant for CI, text for humans.",
+)
+@click.option(
+    "--fail-on",
+    type=click.Choice(["error", "warning", "never"]),
+    default="error",
+    help="Exit with status 1 if an issue of at least this severity is found.",
+)
+def lint_command(openapifile: Path, perf: bool = False, output_format: str = "json", fail_on: str = "error"):
+    """
+    Reports spec patterns which should be fixed, runs every rule set if none is chosen.
+    """
+    openapi_yaml = read_openapi_schema(openapifile)
+    if not openapi_yaml:
+        click.echo("OpenAPI schema file not found")
+        return
+
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+    categories = tuple(category for category, enabled in (("perf", perf),) if enabled) or tuple(lint.RULES)
+    issues = lint.lint(definition, categories)
+
+    if output_format == "json":
+        click.echo(lint.issues_to_json(issues))
+    else:
+        for issue in issues:
+            click.echo(f"{issue.severity.value}: {issue.location}: {issue.message} [{issue.rule}]")
+
+    if lint.should_fail(issues, fail_on):
+        raise SystemExit(1)
+
+
+@cli.command("analyze")
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option("--top", type=click.IntRange(min=1), default=10, help="Number of offenders listed per metric.")
+@click.option("--output-format", type=click.Choice(["json", "text"]), default="json")
+def analyze_command(openapifile: Path, top: int = 10, output_format: str = "json"):
+    """
+    Reports the complexity of every schema and operation, e.g. before adopting a new spec.
+    """
+    openapi_yaml = read_openapi_schema(openapifile)
+    if not openapi_yaml:
+        click.echo("OpenAPI schema file not found")
+        return
+
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+    report = analyze.analyze(definition, top=top)
+
+    if output_format == "json":
+        click.echo(report.to_json())
+    else:
+        click.echo(analyze.report_to_text(report))
+
+
+@cli.command("loadtest")
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=Path(loadtest.LOADTEST_FILE_NAME),
+    show_default=True,
+)
+@click.option("--base-url", default=loadtest.DEFAULT_BASE_URL, show_default=True, help="Default target of the script.")
+@click.option(
+    "--weight",
+    "weights",
+    multiple=True,
+    metavar="TAG=WEIGHT",
+    help="Share of the operations of a tag in the mix (default 1), 0 leaves them out. Can be repeated.",
+)
+def loadtest_command(
+    openapifile: Path,
+    output: Path = Path(loadtest.LOADTEST_FILE_NAME),
+    base_url: str = loadtest.DEFAULT_BASE_URL,
+    weights: tuple[str, ...] = (),
+):
+    """
+    Writes a standalone asyncio load test script which calls every operation of the spec at a constant rate.
+    """
+    try:
+        tag_weights = loadtest.parse_tag_weights(list(weights))
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="--weight")
+
+    openapi_yaml = read_openapi_schema(openapifile)
+    if not openapi_yaml:
+        click.echo("OpenAPI schema file not found")
+        return
+
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+    loadtest.write_loadtest(definition, output, tag_weights=tag_weights, base_url=base_url)
+
+
+@cli.command("benchmark")
+@click.argument("openapifile", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--app",
+    "app_target",
+    required=True,
+    help="module:attribute of the ASGI app or WSGI application, e.g. views:app or mysite.wsgi:application.",
+)
+@click.option(
+    "--app-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=Path("."),
+    help="Directory the app is imported from.",
+)
+@click.option("--iterations", type=click.IntRange(min=1), default=benchmark.DEFAULT_ITERATIONS, show_default=True)
+@click.option("--repeat", type=click.IntRange(min=1), default=benchmark.DEFAULT_REPEAT, show_default=True)
+@click.option("--operation", "operation_ids", multiple=True, help="Only this operationId. Can be repeated.")
+@click.option("--header", "headers", multiple=True, metavar="NAME: VALUE", help="Sent with every request.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="JSON report of an earlier run, the text report shows the change of ops/sec.",
+)
+@click.option("--output-format", type=click.Choice(["json", "text"]), default="json")
+def benchmark_command(
+    openapifile: Path,
+    app_target: str,
+    app_dir: Path = Path("."),
+    iterations: int = benchmark.DEFAULT_ITERATIONS,
+    repeat: int = benchmark.DEFAULT_REPEAT,
+    operation_ids: tuple[str, ...] = (),
+    headers: tuple[str, ...] = (),
+    baseline: Path | None = None,
+    output_format: str = "json",
+):
+    """
+    Calls every route of the generated app in-process with the example requests and reports ops/sec and allocations.
+    """
+    request_headers = {}
+    for header in headers:
+        name, separator, value = header.partition(":")
+        if not separator:
+            raise click.BadParameter(f"{header!r} isn't NAME: VALUE", param_hint="--header")
+        request_headers[name.strip()] = value.strip()
+
+    openapi_yaml = read_openapi_schema(openapifile)
+    if not openapi_yaml:
+        click.echo("OpenAPI schema file not found")
+        return
+
+    try:
+        app = benchmark.load_app(app_target, app_dir=app_dir)
+    except (ImportError, AttributeError, ValueError) as exc:
+        raise click.BadParameter(str(exc), param_hint="--app")
+
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+    results = benchmark.benchmark(
+        app,
+        benchmark.sample_requests(definition, operation_ids),
+        iterations=iterations,
+        repeat=repeat,
+        headers=request_headers,
+    )
+    if baseline is not None:
+        benchmark.apply_baseline(results, json.loads(baseline.read_text(encoding="utf-8")))
+
+    if output_format == "json":
+        click.echo(benchmark.results_to_json(results))
+    else:
+        click.echo(benchmark.results_to_text(results))
+
+
+if __name__ == "__main__":
+    cli()
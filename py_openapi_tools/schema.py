@@ -2,10 +2,11 @@ import enum
 import datetime as dt
 import typing
 from collections import defaultdict
-from dataclasses import dataclass
-from typing import Literal, Optional
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Literal, Optional
 
-from py_openapi_tools.utils import HTTPResponse, convert_camel_case_to_snake_case, to_class_name
+from py_openapi_tools.naming import NameRegistry, to_class_name, to_snake_case
+from py_openapi_tools.utils import HTTPResponse
 
 
 class SchemaType(enum.Enum):
@@ -41,6 +42,8 @@ ADDITIONAL_PROPERTIES = {
     "array": ("minItems", "maxItems", "uniqueItems") + DEFAULT_PROPERTIES,
     "object": ("minProperties", "maxProperties") + DEFAULT_PROPERTIES,
 }
+# `x-slow-pattern: true` next to a `pattern` accepts its backtracking risk, it isn't a constraint of the field
+SLOW_PATTERN_EXTENSION = "x-slow-pattern"
 
 PYTHON_TYPE_MAPPING = {
     str: "string",
@@ -83,6 +86,8 @@ class Schema:
     nullable_fields: set[str]
     read_only_fields: set[str]
     combined_schemas: Optional[CombinedSchema] = None
+    # the identifier handed out by the `NameRegistry`, differs from the name if it collided with another schema
+    resolved_name: Optional[str] = None
 
     def __init__(
         self,
@@ -92,6 +97,7 @@ class Schema:
         required_fields,
         nullable_fields: Optional[set] = None,
         read_only_fields: Optional[set] = None,
+        resolved_name: Optional[str] = None,
     ):
         self.name = name
         self.properties = properties
@@ -100,12 +106,20 @@ class Schema:
         self.nullable_fields = nullable_fields or set()
         self.read_only_fields = read_only_fields or set()
         self.combined_schemas = None
+        self.resolved_name = resolved_name
+
+    @property
+    def class_name(self) -> str:
+        """
+        :return: the name of the generated class, the emitters use it instead of the name from the spec
+        """
+        return self.resolved_name or to_class_name(self.name)
 
     def get_refs(self) -> list[str]:
         refs = []
         for prop in self.properties:
             if prop.ref:
-                refs.append(prop.ref.name)
+                refs.append(prop.ref.class_name if isinstance(prop.ref, Schema) else prop.ref.name)
         return refs
 
     def get_type_hint_str(self) -> str:
@@ -136,11 +150,20 @@ class Schema:
                 return "dict"
 
 
+JSON_MEDIA_TYPE = "application/json"
+# one JSON document per line, the schema of such a response describes a single item
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+RESPONSE_MEDIA_TYPES = (JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE)
+
+
 @dataclass(slots=True)
 class ResponseSchema:
     required: bool
     type: SchemaType
     schema: Schema
+    # constraints of the response itself, e.g. `maxItems` of an array response
+    additional_requirements: dict = field(default_factory=dict)
+    media_type: str = JSON_MEDIA_TYPE
 
 
 @dataclass(slots=True)
@@ -191,7 +214,7 @@ API_KEY_AUTH.name = "X-API-KEY"
 
 OAUTH2_AUTH = AuthSchema("oauth2", "")
 OAUTH2_AUTH.authorizationUrl = ""
-OAUTH2_AUTH.scopes = set()
+OAUTH2_AUTH.scopes = []
 
 
 @dataclass(slots=True)
@@ -210,6 +233,10 @@ class Method:
     parameters: list[QueryParam]
     security_schemes: list[SecurityScheme]
     request_schema_required: bool = False
+    # serializer/model created from the `in: query` parameters
+    query_schema: Optional[Schema] = None
+    # the `x-` vendor extensions of the operation
+    extensions: dict[str, Any] = field(default_factory=dict)
 
     def get_success_response_schema(self) -> Optional[ResponseSchema]:
         for status_code, schema in self.response_schema.items():
@@ -229,6 +256,33 @@ class Method:
                 return HTTPResponse(int(status_code))
         return HTTPResponse.BAD_REQUEST
 
+    def get_schemas(self) -> list[Schema]:
+        """
+        :return: the named schemas used for the request body, the query params and the success response
+        """
+        res = []
+        response_schema = self.get_success_response_schema()
+        for schema in (
+            self.request_schema,
+            self.query_schema,
+            response_schema.schema if response_schema else None,
+        ):
+            if schema is not None and schema.name and all(schema is not obj for obj in res):
+                res.append(schema)
+        return res
+
+    def is_streaming(self, *, stream_arrays: bool = False) -> bool:
+        """
+        :param stream_arrays: stream every array response, not only the ones declared as `application/x-ndjson`
+        :return: true if the GET response should be written item by item instead of as one document
+        """
+        response_schema = self.get_success_response_schema()
+        if self.request_type != "get" or response_schema is None or not response_schema.schema.name:
+            return False
+        if response_schema.media_type == NDJSON_MEDIA_TYPE:
+            return True
+        return stream_arrays and response_schema.type == SchemaType.ARRAY
+
     @property
     def contains_query_params(self) -> bool:
         """
@@ -243,23 +297,46 @@ class ApiPath:
     path: str
     methods: list[Method]
 
-    def get_path_params(self) -> list[str]:
-        res = set()
+    def _get_path_parameters(self) -> list[QueryParam]:
+        """
+        :return: the unique `in: path` parameters of all methods, ordered by their position inside the path
+        """
+        res: dict[str, QueryParam] = {}
         for method in self.methods:
             for param in method.parameters:
-                if param.position == "path":
-                    res.add(f"{convert_camel_case_to_snake_case(param.name)}: {param.schema.get_type_hint_str()}")
-        return list(res)
+                if param.position == "path" and param.name not in res:
+                    res[param.name] = param
+
+        def position(param: QueryParam) -> int:
+            idx = self.path.find(f"{{{param.name}}}")
+            return idx if idx >= 0 else len(self.path)
+
+        return sorted(res.values(), key=position)
+
+    def get_path_param_names(self) -> list[str]:
+        """
+        :return: the names of the path parameters as written in the spec, ordered by their position inside the path
+        """
+        return [param.name for param in self._get_path_parameters()]
+
+    def get_id_param(self) -> Optional[QueryParam]:
+        """
+        :return: the path parameter of a `/pets/{petId}` style path, None if the path has no or several parameters
+        """
+        params = self._get_path_parameters()
+        if len(params) != 1 or not self.path.endswith(f"{{{params[0].name}}}"):
+            return None
+        return params[0]
+
+    def get_path_params(self) -> list[str]:
+        return [
+            f"{to_snake_case(param.name)}: {param.schema.get_type_hint_str()}" for param in self._get_path_parameters()
+        ]
 
     def get_dispatcher_params(self) -> str:
-        res = set()
-        if not self.methods:
-            return ""
-        for method in self.methods:
-            for param in method.parameters:
-                if param.position == "path":
-                    res.add(f"<{param.schema.get_type_hint_str()}:{convert_camel_case_to_snake_case(param.name)}>")
-        return "/".join(res)
+        return "/".join(
+            f"<{param.schema.get_type_hint_str()}:{to_snake_case(param.name)}>" for param in self._get_path_parameters()
+        )
 
     def get_dispatcher_name(self):
         sections = self.path.split("/")
@@ -278,30 +355,97 @@ class OpenAPIDefinition:
     auth_schemes: dict[str, SecurityScheme]
     parameter_schemas: dict[str, Parameter]
     response_schemas: dict[str, Schema]
+    # identifiers handed out to the emitters, detects collisions after name mangling
+    names: NameRegistry
     __openapi_data: dict
+    __raw_paths: Optional[Iterable[tuple[str, dict]]]
+
+    __slots__ = (
+        "paths",
+        "created_schemas",
+        "auth_schemes",
+        "__openapi_data",
+        "__raw_paths",
+        "parameter_schemas",
+        "response_schemas",
+        "names",
+    )
 
-    __slots__ = ("paths", "created_schemas", "auth_schemes", "__openapi_data", "parameter_schemas", "response_schemas")
-
-    def __init__(self, yaml_data: dict):
+    def __init__(self, yaml_data: dict, *, raw_paths: Optional[Iterable[tuple[str, dict]]] = None):
+        """
+        :param raw_paths: the (path, methods) pairs in spec order if they are read lazily instead of from
+            `yaml_data["paths"]`, they can be lowered only once
+        """
         self.__openapi_data = yaml_data
+        self.__raw_paths = raw_paths
         self.created_schemas = {}
         self.auth_schemes = {}
         self.paths = []
         self.parameter_schemas = {}
         self.response_schemas = {}
+        self.names = NameRegistry()
 
     @property
     def openapi_data(self):
         return self.__openapi_data
 
+    def resolve_reference_data(self, reference: str) -> Any:
+        """
+        :param reference: a local JSON pointer, e.g. `#/components/schemas/Pet`
+        :return: the raw data the reference points to, None if it can't be resolved
+        """
+        if not isinstance(reference, str) or not reference.startswith("#/"):
+            return None
+        data = self.__openapi_data
+        for part in reference[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                data = data[int(part)] if isinstance(data, list) else data[part]
+            except (KeyError, IndexError, TypeError, ValueError):
+                return None
+        return data
+
+    def dereferenced_data(self) -> dict:
+        """
+        The raw document with every local `$ref` replaced by the data it points to.
+        Every reference is resolved only once, recursive references are kept as `$ref` because they can't be inlined.
+        """
+        resolved: dict[str, Any] = {}
+
+        def dereference(obj, active: tuple[str, ...]):
+            if isinstance(obj, dict):
+                reference = obj.get("$ref")
+                if isinstance(reference, str) and reference not in active:
+                    if reference not in resolved:
+                        target = self.resolve_reference_data(reference)
+                        if target is None:
+                            return dict(obj)
+                        resolved[reference] = dereference(target, (*active, reference))
+                    return resolved[reference]
+                return {key: dereference(value, active) for key, value in obj.items()}
+            if isinstance(obj, list):
+                return [dereference(value, active) for value in obj]
+            return obj
+
+        return dereference(self.__openapi_data, ())
+
     def parse(self):
+        self.parse_components()
+        self._extract_paths()
+
+    def parse_components(self):
+        """
+        Parses everything except the paths, see `iter_paths` to lower the paths one at a time
+        """
         self._extract_security_schemes()
         self._extract_schemas()
-        self._extract_paths()
         self._extract_parameter_schemas()
 
     def _extract_schemas(self):
         required_schemas = self.__openapi_data["components"]["schemas"]
+        # claimed up front, a reference may be lowered before the schema itself and the spec order has to decide
+        for key in required_schemas:
+            self.schema_class_name(key)
         for key, value in required_schemas.items():
             combined_schemas = defaultdict(tuple)
             if "type" not in value:
@@ -312,14 +456,41 @@ class OpenAPIDefinition:
                 properties=create_properties(value, self),
                 typ=SchemaType(value.get("type", "object")),
                 required_fields=set(value.get("required", [])),
+                resolved_name=self.schema_class_name(key),
             )
 
             if combined_schemas:
                 self.created_schemas[key].combined_schemas = combined_schemas
 
+    def schema_class_name(self, key: str) -> str:
+        """
+        :param key: the name of a schema below `#/components/schemas`
+        :return: the class name of the schema, unique among all generated classes
+        """
+        return self.names.class_name(key, owner=f"#/components/schemas/{key}")
+
     def _extract_paths(self):
+        for api_path in self.iter_paths():
+            for method in api_path.methods:
+                if method.query_schema is not None:
+                    self.created_schemas[method.query_schema.name] = method.query_schema
+            self.paths.append(api_path)
+
+    def _raw_paths(self, *, consume: bool) -> Iterator[tuple[str, dict]]:
+        if self.__raw_paths is not None:
+            yield from self.__raw_paths
+            return
         required_paths = self.__openapi_data["paths"]
-        for path, methods in required_paths.items():
+        for path in list(required_paths):
+            yield path, required_paths.pop(path) if consume else required_paths[path]
+
+    def iter_paths(self, *, consume: bool = False) -> Iterator[ApiPath]:
+        """
+        Lowers one path after the other, the components have to be parsed already
+        :param consume: remove the raw definition of a path once it has been lowered, used for streaming generation
+        :return: the paths in spec order, they aren't added to `paths`
+        """
+        for path, methods in self._raw_paths(consume=consume):
             method_data = []
             for method, data in methods.items():
                 if method not in ("get", "post", "put", "delete"):
@@ -356,13 +527,18 @@ class OpenAPIDefinition:
                 response_schemas = {}
                 for status_code, response in responses.items():
                     if "content" in response:
-                        resp_content = response["content"].get("application/json", {}).get("schema", {})
+                        media_type = next(
+                            (obj for obj in RESPONSE_MEDIA_TYPES if obj in response["content"]), JSON_MEDIA_TYPE
+                        )
+                        resp_content = response["content"].get(media_type, {}).get("schema", {})
                         if "$ref" in resp_content:
                             schema = self.created_schemas[resp_content.get("$ref", "").split("/")[-1]]
                             response_schema = ResponseSchema(
                                 required=True,
-                                type=SchemaType("object"),
+                                # a ndjson response is a sequence of the referenced schema
+                                type=SchemaType("array" if media_type == NDJSON_MEDIA_TYPE else "object"),
                                 schema=schema,
+                                media_type=media_type,
                             )
                         else:
                             resp_schema_typ = resp_content.get("type", "")
@@ -393,21 +569,30 @@ class OpenAPIDefinition:
                                         typ=SchemaType("object"),
                                         required_fields=resp_content.get("required", []),
                                     ),
+                                    additional_requirements=get_additional_requirements(resp_content),
+                                    media_type=media_type,
                                 )
                             else:
                                 response_schema = ResponseSchema(
                                     required=True,
                                     type=SchemaType(resp_schema_typ),
                                     schema=schema,
+                                    additional_requirements=get_additional_requirements(resp_content),
+                                    media_type=media_type,
                                 )
                     else:
                         response_schema = None
                     if status_code == "default":
                         status_code = HTTPResponse.OK.value
                     response_schemas[status_code] = response_schema
-                parameters = create_parameters(data.get("parameters", []), self.created_schemas)
+                # shared parameters of `components/parameters` are referenced
+                raw_parameters = [
+                    self.resolve_reference_data(obj["$ref"]) or {} if "$ref" in obj else obj
+                    for obj in data.get("parameters", [])
+                ]
+                parameters = create_parameters(raw_parameters, self.created_schemas)
                 if query_schema := create_schema_from_query_params(data["operationId"], parameters):
-                    self.created_schemas[query_schema.name] = query_schema
+                    query_schema.name = self.names.class_name(query_schema.name, owner=f"{method.upper()} {path}")
                 method_data.append(
                     Method(
                         operation_id=data["operationId"],
@@ -417,13 +602,13 @@ class OpenAPIDefinition:
                         tags=data.get("tags", []),
                         parameters=parameters,
                         security_schemes=self._get_security_schemas(data.get("security", [])),
+                        query_schema=query_schema,
+                        extensions={key: val for key, val in data.items() if key.startswith("x-")},
                     )
                 )
-            self.paths.append(
-                ApiPath(
-                    path=path,
-                    methods=method_data,
-                )
+            yield ApiPath(
+                path=path,
+                methods=method_data,
             )
 
     def _extract_security_schemes(self):
@@ -445,7 +630,7 @@ class OpenAPIDefinition:
                         OAUTH2_AUTH.authorizationUrl = authorization_url
                     scopes = implicit_definition.get("scopes", {})
                     if scopes:
-                        OAUTH2_AUTH.scopes = set(scopes.keys())
+                        OAUTH2_AUTH.scopes = list(scopes.keys())
                 case _:
                     print(scheme)
                     print(f"Unknown security scheme: {name}")
@@ -493,6 +678,7 @@ class OpenAPIDefinition:
             return None
 
         combined_schemas = defaultdict(tuple)
+        resolved_name = definition.schema_class_name(name) if component_kind == "schemas" else None
 
         if "type" not in data:
             combined_schemas = extract_combined_schemas(data, definition)
@@ -503,6 +689,7 @@ class OpenAPIDefinition:
                 properties={},
                 typ=SchemaType.OBJECT,
                 required_fields=set(data.get("required", [])),
+                resolved_name=resolved_name,
             )
             schema.combined_schemas = combined_schemas
         else:
@@ -511,6 +698,7 @@ class OpenAPIDefinition:
                 properties=create_properties(data, definition),
                 typ=SchemaType(data["type"]),
                 required_fields=set(data.get("required", [])),
+                resolved_name=resolved_name,
             )
             definition.created_schemas[name] = schema
 
@@ -579,6 +767,23 @@ def create_item_schema(item: dict, existing_schemas: dict = {}) -> None | Schema
         return Property(name="", example="", type_=convert_type(val), enum_values=[])
 
 
+def get_additional_requirements(data: dict) -> dict:
+    """
+    :param data: the schema definition of a property, parameter or response
+    :return: the constraints of `ADDITIONAL_PROPERTIES` which are defined for the type of the schema
+    """
+    res = {}
+    for attribute in ADDITIONAL_PROPERTIES.get(data.get("type"), []):
+        if attribute in data:
+            if attribute in ("pattern", "format"):
+                res[attribute] = f"'{data[attribute]}'"
+            else:
+                res[attribute] = data[attribute]
+    if "pattern" in res and SLOW_PATTERN_EXTENSION in data:
+        res[SLOW_PATTERN_EXTENSION] = bool(data[SLOW_PATTERN_EXTENSION])
+    return res
+
+
 def create_property(name: str, data: dict, definition: OpenAPIDefinition) -> Property:
     data_type: Optional[str] = data.get("type", None)
 
@@ -599,13 +804,7 @@ def create_property(name: str, data: dict, definition: OpenAPIDefinition) -> Pro
     if "$ref" in data:
         prop.ref = OpenAPIDefinition.extract_reference(definition, data["$ref"])
 
-    if data_type:
-        for attribute in ADDITIONAL_PROPERTIES.get(data_type, []):
-            if attribute in data:
-                if attribute in ("pattern", "format"):
-                    prop.additional_requirements[attribute] = f"'{data[attribute]}'"
-                else:
-                    prop.additional_requirements[attribute] = data[attribute]
+    prop.additional_requirements = get_additional_requirements(data)
 
     return prop
 
@@ -631,6 +830,7 @@ def create_parameters(data: list, existing_schemas: dict = {}) -> list[QueryPara
             example=obj["schema"].get("example"),
             type_=convert_type(obj["schema"].get("type", ""), obj["schema"].get("format")),
             enum_values=obj["schema"].get("enum", []),
+            additional_requirements=get_additional_requirements(obj["schema"]),
         )
         if prop.enum_values:
             prop.type = enum.Enum
@@ -670,6 +870,7 @@ def create_schema_from_query_params(operation_id: str, params: list[QueryParam])
                 type_=param.schema.properties[0].type,
                 enum_values=param.schema.properties[0].enum_values,
                 ref=param.schema.properties[0].ref,
+                additional_requirements=param.schema.properties[0].additional_requirements,
             )
         )
     if schema.properties:
@@ -0,0 +1,66 @@
+import enum
+from string import Template
+from typing import Iterable
+
+from py_openapi_tools.naming import to_module_name
+from py_openapi_tools.schema import ApiPath, OpenAPIDefinition
+
+DEFAULT_SHARD = "default"
+# read by the generated root module, e.g. `OPENAPI_SHARDS=store,user`
+SHARDS_ENV = "OPENAPI_SHARDS"
+
+SHARD_SELECTION_IMPORTS = ["import os"]
+
+# the modules of the shards which aren't selected are never imported
+SHARD_SELECTION_TEMPLATE = Template("""
+SHARDS = $shards
+SELECTED_SHARDS = [obj for obj in os.environ.get("$env", ",".join(SHARDS)).split(",") if obj]
+""")
+
+
+class ShardBy(enum.Enum):
+    TAG = "tag"
+    PATH = "path"
+
+
+def get_shard_key(path: ApiPath, shard_by: ShardBy) -> str:
+    """
+    :param path: the path which should be assigned to a shard
+    :param shard_by: `TAG` uses the first tag of the first tagged method, `PATH` the first static path section
+    :return: the raw shard key, e.g. `pet` for `/pet/{petId}`
+    """
+    match shard_by:
+        case ShardBy.TAG:
+            for method in path.methods:
+                if method.tags:
+                    return method.tags[0]
+        case ShardBy.PATH:
+            for section in path.path.split("/"):
+                if section and not section.startswith("{"):
+                    return section
+    return DEFAULT_SHARD
+
+
+def create_shard_selection(shard_names: Iterable[str]) -> str:
+    """
+    :return: the `SHARDS` of the spec and the `SELECTED_SHARDS` the root module imports, every shard unless the
+        `OPENAPI_SHARDS` environment variable names a subset
+    """
+    return SHARD_SELECTION_TEMPLATE.substitute(shards=repr(tuple(shard_names)), env=SHARDS_ENV)
+
+
+def shard_paths(definition: OpenAPIDefinition, shard_by: ShardBy) -> dict[str, list[ApiPath]]:
+    """
+    Groups the paths of the definition, the keys are valid python module names and stay stable between runs
+    :param definition: the parsed openapi definition
+    :param shard_by: how the paths are grouped
+    :return: module name -> paths of the shard, in spec order
+    """
+    shards: dict[str, list[ApiPath]] = {}
+    for path in definition.paths:
+        if not path.methods:
+            continue
+        key = get_shard_key(path, shard_by)
+        name = definition.names.claim(to_module_name(key) or DEFAULT_SHARD, owner=key, namespace="shards")
+        shards.setdefault(name, []).append(path)
+    return shards
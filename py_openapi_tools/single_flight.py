@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Optional
+
+from py_openapi_tools.schema import Method
+from py_openapi_tools.utils import extension_flag, write_data_to_file
+
+SINGLE_FLIGHT_FILE_NAME = "single_flight"
+# per operation override, `x-single-flight: false` runs every request on its own
+SINGLE_FLIGHT_EXTENSION = "x-single-flight"
+
+SINGLE_FLIGHT_IMPORT = f"from .{SINGLE_FLIGHT_FILE_NAME} import single_flight"
+SINGLE_FLIGHT_MODULE_IMPORTS = ["import asyncio", "import functools", "import json"]
+
+SINGLE_FLIGHT_MODULE = '''
+# (operationId, arguments) -> the running handler
+_in_flight: dict[tuple[str, str], asyncio.Task] = {}
+
+
+def single_flight(operation_id: str):
+    """
+    Identical concurrent requests share one execution of the handler, followers await the result of the leader
+    instead of running the handler again. The key are the arguments of the handler (path, query and security
+    parameters), requests of different users aren't coalesced.
+    The handler runs as its own task, a disconnecting client doesn't cancel it for the others
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            key = operation_id, json.dumps(kwargs, sort_keys=True, default=str)
+            task = _in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(**kwargs))
+                _in_flight[key] = task
+                task.add_done_callback(lambda done: _in_flight.pop(key) if _in_flight.get(key) is done else None)
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
+'''
+
+
+def single_flight_enabled(method: Method, *, default: bool = False) -> bool:
+    """
+    :param default: coalesce identical concurrent requests of the GET operations without `x-single-flight`
+    """
+    if method.request_type != "get":
+        return False
+    return extension_flag(method.extensions, SINGLE_FLIGHT_EXTENSION, default=default)
+
+
+def create_single_flight_decorator(method: Method) -> str:
+    return f'@single_flight("{method.operation_id}")'
+
+
+def write_single_flight_module(
+    imports: list[str], *, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    """
+    Writes the request coalescing if one of the generated routes uses it
+    :param imports: the import statements of a views module
+    """
+    if SINGLE_FLIGHT_IMPORT not in imports:
+        return
+    write_data_to_file(
+        [SINGLE_FLIGHT_MODULE],
+        import_statements=SINGLE_FLIGHT_MODULE_IMPORTS,
+        file_name=SINGLE_FLIGHT_FILE_NAME,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
@@ -0,0 +1,227 @@
+from pathlib import Path
+from string import Template
+from typing import Any, Optional
+
+from py_openapi_tools import hooks
+from py_openapi_tools.naming import to_class_name, to_module_name, to_snake_case
+from py_openapi_tools.patterns import allows_slow_pattern, check_pattern, get_pattern
+from py_openapi_tools.schema import OpenAPIDefinition, Property, Schema
+from py_openapi_tools.utils import add_unique, write_data_to_file, INDENT
+
+STRUCT_IMPORTS = ["from __future__ import annotations", "import datetime as dt", "import typing", "import msgspec"]
+# `x-msgspec: {array_like: true}` on a component schema, passed to the Struct as is
+STRUCT_EXTENSION = "x-msgspec"
+STRUCT_OPTIONS = ("array_like", "frozen", "omit_defaults", "forbid_unknown_fields", "gc")
+
+ENCODER_NAME = "ENCODER"
+
+# OpenAPI constraint -> `msgspec.Meta` argument
+META_ARGUMENTS = {
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minimum": "ge",
+    "maximum": "le",
+    "multipleOf": "multiple_of",
+    "minItems": "min_length",
+    "maxItems": "max_length",
+}
+
+STRUCT_TEMPLATE = Template("""
+class $name(msgspec.Struct$options):
+$fields
+""")
+
+# the encoder is type independent, the decoders validate while decoding
+CODECS_TEMPLATE = Template("""
+$encoder = msgspec.json.Encoder()
+$decoders
+""")
+
+
+def decoder_name(schema_name: str) -> str:
+    """
+    :return: the name of the module level decoder of a schema, e.g. `PET_DECODER`
+    """
+    return f"{to_module_name(schema_name).upper()}_DECODER"
+
+
+def is_union(schema: Schema) -> bool:
+    """
+    :return: true if the schema is emitted as `typing.Union` of its oneOf/anyOf schemas instead of a Struct
+    """
+    combined = schema.combined_schemas or {}
+    return bool(combined.get("oneOf") or combined.get("anyOf"))
+
+
+def tag_field(schema: Schema) -> Optional[str]:
+    """
+    :return: the property of the discriminator of a oneOf schema, None if msgspec can't tell its Structs apart
+    """
+    combined = schema.combined_schemas or {}
+    if not combined.get("oneOf") or not combined.get("discriminator"):
+        return None
+    return combined["discriminator"][0].get("propertyName") or None
+
+
+def discriminator_tags(definition: OpenAPIDefinition) -> dict[str, tuple[str, str]]:
+    """
+    The schemas of a oneOf with a discriminator become tagged Structs, msgspec picks the Struct by the tag
+    :return: schema name -> (tag field, tag value)
+    """
+    tags = {}
+    for schema in definition.created_schemas.values():
+        if not (field := tag_field(schema)):
+            continue
+        combined = schema.combined_schemas
+        discriminator = combined["discriminator"][0]
+        # the mapping is value -> reference, without one the schema name is the value
+        values = {reference.split("/")[-1]: value for value, reference in discriminator.get("mapping", {}).items()}
+        for member in combined["oneOf"]:
+            if member is not None and member.name:
+                tags[member.name] = (field, values.get(member.name, member.name))
+    return tags
+
+
+def meta_arguments(prop: Property, *, hint: str) -> list[str]:
+    arguments = []
+    for requirement, argument in META_ARGUMENTS.items():
+        if (value := prop.additional_requirements.get(requirement)) is not None:
+            arguments.append(f"{argument}={value!r}")
+    if pattern := get_pattern(prop):
+        check_pattern(pattern, hint=hint, allow_exponential=allows_slow_pattern(prop))
+        arguments.append(f"pattern={pattern!r}")
+    return arguments
+
+
+def struct_type_hint(prop: Property) -> str:
+    if prop.enum_values:
+        return f"typing.Literal[{', '.join(repr(obj) for obj in prop.enum_values)}]"
+    if prop.type is list:
+        if isinstance(prop.ref, Schema) and prop.ref.name:
+            return f"list[{prop.ref.class_name}]"
+        if isinstance(prop.ref, Property) and hasattr(prop.ref.type, "__name__"):
+            return f"list[{prop.ref.type.__name__}]"
+        return "list[typing.Any]"
+    if prop.ref is not None and getattr(prop.ref, "name", ""):
+        return prop.ref.class_name
+    match getattr(prop.type, "__name__", ""):
+        case "str" | "int" | "float" | "bool":
+            return prop.type.__name__
+        case "datetime" | "date":
+            return f"dt.{prop.type.__name__}"
+    return "typing.Any"
+
+
+def struct_field(prop: Property, *, required: bool, hint: str) -> str:
+    """
+    :return: the field declaration, constrained types are `Annotated` with `msgspec.Meta`
+    """
+    type_hint = struct_type_hint(prop)
+    if arguments := meta_arguments(prop, hint=hint):
+        type_hint = f"typing.Annotated[{type_hint}, msgspec.Meta({', '.join(arguments)})]"
+    field_name = to_snake_case(prop.name).strip("_") or prop.name
+    if not required:
+        type_hint = f"typing.Optional[{type_hint}]"
+    if field_name != prop.name:
+        # the name of the spec stays the name on the wire
+        default = "" if required else ", default=None"
+        return f'{field_name}: {type_hint} = msgspec.field(name="{prop.name}"{default})'
+    return f"{field_name}: {type_hint}" if required else f"{field_name}: {type_hint} = None"
+
+
+def struct_fields(schema: Schema) -> tuple[list[Property], set[str]]:
+    """
+    :return: the properties of the schema and of its allOf schemas, and their required fields
+    """
+    properties = list(schema.properties)
+    required_fields = set(schema.required_fields)
+    for part in (schema.combined_schemas or {}).get("allOf", ()):
+        if part is None:
+            continue
+        properties.extend(obj for obj in part.properties if obj.name not in {prop.name for prop in properties})
+        required_fields |= set(part.required_fields)
+    return properties, required_fields
+
+
+def struct_options(
+    properties: list[Property], raw_schema: dict[str, Any], tag: Optional[tuple[str, str]] = None
+) -> list[str]:
+    """
+    `kw_only` lets required fields follow optional ones, response-only schemas (every property `readOnly`) are frozen
+    """
+    options = {"kw_only": True}
+    if properties and all(prop.additional_requirements.get("readOnly") for prop in properties):
+        options["frozen"] = True
+    extension = raw_schema.get(STRUCT_EXTENSION)
+    if isinstance(extension, dict):
+        options.update({key: val for key, val in extension.items() if key in STRUCT_OPTIONS})
+    if tag is not None:
+        options["tag_field"], options["tag"] = tag
+    return [f"{key}={val!r}" for key, val in options.items()]
+
+
+def create_struct(
+    schema_name: str, schema: Schema, *, tag: Optional[tuple[str, str]] = None, raw_schema: Optional[dict] = None
+) -> str:
+    """
+    :param tag: the tag field and value if the schema is part of a discriminated oneOf
+    :param raw_schema: the schema as written in the spec, for its `x-msgspec` options
+    """
+    if is_union(schema):
+        combined = schema.combined_schemas
+        members = [
+            obj.class_name for obj in combined.get("oneOf") or combined.get("anyOf") if obj is not None and obj.name
+        ]
+        if len(members) > 1 and not tag_field(schema):
+            # msgspec only decodes unions of several Structs by a tag, the decoder would raise on import
+            print(f"Union {schema_name}: add a discriminator to tell {', '.join(members)} apart, typed as typing.Any")
+            members = ["typing.Any"]
+        struct = f"\n{schema.class_name} = typing.Union[{', '.join(members)}]\n" if members else ""
+    else:
+        properties, required_fields = struct_fields(schema)
+        fields = [
+            struct_field(prop, required=prop.name in required_fields, hint=f"{schema_name}_{prop.name}")
+            for prop in properties
+            # msgspec writes and reads the tag itself
+            if tag is None or prop.name != tag[0]
+        ]
+        struct = STRUCT_TEMPLATE.substitute(
+            name=schema.class_name,
+            options="".join(f", {obj}" for obj in struct_options(properties, raw_schema or {}, tag)),
+            fields="\n".join(f"{INDENT}{obj}" for obj in fields) or f"{INDENT}pass",
+        )
+    return hooks.get_registry().call(
+        "per_schema_emit", struct, schema_name=schema_name, schema=schema, framework="msgspec"
+    )
+
+
+def create_structs(definition: OpenAPIDefinition) -> list[str]:
+    """
+    The annotations are only resolved on the first use (`from __future__ import annotations`), Structs may reference
+    Structs which are defined later. The unions are module level expressions, they follow every Struct
+    :return: the Structs, the unions and the encoder/decoders of all created schemas
+    """
+    tags = discriminator_tags(definition)
+    raw_schemas = definition.openapi_data.get("components", {}).get("schemas", {})
+    structs = []
+    unions = []
+    decoders = []
+    for schema_name, schema in definition.created_schemas.items():
+        struct = create_struct(schema_name, schema, tag=tags.get(schema_name), raw_schema=raw_schemas.get(schema_name))
+        if not struct:
+            continue
+        (unions if is_union(schema) else structs).append(struct)
+        add_unique(decoders, f"{decoder_name(schema.class_name)} = msgspec.json.Decoder({schema.class_name})")
+    return [*structs, *unions, CODECS_TEMPLATE.substitute(encoder=ENCODER_NAME, decoders="\n".join(decoders))]
+
+
+def create_struct_file(
+    definition: OpenAPIDefinition, *, file_name: str, export_folder: Optional[Path] = None, use_tempdir: bool = False
+) -> None:
+    write_data_to_file(
+        create_structs(definition),
+        import_statements=STRUCT_IMPORTS,
+        file_name=file_name,
+        export_folder=export_folder,
+        use_tempdir=use_tempdir,
+    )
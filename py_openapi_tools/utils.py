@@ -1,12 +1,21 @@
 import enum
-import re
+import shutil
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TextIO
 
 import black
 import isort
 
+from py_openapi_tools import formatting, hooks
+from py_openapi_tools.formatting import FragmentFormatter, format_fragments
+from py_openapi_tools.naming import (
+    function_like_name_to_class_name,
+    to_class_name,
+    to_function_name as operation_id_to_function_name,
+    to_snake_case as convert_camel_case_to_snake_case,
+)
+
 INDENT = "    "
 
 
@@ -68,26 +77,27 @@ class HTTPResponse(enum.IntEnum):
     NETWORK_AUTHENTICATION_REQUIRED = 511
 
 
-invalid_chars = re.compile(r"\W")
-
+def add_unique(statements: list[str], statement: str) -> None:
+    """
+    Appends `statement` if it isn't part of `statements` yet.
+    Lists are used instead of sets so that the generated files don't depend on the hash seed.
+    """
+    if statement not in statements:
+        statements.append(statement)
 
-def convert_camel_case_to_snake_case(txt: str) -> str:
-    if not txt:
-        return txt
 
-    parts = []
-    for char in txt:
-        if invalid_chars.match(char) is not None:
-            continue
-        if char.isupper():
-            parts.append("_")
-
-        parts.append(char.lower())
-    return "".join(parts)
+def get_output_file(file_name: str, export_folder: Optional[Path] = None, use_tempdir: bool = False) -> Path:
+    if use_tempdir:
+        tmp_file = tempfile.NamedTemporaryFile("w", suffix=f"_{file_name}.py", delete_on_close=False)
+        tmp_file.close()
+        return Path(tmp_file.name)
+    return export_folder / f"{file_name}.py" if export_folder else Path(__file__).parent / f"{file_name}.py"
 
 
-def to_class_name(txt: str) -> str:
-    return txt[0].upper() + txt[1:]
+def print_file(file: Path) -> None:
+    with file.open("r") as fp:
+        for line in fp.readlines():
+            print(line)
 
 
 def write_data_to_file(
@@ -98,45 +108,111 @@ def write_data_to_file(
     export_folder: Optional[Path] = None,
     use_tempdir: bool = False,
 ):
-    if use_tempdir:
-        tmp_file = tempfile.NamedTemporaryFile("w", suffix=f"_{file_name}.py", delete_on_close=False)
-        tmp_file.close()
-        view_file = Path(tmp_file.name)
-    else:
-        view_file = export_folder / f"{file_name}.py" if export_folder else Path(__file__).parent / f"{file_name}.py"
+    view_file = get_output_file(file_name, export_folder, use_tempdir)
 
-    with view_file.open("w") as fp:
-        fp.write("\n".join(import_statements))
-        fp.write("\n\n\n")
-        fp.write("\n\n\n".join(data))
+    try:
+        content = format_fragments(
+            import_statements, data, settings_path=view_file.parent, cache=formatting.get_cache()
+        )
+    except black.InvalidInput:
+        # at least one fragment isn't valid python on its own, format the complete file instead
+        with view_file.open("w") as fp:
+            fp.write("\n".join(import_statements))
+            fp.write("\n\n\n")
+            fp.write("\n\n\n".join(data))
 
-    isort.api.sort_file(view_file)
-    black.format_file_in_place(view_file, mode=black.Mode(), fast=False, write_back=black.WriteBack.YES)
+        isort.api.sort_file(view_file)
+        black.format_file_in_place(view_file, mode=black.Mode(), fast=False, write_back=black.WriteBack.YES)
+        if hooks.get_registry().has("pre_write"):
+            view_file.write_text(hooks.get_registry().call("pre_write", view_file.read_text(), file=view_file))
+    else:
+        with view_file.open("w") as fp:
+            fp.write(hooks.get_registry().call("pre_write", content, file=view_file))
 
     if use_tempdir:
-        with view_file.open("r") as fp:
-            for line in fp.readlines():
-                print(line)
+        print_file(view_file)
 
 
-def operation_id_to_function_name(operation_id: str) -> str:
-    try:
-        camel_idx = re.search(r"[A-Z]", operation_id).start()
-    except AttributeError:
-        return operation_id
-    chars = [obj for obj in operation_id]
-    chars[camel_idx] = f"_{operation_id[camel_idx].lower()}"
-    return operation_id_to_function_name("".join(chars))
+class FragmentFileWriter:
+    """
+    Formats and writes one fragment after the other, so only the current fragment has to be kept in memory.
+    The fragments are collected in a temporary file first because the imports are only known after the last one.
+    """
+
+    file: Path
+    use_tempdir: bool
+    formatter: FragmentFormatter
+    _body: TextIO
+    _first_fragment: str
+    _needs_separator: bool
+    _format_file: bool
+
+    __slots__ = ("file", "use_tempdir", "formatter", "_body", "_first_fragment", "_needs_separator", "_format_file")
 
+    def __init__(self, file_name: str, *, export_folder: Optional[Path] = None, use_tempdir: bool = False):
+        self.file = get_output_file(file_name, export_folder, use_tempdir)
+        self.use_tempdir = use_tempdir
+        self.formatter = FragmentFormatter(settings_path=self.file.parent, cache=formatting.get_cache())
+        self._body = tempfile.TemporaryFile("w+")
+        self._first_fragment = ""
+        self._needs_separator = False
+        self._format_file = False
 
-def function_like_name_to_class_name(val: str, /):
-    def to_title(val_: str):
-        if val_[0].isupper():
-            return val_
-        else:
-            return val_.title()
+    def _append(self, text: str) -> None:
+        if not self._first_fragment:
+            self._first_fragment = text
+        self._body.write(text)
 
-    return "".join([to_title(obj) for obj in val.split("_")])
+    def write(self, fragment: str) -> None:
+        """
+        A fragment which isn't valid python on its own is written as it is, `close` formats the complete file then
+        """
+        if not fragment.strip():
+            return
+        try:
+            formatted = self.formatter.format_fragment(fragment)
+        except black.InvalidInput:
+            formatted = fragment.strip("\n")
+            self._format_file = True
+        if self._needs_separator:
+            self._body.write("\n\n\n")
+        self._append(formatted)
+        self._needs_separator = True
+
+    def write_list_item(self, item: str) -> None:
+        """
+        Appends an element of a list literal which was opened with `write_raw`
+        """
+        self.write_raw(self.formatter.format_list_item(item))
+
+    def write_raw(self, text: str) -> None:
+        """
+        Appends already formatted code as it is
+        """
+        self._append(text)
+        self._needs_separator = False
+
+    def close(self, import_statements: list[str]) -> Path:
+        header = self.formatter.format_header(import_statements)
+        with self.file.open("w") as fp:
+            fp.write(header)
+            fp.write(self.formatter.header_separator(header, self._first_fragment))
+            self._body.seek(0)
+            shutil.copyfileobj(self._body, fp)
+            fp.write("\n")
+        self._body.close()
+
+        if self._format_file:
+            # the fallback of `write_data_to_file`, the complete file is kept in memory while formatting
+            isort.api.sort_file(self.file)
+            black.format_file_in_place(self.file, mode=black.Mode(), fast=False, write_back=black.WriteBack.YES)
+        if hooks.get_registry().has("pre_write"):
+            # pre_write hooks get the complete content, the file has to be read back into memory
+            self.file.write_text(hooks.get_registry().call("pre_write", self.file.read_text(), file=self.file))
+
+        if self.use_tempdir:
+            print_file(self.file)
+        return self.file
 
 
 TYPE_CONVERTION = {
@@ -168,3 +244,51 @@ class Concurrency(enum.IntEnum):
                 return cls.ASYNC
             case _:
                 raise ValueError("Invalid concurrency value")
+
+
+# per operation override of the handler kind, `x-concurrency: sync`
+CONCURRENCY_EXTENSION = "x-concurrency"
+
+
+class GenerationError(ValueError):
+    """
+    The spec asks for handler code the generator can't write
+    """
+
+
+def check_features(operation_id: str, features: dict[str, bool], exclusive: tuple[tuple[str, str], ...]) -> None:
+    """
+    :param features: the features of the operation by name, true if the operation gets it
+    :param exclusive: the pairs of features one handler can't combine
+    :raises GenerationError: if the operation gets two features which exclude each other
+    """
+    for first, second in exclusive:
+        if features.get(first) and features.get(second):
+            raise GenerationError(
+                f"{operation_id}: {first} can't be combined with {second}, disable one of them for the operation"
+            )
+
+
+def extension_flag(extensions: dict, name: str, *, default: bool) -> bool:
+    """
+    :param extensions: the vendor extensions of the operation
+    :return: the value of the boolean extension `name` (`true`, `1` or `yes`), `default` if the operation doesn't set it
+    """
+    if (value := extensions.get(name)) is None:
+        return default
+    return str(value).lower() in ("true", "1", "yes")
+
+
+def get_concurrency(extensions: dict, *, default: Concurrency, configured: Optional[Concurrency] = None) -> Concurrency:
+    """
+    :param extensions: the vendor extensions of the operation
+    :param default: the handler kind the framework generated so far
+    :param configured: the handler kind of every operation without override, None keeps `default`
+    :return: the override of the operation, else the configured handler kind, else `default`
+    """
+    if override := extensions.get(CONCURRENCY_EXTENSION):
+        try:
+            return Concurrency.from_str(str(override))
+        except ValueError:
+            print(f"Ignored {CONCURRENCY_EXTENSION}: {override}, expected sync or async")
+    return default if configured is None else configured
@@ -1,8 +1,23 @@
+import copy
 from pathlib import Path
 
 import pytest
 
 from openapi_reader.reader import read_openapi_schema
+from py_openapi_tools import formatting
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+@pytest.fixture(autouse=True)
+def fragment_cache_dir(tmp_path_factory, monkeypatch):
+    """
+    Every test formats through a fragment cache of its own instead of the one in the home directory
+    """
+    cache_dir = tmp_path_factory.mktemp("cache") / "fragments"
+    monkeypatch.setenv(formatting.CACHE_DIR_ENV, str(cache_dir))
+    formatting.configure_cache()
+    yield cache_dir
+    formatting.configure_cache()
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -15,3 +30,49 @@ def openapi_yaml():
 def openapi_example_yaml():
     data = read_openapi_schema(Path(__file__).parent / "openapi_examples.yaml")
     yield data
+
+
+@pytest.fixture(scope="session")
+def pets_yaml():
+    data = read_openapi_schema(Path(__file__).parent / "pets.yaml")
+    yield data
+
+
+@pytest.fixture
+def pets_definition(pets_yaml):
+    """
+    Parses `pets.yaml`, e.g. `pets_definition("getPet", getPet={"x-cache-ttl": 30})`
+    :return: a factory, it keeps the operations of the positional ids (all if omitted) and merges the keyword
+    arguments into the operation of that id
+    """
+
+    def create_definition(*operation_ids: str, **operations: dict) -> OpenAPIDefinition:
+        data = copy.deepcopy(pets_yaml)
+        for path, methods in list(data["paths"].items()):
+            for method, operation in list(methods.items()):
+                if operation_ids and operation["operationId"] not in operation_ids:
+                    del methods[method]
+                else:
+                    operation.update(operations.get(operation["operationId"], {}))
+            if not methods:
+                del data["paths"][path]
+        definition = OpenAPIDefinition(data)
+        definition.parse()
+        return definition
+
+    return create_definition
+
+
+@pytest.fixture(scope="session")
+def exec_module():
+    """
+    Executes a module the generators write next to the views, e.g. `exec_module(ETAG_MODULE_IMPORTS, ETAG_MODULE)`
+    :return: the namespace of the module
+    """
+
+    def execute(imports: list[str], module: str) -> dict:
+        namespace = {}
+        exec("\n".join(imports) + module, namespace)
+        return namespace
+
+    return execute
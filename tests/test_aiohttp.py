@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+
+import pytest
+
+from py_openapi_tools.aiohttp import (
+    MIDDLEWARES_FILE_NAME,
+    create_app,
+    create_route,
+    create_view_file,
+    create_view_func,
+    error_class,
+)
+from py_openapi_tools.fastapi import create_serializer_file
+from py_openapi_tools.schema import AuthType, OpenAPIDefinition
+
+PET_REF = {"$ref": "#/components/schemas/Pet"}
+
+
+def create_definition() -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}},
+                "securitySchemes": {"bearerAuth": {"type": "http", "scheme": "bearer"}},
+            },
+            "paths": {
+                "/pets/{petId}/{kind}": {
+                    "get": {
+                        "operationId": "getPet",
+                        "parameters": [
+                            {"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                            {"name": "kind", "in": "path", "required": True, "schema": {"type": "string"}},
+                            {"name": "tags", "in": "query", "schema": {"type": "array", "items": {"type": "string"}}},
+                        ],
+                        "responses": {
+                            "200": {"content": {"application/json": {"schema": PET_REF}}},
+                            "404": {"description": "missing"},
+                        },
+                    },
+                    "put": {
+                        "operationId": "updatePet",
+                        "security": [{"bearerAuth": []}],
+                        "requestBody": {"content": {"application/json": {"schema": PET_REF}}},
+                        "responses": {"200": {"content": {"application/json": {"schema": PET_REF}}}},
+                    },
+                },
+            },
+        }
+    )
+    definition.parse()
+    return definition
+
+
+def test_error_class():
+    assert error_class(404) == "HTTPNotFound"
+    assert error_class(422) == "HTTPUnprocessableEntity"
+    assert error_class(499) == "HTTPBadRequest"
+
+
+def test_create_route():
+    path = create_definition().paths[0]
+    route, statements = create_route(path, path.methods[0])
+    assert route == r"/pets/{pet_id:-?\d+}/{kind}"
+    assert statements == ['pet_id = int(request.match_info["pet_id"])', 'kind = request.match_info["kind"]']
+    # undeclared parameters are strings
+    route, statements = create_route(path, path.methods[1])
+    assert route == "/pets/{pet_id}/{kind}"
+
+
+def test_create_view_func():
+    imports = []
+    used_auth_types = []
+    view = create_view_func(create_definition().paths[0], imports=imports, used_auth_types=used_auth_types)
+    compile(view, "views.py", "exec")
+    assert '@routes.get(r"/pets/{pet_id:-?\\d+}/{kind}")' in view
+    assert 'query = GetPet.model_validate(query_params(request, many=("tags",)))' in view
+    assert "raise web.HTTPNotFound()" in view
+    assert '@routes.put("/pets/{pet_id}/{kind}")\n@requires("bearer")' in view
+    assert "body = Pet.model_validate_json(await request.read())" in view
+    assert used_auth_types == [AuthType.BEARER]
+    assert f"from .{MIDDLEWARES_FILE_NAME} import requires" in imports
+
+    app = create_app(used_auth_types, imports)
+    assert "app = web.Application(middlewares=[validation_middleware, bearer_auth_middleware])" in app
+
+
+def test_generated_app(tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    definition = create_definition()
+    package = tmp_path / "aiohttp_petstore"
+    package.mkdir()
+    (package / "__init__.py").touch()
+    create_serializer_file(definition, export_folder=package)
+    create_view_file(definition, export_folder=package)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    views = importlib.import_module("aiohttp_petstore.views")
+
+    async def requests():
+        async with TestClient(TestServer(views.create_app())) as client:
+            response = await client.get("/pets/7/dog", params=[("tags", "a"), ("tags", "b")])
+            assert (response.status, await response.json()) == (200, {"name": None})
+            # the route of the GET handler only matches integer ids
+            assert (await client.get("/pets/x/dog")).status == 405
+
+            response = await client.put("/pets/7/dog", json={"name": "Rex"})
+            assert response.status == 401
+            assert response.headers["WWW-Authenticate"] == "Bearer"
+
+            headers = {"Authorization": "Bearer valid-token"}
+            response = await client.put("/pets/7/dog", json={"name": 7}, headers=headers)
+            assert response.status == 422
+            assert [obj["loc"] for obj in await response.json()] == [["name"]]
+            assert (await client.put("/pets/7/dog", data=b"not json", headers=headers)).status == 422
+            assert (await client.put("/pets/7/dog", json={"name": "Rex"}, headers=headers)).status == 200
+
+    asyncio.run(requests())
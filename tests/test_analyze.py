@@ -0,0 +1,89 @@
+import pytest
+
+from py_openapi_tools import analyze
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+@pytest.fixture
+def definition() -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {
+                    "Tag": {"type": "object", "properties": {"name": {"type": "string", "example": "dog"}}},
+                    "Pet": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer", "example": 10},
+                            "tags": {"type": "array", "maxItems": 2, "items": {"$ref": "#/components/schemas/Tag"}},
+                        },
+                    },
+                    "Cat": {"allOf": [{"$ref": "#/components/schemas/Pet"}]},
+                }
+            },
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "operationId": "listPets",
+                        "responses": {
+                            "200": {
+                                "content": {
+                                    "application/json": {
+                                        "schema": {
+                                            "type": "array",
+                                            "maxItems": 3,
+                                            "items": {"$ref": "#/components/schemas/Pet"},
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                    }
+                }
+            },
+        }
+    )
+    definition.parse()
+    return definition
+
+
+def test_schema_metrics(definition):
+    report = analyze.analyze(definition)
+    metrics = {obj.name: obj for obj in report.schemas}
+
+    assert (metrics["Tag"].fan_in, metrics["Tag"].fan_out, metrics["Tag"].depth) == (1, 0, 1)
+    # referenced by Cat and by GET /pets
+    assert (metrics["Pet"].fan_in, metrics["Pet"].fan_out, metrics["Pet"].depth) == (2, 1, 2)
+    assert (metrics["Cat"].combined_width, metrics["Cat"].depth) == (1, 3)
+    # braces + key with quotes, colon and comma + the example
+    assert metrics["Tag"].estimated_size == 2 + (4 + 4) + len('"dog"')
+    # {"id": 10, "tags": [<Tag>, <Tag>]}
+    assert metrics["Pet"].estimated_size == 2 + (2 + 4 + 2) + (4 + 4 + 2 + 2 * (metrics["Tag"].estimated_size + 1))
+
+
+def test_operation_metrics(definition):
+    report = analyze.analyze(definition, top=1)
+
+    (operation,) = report.operations
+    assert operation.operation == "GET /pets"
+    assert operation.depth == 2
+    pet_size = next(obj.estimated_size for obj in report.schemas if obj.name == "Pet")
+    assert operation.response_size == 2 + 3 * (pet_size + 1)
+    # Cat contains all of Pet
+    assert report.top_schemas["estimated_size"] == ["Cat"]
+
+
+def test_aggregates_without_numpy(definition, monkeypatch):
+    with_numpy = analyze.analyze(definition)
+    monkeypatch.setattr(analyze, "np", None)
+    without_numpy = analyze.analyze(definition)
+
+    assert with_numpy.to_dict() == without_numpy.to_dict()
+    assert without_numpy.schema_aggregates["property_count"] == {
+        "count": 3,
+        "sum": 3.0,
+        "mean": 1.0,
+        "p50": 1.0,
+        "p95": 1.9,
+        "max": 2.0,
+    }
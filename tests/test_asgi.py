@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from py_openapi_tools.asgi import ROUTING_MODULE, ROUTING_MODULE_IMPORTS, RouteNode, create_view_func
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+@pytest.fixture
+def routing(exec_module):
+    return exec_module(ROUTING_MODULE_IMPORTS, ROUTING_MODULE)
+
+
+@pytest.fixture
+def create_definition(pets_definition):
+    def create() -> OpenAPIDefinition:
+        parameters = [
+            {"$ref": "#/components/parameters/petId"},
+            {"$ref": "#/components/parameters/fields"},
+            {"name": "full", "in": "query", "required": True, "schema": {"type": "boolean"}},
+        ]
+        return pets_definition("getPet", "updatePet", getPet={"parameters": parameters})
+
+    return create
+
+
+def call(app, method: str, path: str, query: bytes = b"", body: bytes = b"") -> tuple[int, dict, bytes]:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": []}
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"], dict(messages[0]["headers"]), messages[1]["body"]
+
+
+def test_route_tree_is_compressed():
+    routes = RouteNode()
+    routes.add("/store/inventory/items", "get", "A")
+    routes.add("/pets", "get", "B")
+    routes.add("/pets/{petId}", "delete", "C")
+    assert routes.render() == (
+        'Node(edges={"store": (("store", "inventory", "items"), Node(endpoints={"GET": A})), '
+        '"pets": (("pets",), Node(param=Node(endpoints={"DELETE": C}), endpoints={"GET": B}))})'
+    )
+
+
+def test_match_prefers_static_segments(routing):
+    node, endpoint = routing["Node"], routing["Endpoint"]
+    handler = endpoint(lambda request: None, 200)
+    # /pets/mine and /pets/{petId}/owner
+    root = node(
+        edges={
+            "pets": (
+                ("pets",),
+                node(
+                    edges={"mine": (("mine",), node(endpoints={"GET": handler}))},
+                    param=node(edges={"owner": (("owner",), node(endpoints={"GET": handler}))}),
+                ),
+            )
+        }
+    )
+    values = []
+    assert routing["match"](root, ["pets", "mine"], 0, values) is not None and values == []
+    # the static edge doesn't lead to a route, the parameter does
+    assert routing["match"](root, ["pets", "mine", "owner"], 0, values) is not None and values == ["mine"]
+    assert routing["match"](root, ["pets"], 0, []) is None
+
+
+def test_create_view_func(create_definition):
+    imports = []
+    routes = RouteNode()
+    view = create_view_func(create_definition().paths[0], routes, imports=imports)
+    compile(view, "views.py", "exec")
+    assert "async def get_pet(request: Request, pet_id: int, full: bool, fields: typing.Optional[str] = None)" in view
+    assert "async def update_pet(request: Request, pet_id: int, body: typing.Any)" in view
+    tree = routes.render()
+    assert 'Param("full", "full", parse_bool, location="query")' in tree
+    assert 'Param("fields", "fields", str, location="query", required=False)' in tree
+    assert 'Endpoint(update_pet, 200, path_params=(Param("petId", "pet_id", int),), has_body=True)' in tree
+    assert "from .routing import parse_bool" in imports
+
+
+def test_generated_app(create_definition, routing):
+    imports = []
+    routes = RouteNode()
+    views = create_view_func(create_definition().paths[0], routes, imports=imports)
+    views = views.replace("return {}", "return {**locals(), 'request': None}", 1)
+    exec(f"import typing\n{views}\napp = create_app({routes.render()})", routing)
+    app = routing["app"]
+
+    status, headers, body = call(app, "GET", "/pets/7", b"full=true")
+    assert status == 200 and json.loads(body) == {"request": None, "pet_id": 7, "full": True, "fields": None}
+    assert headers[b"content-type"] == b"application/json"
+    assert call(app, "GET", "/pets/x", b"full=true")[0] == 400
+    assert call(app, "GET", "/pets/7")[0] == 400
+    assert call(app, "GET", "/owners")[0] == 404
+    status, headers, _ = call(app, "DELETE", "/pets/7")
+    assert status == 405 and headers[b"allow"] == b"GET, PUT"
+
+    routing["configure_json"](dumps=lambda value: b"custom")
+    assert call(app, "PUT", "/pets/7", body=b'{"name": "Rex"}') == (
+        200,
+        {b"content-type": b"application/json", b"content-length": b"6"},
+        b"custom",
+    )
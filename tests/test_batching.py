@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from py_openapi_tools.batching import (
+    LOADER_IMPORT,
+    LOADERS_MODULE,
+    LOADERS_MODULE_IMPORTS,
+    batch_loader_enabled,
+)
+
+
+@pytest.fixture
+def loaders(exec_module):
+    return exec_module(LOADERS_MODULE_IMPORTS, LOADERS_MODULE)
+
+
+def test_data_loader_batches(loaders):
+    calls = []
+
+    def load_many(ids):
+        calls.append(ids)
+        return {obj: f"pet {obj}" for obj in ids if obj != 3}
+
+    async def run():
+        loader = loaders["DataLoader"](load_many)
+        values = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+        # cached for the lifetime of the loader
+        return values, await loader.load_many([2, 4])
+
+    assert asyncio.run(run()) == (["pet 1", "pet 2", "pet 1", None], ["pet 2", "pet 4"])
+    assert calls == [[1, 2, 3], [4]]
+
+
+def test_data_loader_failures_are_not_cached(loaders):
+    calls = []
+
+    async def load_many(ids):
+        calls.append(ids)
+        if len(calls) == 1:
+            raise ConnectionError
+        return [obj * 2 for obj in ids]
+
+    async def run():
+        loader = loaders["DataLoader"](load_many)
+        with pytest.raises(ConnectionError):
+            await loader.load(1)
+        return await loader.load(1)
+
+    assert asyncio.run(run()) == 2
+    assert calls == [[1], [1]]
+
+
+def test_batch_loader_enabled(pets_definition):
+    definition = pets_definition("getPet", "getOwner")
+    assert definition.paths[0].get_id_param().name == "petId"
+    assert definition.paths[1].get_id_param() is None
+
+    assert not batch_loader_enabled(definition.paths[0], definition.paths[0].methods[0])
+    assert batch_loader_enabled(definition.paths[0], definition.paths[0].methods[0], default=True)
+    assert not batch_loader_enabled(definition.paths[1], definition.paths[1].methods[0], default=True)
+
+
+def test_fastapi_loader_route(pets_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    imports = []
+    view = create_view_func(pets_definition("getPet", "getOwner").paths[0], imports=imports, batch_loaders=True)
+    compile(view, "views.py", "exec")
+    assert "def get_pet_load_many(ids: list[int]) -> list[typing.Optional[Pet]]:" in view
+    assert "async def get_pet(petId: int, loader: DataLoader = Depends(get_pet_loader)) -> Pet:" in view
+    assert "await loader.load(petId)" in view
+    assert LOADER_IMPORT in imports
+
+
+def test_shared_loader_batches_concurrent_requests(loaders):
+    calls = []
+
+    def load_many(ids):
+        calls.append(ids)
+        return [f"pet {obj}" for obj in ids]
+
+    async def request(pet_id):
+        return await loaders["shared_loader"](load_many).load(pet_id)
+
+    async def run():
+        first = await asyncio.gather(request(1), request(2), request(1))
+        # the previous batch isn't cached
+        return first, await request(1)
+
+    assert asyncio.run(run()) == (["pet 1", "pet 2", "pet 1"], "pet 1")
+    assert calls == [[1, 2], [1]]
+
+
+def test_fastapi_loader_route_batches_concurrent_requests(pets_definition, loaders):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    from py_openapi_tools.fastapi import create_view_func
+
+    view = create_view_func(pets_definition("getPet").paths[0], imports=[], batch_loaders=True)
+    namespace = dict(loaders)
+    exec(
+        "\n".join(
+            [
+                "import typing",
+                "from fastapi import Depends, FastAPI, HTTPException",
+                "from pydantic import BaseModel",
+                "class Pet(BaseModel):\n    name: str",
+                "app = FastAPI()",
+                view,
+            ]
+        ),
+        namespace,
+    )
+    calls = []
+
+    def load_many(ids):
+        calls.append(ids)
+        return {obj: {"name": f"pet {obj}"} for obj in ids if obj != 3}
+
+    namespace["get_pet_load_many"] = load_many
+
+    async def run():
+        transport = httpx.ASGITransport(app=namespace["app"])
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(f"/pets/{obj}") for obj in (1, 2, 3)))
+
+    responses = asyncio.run(run())
+    assert [obj.status_code for obj in responses] == [200, 200, 404]
+    assert responses[1].json() == {"name": "pet 2"}
+    assert calls == [[1, 2, 3]]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from py_openapi_tools.benchmark import apply_baseline, benchmark, load_app, query_string, results_to_text
+from py_openapi_tools.loadtest import SampleRequest
+
+REQUESTS = [
+    SampleRequest("listPets", "GET", "/pets", "pets", query={"limit": 2, "tags": ["a", "b"], "deleted": False}),
+    SampleRequest("createPet", "POST", "/pets/new%20pet", "pets", headers={"X-Tenant": "1"}, body={"name": "doggie"}),
+]
+
+
+def test_query_string():
+    assert query_string(REQUESTS[0]) == "limit=2&tags=a&tags=b&deleted=false"
+
+
+def test_load_app():
+    assert load_app("json:dumps") is json.dumps
+    for target in ("json", "json:missing_attribute", "json:__name__"):
+        with pytest.raises((ValueError, AttributeError)):
+            load_app(target)
+
+
+def test_benchmark_asgi():
+    calls = []
+    lifespan = []
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                lifespan.append(message["type"])
+                if message["type"] == "lifespan.startup":
+                    scope["state"]["db"] = "connected"
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        message = await receive()
+        calls.append((scope["method"], scope["path"], scope["query_string"], dict(scope["headers"]), message["body"]))
+        assert scope["state"] == {"db": "connected"}
+        status = 201 if scope["method"] == "POST" else 404
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    results = benchmark(app, REQUESTS, iterations=5, repeat=2, headers={"Authorization": "Bearer token"})
+    assert lifespan == ["lifespan.startup", "lifespan.shutdown"]
+    assert [(obj.operation_id, obj.status_code) for obj in results] == [("listPets", 404), ("createPet", 201)]
+    assert all(obj.ops_per_sec > 0 and obj.mean_us > 0 and obj.peak_bytes >= 0 for obj in results)
+
+    method, path, _, headers, body = calls[-1]
+    assert (method, path, body) == ("POST", "/pets/new pet", b'{"name": "doggie"}')
+    assert headers[b"x-tenant"] == b"1"
+    assert headers[b"authorization"] == b"Bearer token"
+    assert headers[b"content-type"] == b"application/json"
+
+
+def test_benchmark_wsgi():
+    environs = []
+
+    def application(environ, start_response):
+        environs.append(environ)
+        environ["wsgi.input"].read()
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [b"[]"]
+
+    results = benchmark(application, REQUESTS, iterations=5, repeat=2)
+    assert [obj.status_code for obj in results] == [200, 200]
+    environ = environs[-1]
+    assert (environ["REQUEST_METHOD"], environ["PATH_INFO"]) == ("POST", "/pets/new pet")
+    assert (environ["CONTENT_LENGTH"], environ["CONTENT_TYPE"]) == ("18", "application/json")
+    assert environ["HTTP_X_TENANT"] == "1"
+
+    apply_baseline(results, [{"operation_id": "listPets", "ops_per_sec": results[0].ops_per_sec / 2}])
+    assert results[0].baseline_ops_per_sec == results[0].ops_per_sec / 2
+    assert results[1].baseline_ops_per_sec is None
+    lines = results_to_text(results).splitlines()
+    assert lines[0].split()[:5] == ["operation", "status", "ops/sec", "mean", "us"]
+    assert lines[0].split()[5:] == ["peak", "bytes", "retained", "blocks", "change"]
+    assert lines[1].endswith("+100.0%")
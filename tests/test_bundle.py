@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from py_openapi_tools.bundle import bundle
+from py_openapi_tools.reader import cli
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+def test_dereferenced_data(openapi_yaml):
+    definition = OpenAPIDefinition(openapi_yaml)
+
+    data = definition.dereferenced_data()
+
+    assert "$ref" not in json.dumps(data)
+    pet_schema = data["paths"]["/pet"]["put"]["requestBody"]["content"]["application/json"]["schema"]
+    assert pet_schema == data["components"]["schemas"]["Pet"]
+    assert pet_schema["properties"]["category"] == data["components"]["schemas"]["Category"]
+
+
+def test_recursive_reference_is_kept():
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {
+                    "Node": {
+                        "type": "object",
+                        "properties": {"children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}},
+                    }
+                }
+            },
+            "paths": {"/node": {"get": {"responses": {"200": {"$ref": "#/components/schemas/Node"}}}}},
+        }
+    )
+
+    data = definition.dereferenced_data()
+
+    node = data["paths"]["/node"]["get"]["responses"]["200"]
+    assert node["properties"]["children"]["items"] == {"$ref": "#/components/schemas/Node"}
+
+
+def test_bundle_is_canonical():
+    first = OpenAPIDefinition({"paths": {}, "info": {"version": "1", "title": "ä"}})
+    second = OpenAPIDefinition({"info": {"title": "ä", "version": "1"}, "paths": {}})
+
+    assert bundle(first) == bundle(second) == '{"info":{"title":"ä","version":"1"},"paths":{}}'
+
+
+def test_generate_with_precomputed_openapi(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            str(Path(__file__).parent / "openapi.yaml"),
+            "--framework",
+            "fastapi",
+            "--export-folder",
+            str(tmp_path),
+            "--precomputed-openapi",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads((tmp_path / "openapi.json").read_text())["info"]["title"]
+    assert "app.openapi_schema = json.loads(" in (tmp_path / "views.py").read_text()
@@ -0,0 +1,147 @@
+import pytest
+
+from py_openapi_tools.caching import (
+    CACHE_INVALIDATION_IMPORT,
+    CACHE_LOOKUP_IMPORT,
+    CACHE_MODULE,
+    CACHE_MODULE_IMPORTS,
+    get_cache_ttl,
+)
+from py_openapi_tools.etags import CONDITIONAL_GET_IMPORT
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def cache(exec_module):
+    return exec_module(CACHE_MODULE_IMPORTS, CACHE_MODULE)
+
+
+@pytest.fixture
+def create_definition(pets_definition):
+    def create(**get_extensions) -> OpenAPIDefinition:
+        # the cache key of `getPet` includes its query parameters
+        parameters = [{"$ref": "#/components/parameters/petId"}, {"$ref": "#/components/parameters/fields"}]
+        return pets_definition("getPet", "updatePet", getPet={"parameters": parameters, **get_extensions})
+
+    return create
+
+
+def test_get_cache_ttl(create_definition):
+    assert get_cache_ttl(create_definition().paths[0].methods[0]) is None
+    assert get_cache_ttl(create_definition(**{"x-cache-ttl": "30"}).paths[0].methods[0]) == 30
+    assert get_cache_ttl(create_definition(**{"x-cache-ttl": 0}).paths[0].methods[0]) is None
+    assert get_cache_ttl(create_definition(**{"x-cache-ttl": "soon"}).paths[0].methods[0]) is None
+
+
+def test_lru_cache(cache):
+    clock = Clock()
+    backend = cache["LRUCache"](max_entries=2, clock=clock)
+    first = cache["cache_key"]("/pets/{petId}", {"petId": 1}, {"fields": "name", "limit": 5})
+    assert first == cache["cache_key"]("/pets/{petId}", {"petId": 1}, {"limit": 5, "fields": "name"})
+    second = cache["cache_key"]("/pets/{petId}", {"petId": 1})
+    third = cache["cache_key"]("/pets/{petId}", {"petId": 2})
+
+    backend.set(first, b"1", 10)
+    backend.set(second, b"2", 10)
+    assert backend.get(first) == b"1"
+    backend.set(third, b"3", 10)
+    # the least recently used entry is evicted
+    assert backend.get(second) is None
+    assert backend.get(first) == b"1"
+
+    backend.invalidate(cache["cache_prefix"]("/pets/{petId}", {"petId": 1}))
+    assert backend.get(first) is None
+    assert backend.get(third) == b"3"
+
+    clock.now = 10
+    assert backend.get(third) is None
+
+
+def test_cache_key_principal(cache):
+    anonymous = cache["cache_key"]("/pets/{petId}", {"petId": 1})
+    alice = cache["cache_key"]("/pets/{petId}", {"petId": 1}, principal={"token": "alice"})
+    bob = cache["cache_key"]("/pets/{petId}", {"petId": 1}, principal={"token": "bob"})
+    assert len({anonymous, alice, bob}) == 3
+
+    backend = cache["LRUCache"]()
+    backend.set(alice, b"1", 10)
+    backend.set(bob, b"2", 10)
+    # a write to the resource invalidates the responses of every user
+    backend.invalidate(cache["cache_prefix"]("/pets/{petId}", {"petId": 1}))
+    assert backend.get(alice) is None and backend.get(bob) is None
+
+
+def test_invalidates(cache):
+    class Request:
+        method = "PUT"
+
+    class Result:
+        status_code = 200
+
+    backend = cache["get_backend"]()
+    key = cache["cache_key"]("/pets/{petId}", {"pet_id": 1})
+    backend.set(key, b"{}", 10)
+
+    @cache["invalidates"]("/pets/{petId}", "pet_id")
+    def view(request, pet_id):
+        return Result()
+
+    Request.method = "GET"
+    view(Request(), pet_id=1)
+    assert backend.get(key) == b"{}"
+    Request.method = "PUT"
+    view(Request(), pet_id=1)
+    assert backend.get(key) is None
+
+
+def test_drf_cached_view(create_definition):
+    from py_openapi_tools.drf import create_view_func
+
+    imports = []
+    view = create_view_func(create_definition(**{"x-cache-ttl": 30}).paths[0], imports=imports)
+    compile(view, "views.py", "exec")
+    assert 'key = cache_key("/pets/{petId}", {"pet_id": pet_id}, serializer.validated_data, None)' in view
+    assert "get_backend().set(key, content, 30.0)" in view
+    assert '@invalidates("/pets/{petId}", "pet_id")\ndef get_pet(request, pet_id: int):' in view
+    assert CACHE_LOOKUP_IMPORT in imports and CACHE_INVALIDATION_IMPORT in imports
+
+    view = create_view_func(create_definition(**{"x-cache-ttl": 30, "x-etag": True}).paths[0], imports=imports)
+    compile(view, "views.py", "exec")
+    assert 'request.headers.get("If-None-Match"), get_pet_version(pet_id), lambda: content' in view
+
+
+def test_fastapi_cached_routes(create_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    imports = []
+    view = create_view_func(create_definition(**{"x-cache-ttl": 30}).paths[0], imports=imports)
+    compile(view, "views.py", "exec")
+    assert "async def get_pet(petId: int, fields: str) -> Pet:" in view
+    assert 'key = cache_key("/pets/{petId}", {"petId": petId}, {"fields": fields}, None)' in view
+    assert '@invalidates("/pets/{petId}", "petId")\nasync def update_pet(petId: int) -> Pet:' in view
+    assert CACHE_LOOKUP_IMPORT in imports and CONDITIONAL_GET_IMPORT not in imports
+
+    view = create_view_func(create_definition().paths[0], imports=[])
+    assert "invalidates" not in view and "cache_key" not in view
+
+
+def test_secured_cached_routes(pets_definition):
+    from py_openapi_tools import drf, fastapi
+
+    secured = {"x-cache-ttl": 30, "security": [{"bearerAuth": []}]}
+    path = pets_definition("getPet", getPet=secured).paths[0]
+    view = fastapi.create_view_func(path, imports=[])
+    compile(view, "views.py", "exec")
+    assert 'key = cache_key("/pets/{petId}", {"petId": petId}, {}, {"token": token})' in view
+
+    view = drf.create_view_func(path, imports=[])
+    compile(view, "views.py", "exec")
+    assert 'key = cache_key("/pets/{petId}", {"pet_id": pet_id}, None, getattr(request.user, "pk", None))' in view
@@ -0,0 +1,133 @@
+import asyncio
+import functools
+
+import pytest
+
+from py_openapi_tools.client import (
+    CLIENT_RUNTIME,
+    create_client_class,
+    create_client_method,
+    get_base_url,
+    get_timeout,
+)
+from py_openapi_tools.schema import OpenAPIDefinition
+
+PET_REF = {"$ref": "#/components/schemas/Pet"}
+SPEC = {
+    "servers": [{"url": "https://{env}.example.com/v1/", "variables": {"env": {"default": "api"}}}],
+    "components": {
+        "schemas": {"Pet": {"type": "object", "properties": {"id": {"type": "integer"}, "name": {"type": "string"}}}}
+    },
+    "paths": {
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [
+                    {"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                    {"name": "fields", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"content": {"application/json": {"schema": PET_REF}}}},
+            },
+            "put": {
+                "operationId": "updatePet",
+                "x-timeout": 2.5,
+                "requestBody": {"content": {"application/json": {"schema": PET_REF}}},
+                "responses": {"204": {"description": "updated"}},
+            },
+        },
+    },
+}
+
+
+def create_definition() -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(SPEC)
+    definition.parse()
+    return definition
+
+
+def test_base_url_and_timeout():
+    definition = create_definition()
+    assert get_base_url(definition) == "https://api.example.com/v1"
+    assert get_base_url(OpenAPIDefinition({"paths": {}})) == "http://localhost"
+    assert get_timeout(definition.paths[0].methods[0]) == 10.0
+    assert get_timeout(definition.paths[0].methods[1]) == 2.5
+
+
+def test_create_client_method():
+    imports = []
+    adapter_definitions = []
+    path = create_definition().paths[0]
+    method = create_client_method(
+        path, path.methods[0], asynchronous=True, imports=imports, adapter_definitions=adapter_definitions
+    )
+    compile(method, "client.py", "exec")
+    assert (
+        "async def get_pet(self, pet_id: int, *, fields: typing.Optional[str] = None, "
+        "timeout: typing.Optional[float] = None) -> Pet:"
+    ) in method
+    assert "f\"/pets/{quote(str(pet_id), safe='')}\"" in method
+    assert 'params={"fields": fields}, timeout=10.0 if timeout is None else timeout' in method
+    assert "return PET_ADAPTER.validate_json(response.content)" in method
+    assert adapter_definitions == ["PET_ADAPTER = TypeAdapter(Pet)"]
+
+    method = create_client_method(path, path.methods[1], imports=imports, adapter_definitions=adapter_definitions)
+    assert "def update_pet(self, pet_id: str, body: Pet, *, timeout: typing.Optional[float] = None) -> None:" in method
+    assert "timeout=2.5 if timeout is None else timeout" in method
+
+
+def test_client_against_stand_in():
+    httpx = pytest.importorskip("httpx")
+    from pydantic import BaseModel
+
+    class Pet(BaseModel):
+        id: int = 0
+        name: str = ""
+
+    imports = []
+    adapter_definitions = []
+    definition = create_definition()
+    classes = [
+        create_client_class(definition, imports=imports, adapter_definitions=adapter_definitions),
+        create_client_class(definition, asynchronous=True, imports=imports, adapter_definitions=adapter_definitions),
+    ]
+    namespace = {"Pet": Pet}
+    module = [
+        "import asyncio, threading, typing, weakref",
+        "from concurrent.futures import ThreadPoolExecutor",
+        "from urllib.parse import quote",
+        "import httpx",
+        "from pydantic import TypeAdapter",
+        *adapter_definitions,
+        CLIENT_RUNTIME.substitute(base_url="http://stand-in"),
+        *classes,
+    ]
+    exec("\n".join(module), namespace)
+
+    requests = []
+
+    def stand_in(request):
+        requests.append(request)
+        if request.method == "PUT":
+            return httpx.Response(204)
+        pet_id = int(request.url.path.split("/")[-1])
+        if pet_id == 0:
+            return httpx.Response(404, text="missing")
+        return httpx.Response(200, json={"id": pet_id, "name": request.url.params.get("fields", "")})
+
+    client = namespace["Client"](headers={"Authorization": "Bearer token"}, transport=httpx.MockTransport(stand_in))
+    pets = namespace["fan_out"]([functools.partial(client.get_pet, obj, fields="name") for obj in (1, 2, 3)])
+    assert pets == [Pet(id=1, name="name"), Pet(id=2, name="name"), Pet(id=3, name="name")]
+    assert requests[0].headers["Authorization"] == "Bearer token"
+    assert client.update_pet("4", Pet(name="Rex")) is None
+    assert requests[-1].content == b'{"name":"Rex"}'
+    with pytest.raises(namespace["ApiError"]) as exc:
+        client.get_pet(0)
+    assert exc.value.status_code == 404
+
+    async def run():
+        async_client = namespace["AsyncClient"](transport=httpx.MockTransport(stand_in))
+        return await namespace["afan_out"]([functools.partial(async_client.get_pet, obj) for obj in range(1, 6)])
+
+    assert [obj.id for obj in asyncio.run(run())] == [1, 2, 3, 4, 5]
+    assert namespace["get_client"]() is namespace["get_client"]("http://stand-in")
+    namespace["close_clients"]()
@@ -0,0 +1,37 @@
+from py_openapi_tools.utils import Concurrency, get_concurrency
+
+
+def test_get_concurrency():
+    assert get_concurrency({}, default=Concurrency.ASYNC) == Concurrency.ASYNC
+    assert get_concurrency({}, default=Concurrency.ASYNC, configured=Concurrency.SYNC) == Concurrency.SYNC
+    assert (
+        get_concurrency({"x-concurrency": "async"}, default=Concurrency.SYNC, configured=Concurrency.SYNC)
+        == Concurrency.ASYNC
+    )
+    assert (
+        get_concurrency({"x-concurrency": "threads"}, default=Concurrency.ASYNC, configured=Concurrency.SYNC)
+        == Concurrency.SYNC
+    )
+
+
+def test_fastapi_sync_handlers(pets_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    definition = pets_definition("createPet", "getPet", createPet={"x-concurrency": "async"})
+    create_pet, get_pet = (
+        create_view_func(path, imports=[], concurrency=Concurrency.SYNC) for path in definition.paths
+    )
+    assert "async def create_pet(" in create_pet
+    assert "\ndef get_pet(" in get_pet
+
+
+def test_drf_async_view(pets_definition):
+    from py_openapi_tools.drf import ASYNC_SAVE, create_view_func
+
+    definition = pets_definition("createPet", "getPet", createPet={"x-concurrency": "async"})
+    imports = []
+    create_pet, get_pet = (create_view_func(path, imports=imports) for path in definition.paths)
+    assert '@async_api_view(["POST"])\nasync def create_pet(request):' in create_pet
+    assert ASYNC_SAVE in create_pet
+    assert '@api_view(["GET"])\ndef get_pet(' in get_pet
+    assert "from adrf.decorators import api_view as async_api_view" in imports
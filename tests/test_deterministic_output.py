@@ -0,0 +1,80 @@
+import copy
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from py_openapi_tools import drf, fastapi
+from py_openapi_tools.schema import OpenAPIDefinition
+
+GENERATE_SCRIPT = """
+import sys
+from pathlib import Path
+
+from py_openapi_tools.reader import read_openapi_schema
+from py_openapi_tools.schema import OpenAPIDefinition
+
+framework, spec, export_folder = sys.argv[1], Path(sys.argv[2]), Path(sys.argv[3])
+definition = OpenAPIDefinition(read_openapi_schema(spec))
+definition.parse()
+if framework == "drf":
+    from py_openapi_tools.drf import create_serializer_file, create_urls_file, create_view_file
+
+    create_serializer_file(definition, export_folder=export_folder)
+    create_view_file(definition, export_folder=export_folder)
+    create_urls_file(definition, export_folder=export_folder)
+else:
+    from py_openapi_tools.fastapi import create_view_file
+
+    create_view_file(definition, export_folder=export_folder)
+"""
+
+HASH_SEEDS = ("0", "1", "42", "1234")
+
+
+def generate(framework: str, hash_seed: str, export_folder: Path, spec: str = "openapi.yaml") -> dict[str, bytes]:
+    export_folder.mkdir()
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed}
+    subprocess.run(
+        [sys.executable, "-c", GENERATE_SCRIPT, framework, str(Path(__file__).parent / spec), export_folder],
+        env=env,
+        cwd=Path(__file__).parent.parent,
+        check=True,
+        capture_output=True,
+    )
+    return {file.name: file.read_bytes() for file in sorted(export_folder.iterdir())}
+
+
+@pytest.mark.parametrize("framework", ["drf", "fastapi"])
+def test_output_is_independent_of_hash_seed(tmp_path, framework):
+    results = [generate(framework, seed, tmp_path / f"seed_{seed}") for seed in HASH_SEEDS]
+
+    assert results[0]
+    assert all(result == results[0] for result in results[1:])
+
+
+def generate_in_process(framework: str, data: dict, export_folder: Path) -> dict[str, bytes]:
+    export_folder.mkdir()
+    definition = OpenAPIDefinition(copy.deepcopy(data))
+    definition.parse()
+    if framework == "drf":
+        drf.create_serializer_file(definition, export_folder=export_folder)
+        drf.create_view_file(definition, export_folder=export_folder)
+        drf.create_urls_file(definition, export_folder=export_folder)
+    else:
+        fastapi.create_view_file(definition, export_folder=export_folder)
+    return {file.name: file.read_bytes() for file in sorted(export_folder.iterdir())}
+
+
+@pytest.mark.parametrize("framework", ["drf", "fastapi"])
+def test_output_is_independent_of_earlier_generations(tmp_path, pets_yaml, framework):
+    secured = copy.deepcopy(pets_yaml)
+    secured["components"]["securitySchemes"] = {"bearerAuth": {"type": "http", "scheme": "bearer"}}
+    secured["paths"]["/pets/{petId}"]["get"].update({"security": [{"bearerAuth": []}], "x-cache-ttl": 30})
+    generate_in_process(framework, secured, tmp_path / "secured")
+
+    result = generate_in_process(framework, pets_yaml, tmp_path / "plain")
+
+    assert result == generate(framework, "0", tmp_path / "expected", spec="pets.yaml")
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from py_openapi_tools.etags import (
+    CONDITIONAL_GET_IMPORT,
+    ETAG_MODULE,
+    ETAG_MODULE_IMPORTS,
+    PRECONDITION_IMPORT,
+    etags_enabled,
+)
+from py_openapi_tools.utils import GenerationError
+
+
+@pytest.fixture
+def etags(exec_module):
+    return exec_module(ETAG_MODULE_IMPORTS, ETAG_MODULE)
+
+
+def test_conditional_get(etags):
+    render_calls = []
+
+    def render():
+        render_calls.append(1)
+        return b'{"name":"rex"}'
+
+    not_modified, content, etag = etags["conditional_get"](None, None, render)
+    assert (not_modified, content) == (False, b'{"name":"rex"}')
+    assert etags["conditional_get"](f'W/{etag}, "other"', None, render)[:2] == (True, b"")
+
+    render_calls.clear()
+    not_modified, content, version_etag = etags["conditional_get"](None, "3", render)
+    assert etags["conditional_get"](version_etag, "3", render) == (True, b"", version_etag)
+    assert len(render_calls) == 1
+
+
+def test_precondition_failed(etags):
+    etag = etags["strong_etag"](b"3")
+    assert not etags["precondition_failed"](None, None)
+    assert not etags["precondition_failed"](etag, "3")
+    assert not etags["precondition_failed"]("*", "3")
+    assert etags["precondition_failed"](f"W/{etag}", "3")
+    assert etags["precondition_failed"](etag, "4")
+    assert etags["precondition_failed"](etag, None)
+
+
+def test_etags_enabled(pets_definition):
+    method = pets_definition("getPet").paths[0].methods[0]
+    assert not etags_enabled(method)
+    assert etags_enabled(method, default=True)
+    for value, enabled in (("yes", True), (1, True), (False, False), ("off", False)):
+        method = pets_definition("getPet", getPet={"x-etag": value}).paths[0].methods[0]
+        assert etags_enabled(method, default=not enabled) == enabled
+
+
+def test_drf_conditional_view(pets_definition):
+    from py_openapi_tools.drf import create_view_func
+
+    imports = []
+    view = create_view_func(pets_definition("getPet", "updatePet").paths[0], imports=imports, etags=True)
+    compile(view, "views.py", "exec")
+    assert "def get_pet_version(pet_id: int) -> typing.Optional[str]:" in view
+    assert 'request.headers.get("If-None-Match"), get_pet_version(pet_id), lambda' in view
+    assert 'if precondition_failed(request.headers.get("If-Match"), get_pet_version(pet_id)):' in view
+    assert CONDITIONAL_GET_IMPORT in imports and PRECONDITION_IMPORT in imports
+
+
+def test_fastapi_conditional_routes(pets_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    imports = []
+    view = create_view_func(pets_definition("getPet", "updatePet", getPet={"x-etag": True}).paths[0], imports=imports)
+    compile(view, "views.py", "exec")
+    assert "async def get_pet(request: Request, petId: int) -> Pet:" in view
+    assert "await run_in_threadpool(get_pet_version, petId)" in view
+    assert "precondition_failed" not in view
+    assert CONDITIONAL_GET_IMPORT in imports and PRECONDITION_IMPORT not in imports
+
+
+def test_exclusive_features_are_rejected(pets_definition):
+    from py_openapi_tools import drf, fastapi
+
+    path = pets_definition("getPet", getPet={"x-etag": True, "x-single-flight": True}).paths[0]
+    with pytest.raises(GenerationError, match="getPet: ETags can't be combined with single-flight"):
+        fastapi.create_view_func(path, imports=[])
+    path = pets_definition("getPet").paths[0]
+    with pytest.raises(GenerationError, match="getPet: ETags can't be combined with batch loader"):
+        fastapi.create_view_func(path, imports=[], etags=True, batch_loaders=True)
+    path = pets_definition("exportPets").paths[0]
+    with pytest.raises(GenerationError, match="exportPets: streaming can't be combined with ETags"):
+        drf.create_view_func(path, imports=[], etags=True)
+
+
+def test_generate_reports_exclusive_features():
+    from click.testing import CliRunner
+
+    from py_openapi_tools.reader import cli
+
+    spec = Path(__file__).parent / "pets.yaml"
+    result = CliRunner().invoke(cli, ["generate", str(spec), "--framework", "drf", "--etags"])
+    assert result.exit_code == 1
+    assert "exportPets: streaming can't be combined with ETags" in result.output
+
+    result = CliRunner().invoke(cli, ["generate", str(spec), "--framework", "fastapi", "--etags", "--single-flight"])
+    assert result.exit_code == 2
+    assert "--etags can't be combined with --single-flight or --batch-loaders" in result.output
@@ -0,0 +1,29 @@
+from py_openapi_tools.fastapi import adapter_name, create_view_func
+
+
+def test_adapter_name():
+    assert adapter_name("Pet") == "PET_ADAPTER"
+    assert adapter_name("list[ApiResponse]") == "API_RESPONSE_LIST_ADAPTER"
+
+
+def test_fast_response_routes(pets_definition):
+    imports = []
+    adapter_definitions = []
+    view = create_view_func(
+        pets_definition("listPets", "createPet").paths[0],
+        imports=imports,
+        adapter_definitions=adapter_definitions,
+        fast_responses=True,
+    )
+    compile(view, "views.py", "exec")
+    assert "content = PET_LIST_ADAPTER.dump_json([Pet.model_construct()])" in view
+    assert 'return Response(content, status_code=201, media_type="application/json")' in view
+    assert adapter_definitions == ["PET_LIST_ADAPTER = TypeAdapter(list[Pet])", "PET_ADAPTER = TypeAdapter(Pet)"]
+    assert "from pydantic import TypeAdapter" in imports
+
+    adapter_definitions.clear()
+    view = create_view_func(
+        pets_definition("listPets", "createPet").paths[0], imports=[], adapter_definitions=adapter_definitions
+    )
+    assert "return [Pet()]" in view
+    assert not adapter_definitions
@@ -0,0 +1,63 @@
+import os
+
+from py_openapi_tools.formatting import FragmentCache, format_fragments, get_cache
+
+IMPORTS = ["import typing", "from fastapi import HTTPException, FastAPI"]
+
+
+def test_format_fragments():
+    content = format_fragments(
+        IMPORTS, ["app = FastAPI( )", "\n", "\n@app.get('/')\nasync def root( ) -> typing.Any:\n    return None\n"]
+    )
+
+    assert content == (
+        "import typing\n"
+        "\n"
+        "from fastapi import FastAPI, HTTPException\n"
+        "\n"
+        "app = FastAPI()\n"
+        "\n"
+        "\n"
+        '@app.get("/")\n'
+        "async def root() -> typing.Any:\n"
+        "    return None\n"
+    )
+
+
+def test_format_fragments_two_blank_lines_before_definitions():
+    content = format_fragments(IMPORTS, ["class Pet:\n    pass"])
+
+    assert "HTTPException\n\n\nclass Pet:" in content
+
+
+def test_fragment_cache(tmp_path):
+    cache = FragmentCache(tmp_path)
+    data = ["class Pet:\n    pass", "class Tag:\n    pass"]
+
+    first = format_fragments(IMPORTS, data, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    second = format_fragments(IMPORTS, [*data[:1], "class Tag:\n    name: str"], cache=cache)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert first != second
+    assert format_fragments(IMPORTS, data, cache=cache) == first
+
+
+def test_fragment_cache_evicts_least_recently_used(tmp_path):
+    cache = FragmentCache(tmp_path, max_bytes=350)
+    keys = [FragmentCache.key("fragment", "", str(idx)) for idx in range(3)]
+    for idx, key in enumerate(keys):
+        cache.set(key, "x" * 100)
+        os.utime(cache._file(key), (idx, idx))
+    # read last, the second entry is the least recently used one now
+    assert cache.get(keys[0]) is not None
+
+    cache.set(FragmentCache.key("fragment", "", "3"), "x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert sum(file.stat().st_size for file in tmp_path.glob("*/*.py")) <= 350
+
+
+def test_default_cache_dir(fragment_cache_dir):
+    assert get_cache().directory == fragment_cache_dir
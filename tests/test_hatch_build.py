@@ -0,0 +1,103 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from py_openapi_tools import hatch_build
+from py_openapi_tools.hatch_build import OpenAPIBuildHook, cache_key, generate_target
+
+SPEC = Path(__file__).parent / "openapi.yaml"
+OPTIONS = {"framework": "drf", "shard-by": None, "precomputed-openapi": False}
+
+
+def test_cache_key_depends_on_spec_and_options(tmp_path):
+    spec = tmp_path / "openapi.yaml"
+    shutil.copy(SPEC, spec)
+    key = cache_key(spec, OPTIONS)
+
+    assert cache_key(spec, OPTIONS) == key
+    assert cache_key(spec, {**OPTIONS, "framework": "fastapi"}) != key
+    spec.write_text(spec.read_text() + "\n# changed\n")
+    assert cache_key(spec, OPTIONS) != key
+
+
+def test_cache_key_depends_on_plugins(tmp_path, monkeypatch):
+    class Dist:
+        name = "pets-hooks"
+        version = "1.0"
+
+    class EntryPoint:
+        name = "pets"
+        value = "pets_hooks:register"
+        dist = Dist
+
+    monkeypatch.setattr(hatch_build, "entry_points", lambda group: [EntryPoint])
+    options = {**OPTIONS, "plugins": True}
+    key = cache_key(SPEC, options)
+    without_plugins = cache_key(SPEC, OPTIONS)
+
+    Dist.version = "1.1"
+    assert cache_key(SPEC, options) != key
+    # the plugins aren't loaded without the option, their versions don't matter
+    assert cache_key(SPEC, OPTIONS) == without_plugins
+
+
+def test_generate_target_loads_plugins_on_request(tmp_path, monkeypatch):
+    calls = []
+
+    def run_generator(args):
+        calls.append(args)
+        Path(args[args.index("--export-folder") + 1]).mkdir()
+
+    monkeypatch.setattr(hatch_build, "run_generator", run_generator)
+
+    generate_target(SPEC, OPTIONS, cache_dir=tmp_path)
+    generate_target(SPEC, {**OPTIONS, "plugins": True}, cache_dir=tmp_path)
+
+    assert "--no-plugins" in calls[0] and "--no-plugins" not in calls[1]
+
+
+def test_generate_target_reuses_cached_output(tmp_path, monkeypatch):
+    output = generate_target(SPEC, OPTIONS, cache_dir=tmp_path)
+
+    assert sorted(file.name for file in output.iterdir()) == ["serializers.py", "urls.py", "views.py"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the generator must not run for an unchanged spec")
+
+    monkeypatch.setattr(hatch_build, "run_generator", fail)
+    assert generate_target(SPEC, OPTIONS, cache_dir=tmp_path) == output
+
+
+def create_hook(tmp_path: Path, config: dict, target_name: str = "wheel") -> OpenAPIBuildHook:
+    shutil.copy(SPEC, tmp_path / "openapi.yaml")
+    return OpenAPIBuildHook(str(tmp_path), config, None, None, str(tmp_path / "dist"), target_name)
+
+
+def test_build_hook_includes_generated_files(tmp_path):
+    hook = create_hook(
+        tmp_path,
+        {"cache-dir": ".cache", "targets": [{"spec": "openapi.yaml", "framework": "fastapi", "package": "app/api"}]},
+    )
+    build_data = {"force_include": {}}
+
+    hook.initialize("standard", build_data)
+
+    assert sorted(build_data["force_include"].values()) == ["app/api/serializers.py", "app/api/views.py"]
+    assert all(Path(file).parent.parent == tmp_path / ".cache" for file in build_data["force_include"])
+
+
+def test_build_hook_ignores_sdist(tmp_path):
+    hook = create_hook(tmp_path, {"targets": [{"spec": "openapi.yaml", "package": "app"}]}, target_name="sdist")
+    build_data = {"force_include": {}}
+
+    hook.initialize("standard", build_data)
+
+    assert build_data["force_include"] == {}
+
+
+def test_build_hook_validates_targets(tmp_path):
+    hook = create_hook(tmp_path, {"targets": [{"spec": "openapi.yaml", "package": "app", "framework": "flask"}]})
+
+    with pytest.raises(ValueError, match="framework"):
+        hook.initialize("standard", {"force_include": {}})
@@ -0,0 +1,74 @@
+import pytest
+
+from py_openapi_tools import hooks
+from py_openapi_tools.drf import schema_to_drf
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+@pytest.fixture
+def registry():
+    yield hooks.configure_hooks(load_plugins=False)
+    hooks.configure_hooks(load_plugins=False)
+
+
+def test_call_without_hooks_returns_value(registry):
+    value = object()
+    assert registry.call("post_parse", value) is value
+    assert registry.report() == []
+
+
+def test_register_unknown_hook(registry):
+    with pytest.raises(ValueError):
+        registry.register("post_generate", lambda value: value)
+
+
+def test_hooks_are_chained_and_timed(registry):
+    @registry.register("pre_write")
+    def add_header(content, *, file):
+        return f"# {file}\n{content}"
+
+    registry.register("pre_write", lambda content, *, file: None)
+
+    assert registry.call("pre_write", "x = 1\n", file="views.py") == "# views.py\nx = 1\n"
+    assert registry.call("pre_write", "y = 1\n", file="urls.py") == "# urls.py\ny = 1\n"
+    timings = {timing.plugin: timing for timing in registry.timings.values()}
+    assert timings[f"{__name__}.test_hooks_are_chained_and_timed.<locals>.add_header"].calls == 2
+    assert len(registry.report()) == 2
+
+
+def test_per_schema_emit_changes_serializer(registry):
+    definition = OpenAPIDefinition(
+        {"components": {"schemas": {"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}}}}
+    )
+    definition.parse_components()
+    calls = []
+
+    @registry.register("per_schema_emit")
+    def rename(code, *, schema_name, schema, framework):
+        calls.append((schema_name, framework))
+        return code.replace("class PetSerializer", "class AnimalSerializer")
+
+    assert "class AnimalSerializer(" in schema_to_drf("Pet", definition.created_schemas["Pet"])
+    assert calls == [("Pet", "drf")]
+
+
+def test_load_entry_points(registry, monkeypatch):
+    class EntryPoint:
+        def __init__(self, name, func):
+            self.name = name
+            self.func = func
+
+        def load(self):
+            return self.func
+
+    def register(registry):
+        registry.register("post_load", lambda data, *, file: {**data, "loaded": True})
+
+    def broken(registry):
+        raise RuntimeError("broken plugin")
+
+    monkeypatch.setattr(
+        hooks, "entry_points", lambda group: [EntryPoint("plugin", register), EntryPoint("broken", broken)]
+    )
+    registry.load_entry_points()
+    assert registry.call("post_load", {}, file="openapi.yaml") == {"loaded": True}
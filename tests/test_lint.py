@@ -0,0 +1,95 @@
+import json
+
+from py_openapi_tools.lint import Severity, issues_to_json, lint, should_fail
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+def create_definition(paths: dict, schemas: dict | None = None) -> OpenAPIDefinition:
+    definition = OpenAPIDefinition({"components": {"schemas": schemas or {}}, "paths": paths})
+    definition.parse()
+    return definition
+
+
+def array_response(**constraints) -> dict:
+    return {
+        "200": {
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Item"}, **constraints}
+                }
+            }
+        }
+    }
+
+
+ITEM_SCHEMA = {"Item": {"type": "object", "properties": {"id": {"type": "integer"}}}}
+
+
+def test_unbounded_list_endpoint():
+    definition = create_definition(
+        {"/items": {"get": {"operationId": "listItems", "responses": array_response()}}}, ITEM_SCHEMA
+    )
+
+    issues = lint(definition)
+
+    # the error covers the missing pagination, the warning isn't reported too
+    assert [(issue.rule, issue.location) for issue in issues] == [("unbounded-array-response", "GET /items")]
+    assert should_fail(issues, "error")
+
+
+def test_paginated_list_endpoint_with_unbounded_limit():
+    definition = create_definition(
+        {
+            "/items": {
+                "get": {
+                    "operationId": "listItems",
+                    "parameters": [
+                        {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                        {"name": "page_size", "in": "query", "schema": {"type": "integer", "maximum": 100}},
+                    ],
+                    "responses": array_response(),
+                }
+            }
+        },
+        ITEM_SCHEMA,
+    )
+
+    issues = lint(definition)
+
+    assert [(issue.rule, issue.message) for issue in issues] == [
+        ("unbounded-limit-parameter", "Parameter 'limit' has no maximum.")
+    ]
+
+
+def test_max_items_bounds_the_response():
+    definition = create_definition(
+        {"/items": {"get": {"operationId": "listItems", "responses": array_response(maxItems=50)}}}, ITEM_SCHEMA
+    )
+
+    assert [issue.rule for issue in lint(definition)] == ["list-endpoint-without-pagination"]
+
+
+def test_unbounded_request_strings(openapi_yaml):
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+
+    messages = [issue.message for issue in lint(definition) if issue.location == "PUT /pet"]
+
+    assert "String property 'category.name' of the request body has no maxLength." in messages
+    # enums are bounded
+    assert not any("'status'" in message for message in messages)
+
+
+def test_deep_all_of_chain():
+    schemas = {"Base": {"type": "object", "properties": {"id": {"type": "integer"}}}}
+    parent = "Base"
+    for idx in range(4):
+        schemas[f"Level{idx}"] = {"allOf": [{"$ref": f"#/components/schemas/{parent}"}]}
+        parent = f"Level{idx}"
+
+    issues = lint(create_definition({}, schemas))
+
+    assert [(issue.location, issue.severity) for issue in issues] == [("#/components/schemas/Level3", Severity.WARNING)]
+    assert not should_fail(issues, "error")
+    assert should_fail(issues, "warning")
+    assert json.loads(issues_to_json(issues))["summary"] == {"warning": 1, "error": 0}
@@ -0,0 +1,159 @@
+import asyncio
+import importlib.util
+import urllib.parse
+
+import pytest
+
+from py_openapi_tools.loadtest import create_operation, parse_tag_weights, sample_value, write_loadtest
+from py_openapi_tools.schema import OpenAPIDefinition, Property
+
+PET_SCHEMA = {
+    "Pet": {
+        "type": "object",
+        "required": ["name", "status"],
+        "properties": {
+            "id": {"type": "integer", "readOnly": True},
+            "name": {"type": "string", "example": "doggie"},
+            "status": {"type": "string", "enum": ["available", "sold"]},
+            "age": {"type": "integer", "minimum": 3},
+            "nickname": {"type": "string"},
+        },
+    }
+}
+PET_REF = {"$ref": "#/components/schemas/Pet"}
+
+
+def create_definition() -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(
+        {
+            "info": {"title": "Petstore"},
+            "components": {"schemas": PET_SCHEMA},
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "operationId": "listPets",
+                        "tags": ["pets"],
+                        "x-loadtest-weight": 4,
+                        "parameters": [
+                            {"name": "limit", "in": "query", "required": True, "schema": {"type": "integer"}},
+                            {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                            {"name": "X-Tenant", "in": "header", "required": True, "schema": {"type": "string"}},
+                        ],
+                        "responses": {"200": {"description": "ok"}},
+                    },
+                    "post": {
+                        "operationId": "createPet",
+                        "tags": ["pets"],
+                        "requestBody": {"content": {"application/json": {"schema": PET_REF}}},
+                        "responses": {"201": {"description": "created"}},
+                    },
+                },
+                "/pets/{petId}": {
+                    "delete": {
+                        "operationId": "deletePet",
+                        "parameters": [
+                            {"name": "petId", "in": "path", "required": True, "schema": {"type": "string"}},
+                        ],
+                        "responses": {"204": {"description": "deleted"}},
+                    },
+                },
+            },
+        }
+    )
+    definition.parse()
+    return definition
+
+
+def get_operation(definition: OpenAPIDefinition, operation_id: str) -> str:
+    for path in definition.paths:
+        for method in path.methods:
+            if method.operation_id == operation_id:
+                return create_operation(path, method, definition)
+    raise KeyError(operation_id)
+
+
+def test_sample_value():
+    definition = create_definition()
+    assert sample_value(Property(name="", example=7, type_=int, enum_values=[]), definition) == 7
+    assert sample_value(Property(name="", example=None, type_=str, enum_values=["a", "b"]), definition) == "a"
+    prop = Property(name="", example=None, type_=int, enum_values=[], additional_requirements={"minimum": 5})
+    assert sample_value(prop, definition) == 5
+    prop = Property(name="", example=None, type_=str, enum_values=[], additional_requirements={"minLength": 8})
+    assert sample_value(prop, definition) == "stringxx"
+
+
+def test_create_operation():
+    definition = create_definition()
+    assert get_operation(definition, "listPets") == (
+        "Operation('listPets', 'GET', '/pets', 'pets', weight=4.0, query={'limit': 1}, headers={'X-Tenant': 'string'})"
+    )
+    # readOnly and optional properties without an example are left out
+    assert get_operation(definition, "createPet") == (
+        "Operation('createPet', 'POST', '/pets', 'pets', body={'name': 'doggie', 'status': 'available'})"
+    )
+    assert get_operation(definition, "deletePet") == "Operation('deletePet', 'DELETE', '/pets/string', 'default')"
+
+
+def test_parse_tag_weights():
+    assert parse_tag_weights(["pets=3", "store=0"]) == {"pets": 3.0, "store": 0.0}
+    for value in ("pets", "=1", "pets=-1", "pets=many"):
+        with pytest.raises(ValueError):
+            parse_tag_weights([value])
+
+
+def test_loadtest_script(tmp_path):
+    output = write_loadtest(create_definition(), tmp_path / "loadtest.py", tag_weights={"default": 0})
+    spec = importlib.util.spec_from_file_location("loadtest_script", output)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    assert script.TAG_WEIGHTS == {"pets": 1.0, "default": 0.0}
+
+    requests = []
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # one keep-alive connection answers many requests
+        while request_line := await reader.readline():
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.partition(b":")
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get(b"content-length", 0)))
+            requests.append((request_line, headers, body))
+            if request_line.startswith(b"POST"):
+                writer.write(b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n")
+            else:
+                writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 2\r\n\r\n[]")
+            await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            operations = [obj for obj in script.OPERATIONS if obj.tag == "pets"]
+            return await script.run(
+                operations,
+                url=urllib.parse.urlsplit(f"http://127.0.0.1:{port}"),
+                rate=200,
+                duration=0.25,
+                connections=4,
+                timeout=5,
+                headers={"Authorization": "Bearer token"},
+                seed=1,
+            )
+
+    stats, elapsed, _ = asyncio.run(main())
+    assert len(requests) == 50
+    assert all(headers[b"authorization"] == b"Bearer token" for _, headers, _ in requests)
+    assert {body for line, _, body in requests if line.startswith(b"POST")} == {
+        b'{"name": "doggie", "status": "available"}'
+    }
+    assert {line for line, _, _ in requests if line.startswith(b"GET")} == {b"GET /pets?limit=1 HTTP/1.1\r\n"}
+
+    report = script.summarize(stats, elapsed)
+    assert report["total"]["count"] == 50
+    assert report["listPets"]["errors"] == report["listPets"]["count"] > report["createPet"]["count"]
+    assert report["createPet"]["statuses"] == {201: report["createPet"]["count"]}
+    assert report["createPet"]["p50"] <= report["createPet"]["p99"]
+    assert "deletePet" not in report
+    assert script.percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
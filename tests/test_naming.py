@@ -0,0 +1,126 @@
+import sys
+
+from py_openapi_tools.drf import create_serializers, create_view_func
+from py_openapi_tools.fastapi import create_models
+from py_openapi_tools.naming import (
+    NameRegistry,
+    function_like_name_to_class_name,
+    to_argument_name,
+    to_class_name,
+    to_function_name,
+    to_snake_case,
+)
+from py_openapi_tools.schema import OpenAPIDefinition
+from py_openapi_tools.structs import create_structs
+
+
+def test_to_snake_case():
+    assert to_snake_case("getPetById") == "get_pet_by_id"
+    assert to_snake_case("get-pet") == "getpet"
+    assert to_snake_case("") == ""
+
+
+def test_to_function_name_long_operation_id():
+    operation_id = "a" + "B" * (sys.getrecursionlimit() * 2)
+    assert to_function_name(operation_id) == "a" + "_b" * (sys.getrecursionlimit() * 2)
+
+
+def test_to_class_name():
+    assert to_class_name("pet") == "Pet"
+    assert to_class_name("ApiResponse") == "ApiResponse"
+    assert to_class_name("") == ""
+
+
+def test_function_like_name_to_class_name():
+    assert function_like_name_to_class_name("order_status") == "OrderStatus"
+    assert function_like_name_to_class_name("petType") == "PetType"
+
+
+def test_to_argument_name():
+    assert to_argument_name("petId") == "pet_id"
+    assert to_argument_name("api-key") == "api_key"
+    assert to_argument_name("class") == "class_"
+
+
+def test_name_registry_resolves_collisions():
+    names = NameRegistry()
+    assert names.function_name("getPet", owner="GET /pet", namespace="views") == "get_pet"
+    assert names.function_name("get_pet", owner="GET /pets", namespace="views") == "get_pet_2"
+    # the same owner always gets the same name back
+    assert names.function_name("getPet", owner="GET /pet", namespace="views") == "get_pet"
+    # namespaces are independent
+    assert names.function_name("get_pet", owner="GET /pets", namespace="other") == "get_pet"
+
+    assert len(names.collisions) == 1
+    assert names.collisions[0].owners == ("GET /pet", "GET /pets")
+    assert names.collisions[0].resolved == "get_pet_2"
+
+
+def test_query_schema_does_not_replace_component_schema():
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {"Pet": {"type": "object", "properties": {"id": {"type": "integer"}}}},
+            },
+            "paths": {
+                "/pet": {
+                    "get": {
+                        "operationId": "pet",
+                        "parameters": [{"name": "status", "in": "query", "schema": {"type": "string"}}],
+                        "responses": {},
+                    }
+                }
+            },
+        }
+    )
+    definition.parse()
+
+    assert definition.created_schemas["Pet"].properties[0].name == "id"
+    assert definition.paths[0].methods[0].query_schema.name == "Pet_2"
+    assert definition.created_schemas["Pet_2"].properties[0].name == "status"
+
+
+def test_colliding_component_schemas_get_distinct_classes():
+    pet = {"type": "object", "properties": {"id": {"type": "integer"}}}
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {
+                    "pet": pet,
+                    "Pet": pet,
+                    "Owner": {"type": "object", "properties": {"pet": {"$ref": "#/components/schemas/Pet"}}},
+                },
+            },
+            "paths": {
+                "/pets": {
+                    "get": {
+                        "operationId": "getPet",
+                        "responses": {
+                            "200": {
+                                "description": "",
+                                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+                            }
+                        },
+                    }
+                }
+            },
+        }
+    )
+    definition.parse()
+
+    assert [obj.class_name for obj in definition.created_schemas.values()] == ["Pet", "Pet_2", "Owner"]
+
+    models = "".join(create_models(definition))
+    assert "class Pet(BaseModel)" in models
+    assert "class Pet_2(BaseModel)" in models
+    assert "pet: Optional[Pet_2]" in models
+
+    serializers = "".join(create_serializers(definition))
+    assert "class PetSerializer(" in serializers
+    assert "class Pet_2Serializer(" in serializers
+    assert "pet = Pet_2Serializer()" in serializers
+    assert "Pet_2Serializer(data)" in create_view_func(definition.paths[0], definition.names, [])
+
+    structs = "".join(create_structs(definition))
+    assert "class Pet_2(msgspec.Struct" in structs
+    assert "PET_2_DECODER = msgspec.json.Decoder(Pet_2)" in structs
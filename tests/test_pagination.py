@@ -0,0 +1,120 @@
+import importlib
+import sys
+
+import pytest
+
+from py_openapi_tools.pagination import (
+    PAGINATION_IMPORT,
+    PAGINATION_MODULE,
+    PAGINATION_MODULE_IMPORTS,
+    get_keyset_pagination,
+)
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+@pytest.fixture
+def create_definition(pets_definition):
+    def create(**extensions) -> OpenAPIDefinition:
+        parameters = [{"$ref": "#/components/parameters/limit"}, {"$ref": "#/components/parameters/offset"}]
+        return pets_definition("listPets", listPets={"parameters": parameters, **extensions})
+
+    return create
+
+
+def test_get_keyset_pagination(create_definition):
+    method = create_definition().paths[0].methods[0]
+    assert get_keyset_pagination(method) is None
+
+    pagination = get_keyset_pagination(method, default=True)
+    assert (pagination.limit.name, pagination.offset.name) == ("limit", "offset")
+    assert (pagination.default_limit, pagination.max_limit) == (10, 50)
+
+    method = create_definition(**{"x-pagination": "offset"}).paths[0].methods[0]
+    assert get_keyset_pagination(method, default=True) is None
+
+
+def test_pagination_module(exec_module):
+    namespace = exec_module(PAGINATION_MODULE_IMPORTS, PAGINATION_MODULE)
+    cursor = namespace["encode_cursor"]({"id": 42})
+    assert namespace["decode_cursor"](cursor) == {"id": 42}
+    assert namespace["decode_cursor"](None) is None
+    with pytest.raises(ValueError):
+        namespace["decode_cursor"]("not a cursor")
+    assert namespace["clamp_limit"](500, default=10, maximum=50) == 50
+    assert namespace["next_link"]("http://test/pets?limit=5&offset=10", {"id": 42}) == (
+        f'<http://test/pets?limit=5&cursor={cursor}>; rel="next"'
+    )
+    assert namespace["next_link"]("http://test/pets", None) is None
+
+
+def test_drf_keyset_view(create_definition, tmp_path, monkeypatch):
+    pytest.importorskip("rest_framework")
+    import django
+    from django.conf import settings
+
+    from py_openapi_tools.drf import create_serializer_file, create_view_file
+
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY="test",
+            ALLOWED_HOSTS=["testserver"],
+            INSTALLED_APPS=["rest_framework"],
+            REST_FRAMEWORK={
+                "DEFAULT_AUTHENTICATION_CLASSES": [],
+                "DEFAULT_PERMISSION_CLASSES": [],
+                "UNAUTHENTICATED_USER": None,
+            },
+        )
+        django.setup()
+    from rest_framework.test import APIRequestFactory
+
+    definition = create_definition(**{"x-pagination": "keyset"})
+    package = tmp_path / "keyset_petstore"
+    package.mkdir()
+    create_serializer_file(definition, export_folder=package)
+    create_view_file(definition, export_folder=package)
+    # the views import the serializers absolute
+    monkeypatch.syspath_prepend(str(package))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "serializers", raising=False)
+    try:
+        views = importlib.import_module("keyset_petstore.views")
+    finally:
+        sys.modules.pop("serializers", None)
+
+    rows = [{"id": idx, "name": f"pet {idx}"} for idx in range(7)]
+
+    def list_pets_page(cursor, limit):
+        start = cursor["id"] + 1 if cursor else 0
+        page = rows[start : start + limit]
+        return page, {"id": page[-1]["id"]} if start + limit < len(rows) else None
+
+    monkeypatch.setattr(views, "list_pets_page", list_pets_page)
+
+    # the offset of the first request is replaced by the cursor of the links
+    url = "/pets?limit=3&offset=0"
+    names = []
+    while url:
+        response = views.list_pets(APIRequestFactory().get(url))
+        assert response.status_code == 200, response.data
+        names.extend(obj["name"] for obj in response.data)
+        link = response.get("Link")
+        url = link[1 : link.index(">")] if link else None
+        assert url is None or "offset" not in url
+    assert names == [obj["name"] for obj in rows]
+
+    response = views.list_pets(APIRequestFactory().get("/pets?cursor=not-a-cursor"))
+    assert response.status_code == 400
+
+
+def test_fastapi_keyset_route(create_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    definition = create_definition(**{"x-pagination": "keyset"})
+    imports = []
+    view = create_view_func(definition.paths[0], imports=imports)
+    compile(view, "views.py", "exec")
+    assert "limit: int = Query(10, ge=1, le=50), cursor: typing.Optional[str] = None" in view
+    assert "offset" not in view
+    assert "await run_in_threadpool(list_pets_page, keyset, limit)" in view
+    assert PAGINATION_IMPORT in imports
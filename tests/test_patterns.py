@@ -0,0 +1,113 @@
+import re
+
+import pytest
+
+from py_openapi_tools.patterns import PatternRegistry, PatternRisk, analyze_pattern
+from py_openapi_tools.schema import OpenAPIDefinition
+from py_openapi_tools.utils import GenerationError
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"^\d{5}$", r"^[a-z]+@[a-z]+\.[a-z]{2,}$", r"(\d{3})+", r"^(\d+,)*\d+$", r"(ab?)*", r"(?>a+)+", r"(a++)+"],
+)
+def test_safe_patterns(pattern):
+    assert analyze_pattern(pattern) == []
+
+
+@pytest.mark.parametrize(
+    "pattern, risk",
+    [
+        (r"(a+)+$", PatternRisk.NESTED_QUANTIFIER),
+        (r"^(\w+\s?)*$", PatternRisk.NESTED_QUANTIFIER),
+        # the parser factors out the common prefix, `a(?:|a)` is still ambiguous
+        (r"(a|aa)*c", PatternRisk.NESTED_QUANTIFIER),
+        (r"(ab|a.)*c", PatternRisk.OVERLAPPING_ALTERNATION),
+        (r"^\d+\d+$", PatternRisk.ADJACENT_QUANTIFIERS),
+        # the first characters of an atomic group count too
+        (r"^\d+(?>\d+)+$", PatternRisk.ADJACENT_QUANTIFIERS),
+        (r"[", PatternRisk.INVALID),
+    ],
+)
+def test_risky_patterns(pattern, risk):
+    assert [issue.risk for issue in analyze_pattern(pattern)] == [risk]
+
+
+def test_pattern_registry_shares_constants():
+    patterns = PatternRegistry()
+
+    assert patterns.constant(r"^\d{5}$", hint="User_zip") == "USER_ZIP_PATTERN"
+    assert patterns.constant(r"^\d{5}$", hint="Address_zip") == "USER_ZIP_PATTERN"
+    assert patterns.declarations() == ["USER_ZIP_PATTERN = re.compile('^\\\\d{5}$')"]
+    assert patterns.imports() == ["import re"]
+
+
+def test_pattern_registry_rejects_unsafe_patterns(capsys):
+    patterns = PatternRegistry()
+
+    with pytest.raises(GenerationError, match="User_broken: Pattern doesn't compile"):
+        patterns.constant("[", hint="User_broken")
+    with pytest.raises(GenerationError, match="nested-quantifier.*x-slow-pattern"):
+        patterns.constant("(a+)+$", hint="User_name")
+    assert patterns.constant("(a+)+$", hint="User_name", allow_exponential=True) == "USER_NAME_PATTERN"
+    # polynomial backtracking is only reported
+    assert patterns.constant(r"^\d+\d+$", hint="User_code") == "USER_CODE_PATTERN"
+    assert "Pattern User_code: Adjacent unbounded quantifiers" in capsys.readouterr().out
+
+
+def create_definition(**properties: dict) -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(
+        {
+            "components": {
+                "schemas": {
+                    "User": {
+                        "type": "object",
+                        "properties": {
+                            "zip": {"type": "string", "pattern": r"^\d{5}$"},
+                            "name": {"type": "string", "pattern": "^(a+)+$", "x-slow-pattern": True},
+                            **properties,
+                        },
+                    }
+                }
+            },
+            "paths": {},
+        }
+    )
+    definition.parse()
+    return definition
+
+
+def test_drf_serializer_uses_precompiled_pattern(tmp_path):
+    from py_openapi_tools.drf import create_serializer_file
+
+    create_serializer_file(create_definition(), export_folder=tmp_path)
+
+    content = (tmp_path / "serializers.py").read_text()
+    assert 'USER_ZIP_PATTERN = re.compile("^\\\\d{5}$")' in content
+    assert "zip = serializers.RegexField(USER_ZIP_PATTERN)" in content
+    assert "name = serializers.RegexField(USER_NAME_PATTERN)" in content
+
+
+def test_fastapi_model_uses_precompiled_pattern(tmp_path):
+    from py_openapi_tools.fastapi import create_serializer_file
+
+    create_serializer_file(create_definition(), export_folder=tmp_path)
+
+    content = (tmp_path / "serializers.py").read_text()
+    # other tests replace the first entry of the module level `SERIALIZER_IMPORT`
+    assert re.search(r"^from pydantic import .*field_validator", content, re.MULTILINE)
+    assert "if val is not None and not USER_ZIP_PATTERN.search(val):" in content
+
+
+@pytest.mark.parametrize("framework", ["drf", "fastapi", "structs"])
+def test_generators_reject_unsafe_patterns(framework, tmp_path):
+    import importlib
+
+    module = importlib.import_module(f"py_openapi_tools.{framework}")
+    for pattern in ("[", "^(a|aa)*c$"):
+        definition = create_definition(broken={"type": "string", "pattern": pattern})
+        with pytest.raises(GenerationError, match="User_broken"):
+            if framework == "structs":
+                module.create_struct_file(definition, file_name="structs", export_folder=tmp_path)
+            else:
+                module.create_serializer_file(definition, export_folder=tmp_path)
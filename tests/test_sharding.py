@@ -0,0 +1,94 @@
+import pytest
+
+from py_openapi_tools.schema import OpenAPIDefinition
+from py_openapi_tools.sharding import ShardBy, shard_paths
+
+
+def test_shard_paths_by_tag(openapi_yaml):
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+
+    shards = shard_paths(definition, ShardBy.TAG)
+
+    assert list(shards) == ["pet", "store", "user"]
+    assert sum(len(paths) for paths in shards.values()) == len(definition.paths)
+    assert all(path.path.startswith("/store") for path in shards["store"])
+
+
+def test_shard_paths_by_path_prefix():
+    definition = OpenAPIDefinition(
+        {
+            "components": {"schemas": {}},
+            "paths": {
+                "/{tenant}/orders": {"get": {"operationId": "listOrders", "responses": {}}},
+                "/orders/{orderId}": {"get": {"operationId": "getOrder", "responses": {}}},
+                "/": {"get": {"operationId": "root", "responses": {}}},
+            },
+        }
+    )
+    definition.parse()
+
+    shards = shard_paths(definition, ShardBy.PATH)
+
+    assert {name: [path.path for path in paths] for name, paths in shards.items()} == {
+        "orders": ["/{tenant}/orders", "/orders/{orderId}"],
+        "default": ["/"],
+    }
+
+
+def test_create_sharded_drf_files(openapi_yaml, tmp_path):
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+
+    from py_openapi_tools.drf import create_urls_file, create_view_file
+
+    create_view_file(definition, export_folder=tmp_path, shard_by=ShardBy.TAG)
+    create_urls_file(definition, export_folder=tmp_path, shard_by=ShardBy.TAG)
+
+    store_views = (tmp_path / "views_store.py").read_text()
+    assert "from .serializers import OrderSerializer" in store_views
+    assert "import *" not in store_views
+    urls = (tmp_path / "urls.py").read_text()
+    assert "SHARDS = (\"pet\", \"store\", \"user\")" in urls
+    assert 'path("", include(f"{__package__}.urls_{shard}")) for shard in SELECTED_SHARDS' in urls
+    assert "from . import urls_store" not in urls
+
+
+def test_create_sharded_fastapi_files(openapi_yaml, tmp_path):
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse()
+
+    from py_openapi_tools.fastapi import create_view_file
+
+    create_view_file(definition, export_folder=tmp_path, shard_by=ShardBy.TAG)
+
+    assert "@router.get(" in (tmp_path / "views_store.py").read_text()
+    assert "from .views_store import" not in (tmp_path / "views.py").read_text()
+
+
+def test_sharded_fastapi_app_imports_selected_shards(pets_definition, tmp_path, monkeypatch):
+    import sys
+
+    pytest.importorskip("fastapi")
+    from py_openapi_tools.fastapi import create_serializer_file, create_view_file
+    from py_openapi_tools.sharding import SHARDS_ENV
+
+    definition = pets_definition("listPets", "getOwner", listPets={"tags": ["pets"]}, getOwner={"tags": ["owners"]})
+    package = tmp_path / "sharded_api"
+    package.mkdir()
+    (package / "__init__.py").touch()
+    create_serializer_file(definition, export_folder=package)
+    create_view_file(definition, export_folder=package, shard_by=ShardBy.TAG)
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv(SHARDS_ENV, "owners")
+    try:
+        import sharded_api.views
+
+        paths = sharded_api.views.app.openapi()["paths"]
+        assert "/pets/{petId}/owner" in paths and "/pets" not in paths
+        assert "sharded_api.views_owners" in sys.modules
+        assert "sharded_api.views_pets" not in sys.modules
+    finally:
+        for name in [obj for obj in sys.modules if obj.split(".")[0] == "sharded_api"]:
+            del sys.modules[name]
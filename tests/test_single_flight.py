@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from py_openapi_tools.single_flight import (
+    SINGLE_FLIGHT_IMPORT,
+    SINGLE_FLIGHT_MODULE,
+    SINGLE_FLIGHT_MODULE_IMPORTS,
+)
+
+
+def test_single_flight_coalesces(exec_module):
+    namespace = exec_module(SINGLE_FLIGHT_MODULE_IMPORTS, SINGLE_FLIGHT_MODULE)
+    calls = []
+
+    @namespace["single_flight"]("getPet")
+    async def get_pet(petId: int):
+        calls.append(petId)
+        await asyncio.sleep(0.01)
+        return {"id": petId}
+
+    async def requests():
+        return await asyncio.gather(get_pet(petId=1), get_pet(petId=1), get_pet(petId=2))
+
+    assert asyncio.run(requests()) == [{"id": 1}, {"id": 1}, {"id": 2}]
+    assert calls == [1, 2]
+    assert not namespace["_in_flight"]
+
+    # finished requests aren't shared
+    asyncio.run(requests())
+    assert calls == [1, 2, 1, 2]
+
+
+def test_fastapi_single_flight_route(pets_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    imports = []
+    view = create_view_func(pets_definition("getPet", "updatePet").paths[0], imports=imports)
+    assert "single_flight" not in view
+
+    view = create_view_func(pets_definition("getPet", "updatePet").paths[0], imports=imports, single_flight=True)
+    compile(view, "views.py", "exec")
+    assert '@single_flight("getPet")\nasync def get_pet(petId: int) -> Pet:' in view
+    assert view.count("@single_flight") == 1
+    assert SINGLE_FLIGHT_IMPORT in imports
+
+    view = create_view_func(
+        pets_definition("getPet", "updatePet", getPet={"x-concurrency": "sync"}).paths[0],
+        imports=[],
+        single_flight=True,
+    )
+    assert "single_flight" not in view
+    view = create_view_func(
+        pets_definition("getPet", "updatePet", getPet={"x-single-flight": False}).paths[0],
+        imports=[],
+        single_flight=True,
+    )
+    assert "single_flight" not in view
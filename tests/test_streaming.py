@@ -0,0 +1,103 @@
+import copy
+
+from py_openapi_tools.schema import OpenAPIDefinition
+
+
+def test_iter_paths_consumes_raw_paths(openapi_yaml):
+    # the fixture is shared by the whole session, consuming it would empty it for other tests
+    openapi_yaml = copy.deepcopy(openapi_yaml)
+    definition = OpenAPIDefinition(openapi_yaml)
+    definition.parse_components()
+    path_count = len(openapi_yaml["paths"])
+
+    paths = [path.path for path in definition.iter_paths(consume=True)]
+
+    assert len(paths) == path_count
+    assert not openapi_yaml["paths"]
+    assert not definition.paths
+
+
+def test_create_drf_files_streaming(openapi_yaml, tmp_path):
+    from py_openapi_tools.drf import create_files_streaming
+
+    definition = OpenAPIDefinition(copy.deepcopy(openapi_yaml))
+    definition.parse_components()
+    create_files_streaming(definition, export_folder=tmp_path)
+
+    assert "class PetSerializer(serializers.Serializer):" in (tmp_path / "serializers.py").read_text()
+    assert "def get_pet_by_id(" in (tmp_path / "views.py").read_text()
+    urls = (tmp_path / "urls.py").read_text()
+    assert "from . import views" in urls
+    assert "views.get_pet_by_id)" in urls
+
+
+def test_create_fastapi_files_streaming(openapi_yaml, tmp_path):
+    from py_openapi_tools.fastapi import create_files_streaming
+
+    definition = OpenAPIDefinition(copy.deepcopy(openapi_yaml))
+    definition.parse_components()
+    create_files_streaming(definition, export_folder=tmp_path)
+
+    assert "class Pet(BaseModel):" in (tmp_path / "serializers.py").read_text()
+    views = (tmp_path / "views.py").read_text()
+    assert views.index("app = FastAPI()") < views.index("def get_pet_by_id(")
+
+
+def write_spec(file, path_count: int) -> None:
+    import yaml
+
+    operation = {"responses": {"200": {"content": {"application/json": {"schema": {"type": "object"}}}}}}
+    paths = {f"/pets{idx}": {"get": {**operation, "operationId": f"getPets{idx}"}} for idx in range(path_count)}
+    file.write_text(yaml.safe_dump({"openapi": "3.0.3", "paths": paths, "components": {"schemas": {}}}))
+
+
+def test_read_paths_lazily(tmp_path):
+    from py_openapi_tools.reader import iter_openapi_paths, read_openapi_schema
+
+    file = tmp_path / "openapi.yaml"
+    write_spec(file, 3)
+    complete = read_openapi_schema(file)
+
+    # `components` follows `paths`, the paths are skipped without being built
+    assert read_openapi_schema(file, paths=False) == {**complete, "paths": {}}
+    assert list(iter_openapi_paths(file)) == list(complete["paths"].items())
+
+    definition = OpenAPIDefinition(read_openapi_schema(file, paths=False), raw_paths=iter_openapi_paths(file))
+    definition.parse_components()
+    assert [path.path for path in definition.iter_paths(consume=True)] == ["/pets0", "/pets1", "/pets2"]
+
+
+def test_read_paths_lazily_keeps_memory_flat(tmp_path):
+    import tracemalloc
+
+    from py_openapi_tools.reader import iter_openapi_paths, read_openapi_schema
+
+    file = tmp_path / "openapi.yaml"
+    write_spec(file, 600)
+
+    tracemalloc.start()
+    try:
+        read_openapi_schema(file)
+        complete_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        read_openapi_schema(file, paths=False)
+        for _ in iter_openapi_paths(file):
+            pass
+        lazy_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # only the current path is built
+    assert lazy_peak < complete_peak / 10
+
+
+def test_fragment_file_writer_formats_invalid_fragments_with_the_file(tmp_path):
+    from py_openapi_tools.utils import FragmentFileWriter
+
+    writer = FragmentFileWriter("views", export_folder=tmp_path)
+    writer.write("if  typing.TYPE_CHECKING:\n    x = 1")
+    # only valid python after the `if`
+    writer.write("else:\n    x  =  'Rex'")
+    file = writer.close(["import typing"])
+
+    assert file.read_text() == 'import typing\n\nif typing.TYPE_CHECKING:\n    x = 1\n\n\nelse:\n    x = "Rex"\n'
@@ -0,0 +1,40 @@
+from py_openapi_tools.schema import NDJSON_MEDIA_TYPE, SchemaType
+
+
+def test_ndjson_response_is_streamed(pets_definition):
+    list_pets, export_pets = (path.methods[0] for path in pets_definition("listPets", "exportPets").paths)
+    response_schema = export_pets.get_success_response_schema()
+    assert response_schema.media_type == NDJSON_MEDIA_TYPE
+    assert response_schema.type == SchemaType.ARRAY
+    assert export_pets.is_streaming()
+    assert not list_pets.is_streaming()
+    assert list_pets.is_streaming(stream_arrays=True)
+
+
+def test_drf_streaming_view(pets_definition):
+    from py_openapi_tools.drf import create_view_func
+
+    imports = []
+    views = [
+        create_view_func(path, imports=imports, streaming_responses=True)
+        for path in pets_definition("listPets", "exportPets").paths
+    ]
+    for view in views:
+        compile(view, "views.py", "exec")
+        assert "yield renderer.render(PetSerializer(value).data)" in view
+        assert f'StreamingHttpResponse(rows(), content_type="{NDJSON_MEDIA_TYPE}")' in view
+    assert "from django.http import StreamingHttpResponse" in imports
+
+
+def test_fastapi_streaming_route(pets_definition):
+    from py_openapi_tools.fastapi import create_view_func
+
+    imports = []
+    list_pets, export_pets = (
+        create_view_func(path, imports=imports) for path in pets_definition("listPets", "exportPets").paths
+    )
+    assert "-> list[Pet]:" in list_pets
+    compile(export_pets, "views.py", "exec")
+    assert "response_class=StreamingResponse)\nasync def export_pets() -> StreamingResponse:" in export_pets
+    assert "async def rows():" in export_pets
+    assert "from fastapi.responses import StreamingResponse" in imports
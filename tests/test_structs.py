@@ -0,0 +1,142 @@
+import pytest
+
+from py_openapi_tools.fastapi import create_view_func
+from py_openapi_tools.schema import OpenAPIDefinition
+from py_openapi_tools.structs import create_structs, decoder_name
+from py_openapi_tools.utils import GenerationError
+
+PET_REF = {"$ref": "#/components/schemas/Pet"}
+SCHEMAS = {
+    "Pet": {
+        "type": "object",
+        "required": ["name"],
+        "properties": {
+            "name": {"type": "string", "minLength": 1, "maxLength": 20},
+            "petType": {"type": "string", "enum": ["cat", "dog"]},
+            "age": {"type": "integer", "minimum": 0},
+        },
+    },
+    "Point": {
+        "type": "object",
+        "x-msgspec": {"array_like": True},
+        "properties": {"x": {"type": "number"}, "y": {"type": "number"}},
+    },
+    "Stamp": {"type": "object", "properties": {"id": {"type": "integer", "readOnly": True}}},
+    "Cat": {"type": "object", "properties": {"kind": {"type": "string"}, "lives": {"type": "integer"}}},
+    "Dog": {"type": "object", "properties": {"kind": {"type": "string"}, "bark": {"type": "boolean"}}},
+    "Animal": {
+        "oneOf": [{"$ref": "#/components/schemas/Cat"}, {"$ref": "#/components/schemas/Dog"}],
+        "discriminator": {"propertyName": "kind", "mapping": {"cat": "#/components/schemas/Cat"}},
+    },
+    # without a discriminator msgspec can't pick the Struct
+    "Record": {"anyOf": [PET_REF, {"$ref": "#/components/schemas/Stamp"}]},
+}
+
+
+def create_definition() -> OpenAPIDefinition:
+    definition = OpenAPIDefinition(
+        {
+            "components": {"schemas": SCHEMAS},
+            "paths": {
+                "/pets": {
+                    "post": {
+                        "operationId": "createPet",
+                        "requestBody": {"content": {"application/json": {"schema": PET_REF}}},
+                        "responses": {"201": {"content": {"application/json": {"schema": PET_REF}}}},
+                    },
+                },
+            },
+        }
+    )
+    definition.parse()
+    return definition
+
+
+def test_decoder_name():
+    assert decoder_name("Pet") == "PET_DECODER"
+    assert decoder_name("ApiResponse") == "API_RESPONSE_DECODER"
+
+
+def test_create_structs(capsys):
+    module = "\n".join(create_structs(create_definition()))
+    compile(module, "serializers.py", "exec")
+    assert "class Pet(msgspec.Struct, kw_only=True):" in module
+    assert "name: typing.Annotated[str, msgspec.Meta(min_length=1, max_length=20)]" in module
+    assert (
+        "pet_type: typing.Optional[typing.Literal['cat', 'dog']] = msgspec.field(name=\"petType\", default=None)"
+        in module
+    )
+    assert "class Point(msgspec.Struct, kw_only=True, array_like=True):" in module
+    assert "class Stamp(msgspec.Struct, kw_only=True, frozen=True):" in module
+    # the mapping names the tag of Cat, Dog is tagged with its schema name
+    assert "class Cat(msgspec.Struct, kw_only=True, tag_field='kind', tag='cat'):" in module
+    assert "class Dog(msgspec.Struct, kw_only=True, tag_field='kind', tag='Dog'):" in module
+    assert "Animal = typing.Union[Cat, Dog]" in module
+    assert module.index("Animal = typing.Union") > module.index("class Dog")
+    assert "ENCODER = msgspec.json.Encoder()" in module
+    assert "ANIMAL_DECODER = msgspec.json.Decoder(Animal)" in module
+    assert "Record = typing.Union[typing.Any]" in module
+    assert "Union Record: add a discriminator to tell Pet, Stamp apart" in capsys.readouterr().out
+
+
+def test_structs_round_trip():
+    pytest.importorskip("msgspec")
+    namespace = {}
+    exec(
+        "\n".join(["import datetime as dt", "import typing", "import msgspec", *create_structs(create_definition())]),
+        namespace,
+    )
+
+    assert namespace["ANIMAL_DECODER"].decode(b'{"kind": "cat", "lives": 9}') == namespace["Cat"](lives=9)
+    assert namespace["PET_DECODER"].decode(b'{"name": "Rex", "petType": "dog"}').pet_type == "dog"
+    assert namespace["ENCODER"].encode(namespace["Point"](x=1.0, y=2.0)) == b"[1.0,2.0]"
+    assert namespace["RECORD_DECODER"].decode(b'{"id": 1}') == {"id": 1}
+    with pytest.raises(namespace["msgspec"].ValidationError):
+        namespace["PET_DECODER"].decode(b'{"name": ""}')
+
+
+def test_fastapi_struct_route():
+    imports = []
+    view = create_view_func(create_definition().paths[0], imports=imports, msgspec_models=True)
+    compile(view, "views.py", "exec")
+    assert '@app.post("/pets", status_code=201, response_model=None)' in view
+    assert "async def create_pet(request: Request) -> Response:" in view
+    assert "body = PET_DECODER.decode(await request.body())" in view
+    assert "content = ENCODER.encode(Pet())" in view
+    assert "from .serializers import PET_DECODER" in imports
+    assert "from .serializers import ENCODER" in imports
+
+
+def test_fastapi_struct_route_rejects_invalid_bodies():
+    pytest.importorskip("msgspec")
+    testclient = pytest.importorskip("fastapi.testclient")
+    imports = []
+    view = create_view_func(create_definition().paths[0], imports=imports, msgspec_models=True)
+    namespace = {}
+    exec(
+        "\n".join(
+            [
+                "import datetime as dt",
+                "import typing",
+                "import msgspec",
+                "from fastapi import FastAPI, HTTPException, Request, Response",
+                *create_structs(create_definition()),
+                "app = FastAPI()",
+                view,
+            ]
+        ),
+        namespace,
+    )
+    client = testclient.TestClient(namespace["app"])
+
+    assert client.post("/pets", content=b'{"name": ""}').status_code == 422
+    assert client.post("/pets", content=b"not json").status_code == 400
+
+
+def test_fastapi_struct_route_rejects_other_templates(pets_definition):
+    path = pets_definition("getPet", getPet={"x-cache-ttl": 30}).paths[0]
+    with pytest.raises(GenerationError, match="getPet: response cache isn't supported by msgspec models"):
+        create_view_func(path, imports=[], msgspec_models=True)
+    path = pets_definition("exportPets").paths[0]
+    with pytest.raises(GenerationError, match="exportPets: streaming isn't supported by msgspec models"):
+        create_view_func(path, imports=[], msgspec_models=True)